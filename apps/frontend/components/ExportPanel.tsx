@@ -18,7 +18,8 @@ interface ExportMetadata {
   generated_at: string;
   version: string;
   file_count: number;
-  total_size_estimate: number;
+  total_size: number;
+  file_sizes: Record<string, number>;
   expires_at: string;
 }
 
@@ -136,7 +137,7 @@ export function ExportPanel({ exportData }: ExportPanelProps) {
           <div className="text-sm text-gray-600">
             Generated on {formatDate(exportData.metadata.generated_at)} • 
             Version {exportData.metadata.version} • 
-            {formatFileSize(exportData.metadata.total_size_estimate)}
+            {formatFileSize(exportData.metadata.total_size)}
           </div>
         </CardHeader>
         <CardContent>
@@ -144,7 +144,8 @@ export interface LessonResponse {
       generated_at: string;
       version: string;
       file_count: number;
-      total_size_estimate: number;
+      total_size: number;
+      file_sizes: Record<string, number>;
       expires_at: string;
     };
     status: string;
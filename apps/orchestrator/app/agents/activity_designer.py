@@ -1,8 +1,11 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
+from app.services.hazard_matcher import hazard_matcher
 from typing import Dict, List, Any, Tuple
 
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
+
 def validate_safety_protocols(protocols: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """Validate safety protocols"""
     errors = []
@@ -32,22 +35,8 @@ def validate_safety_protocols(protocols: Dict[str, Any]) -> Tuple[bool, List[str
 
 def check_hazardous_materials(materials: List[str]) -> Dict[str, Any]:
     """Check for hazardous materials in the activity"""
-    hazardous_materials = []
-    
-    # Define hazardous materials (simplified)
-    hazardous_list = [
-        "matches", "lighters", "fire", "flame", "heat_source",
-        "alcohol", "ethanol", "methanol", "acetone",
-        "acid", "base", "chemical", "toxic", "poison",
-        "explosive", "flammable", "corrosive", "radioactive"
-    ]
-    
-    for material in materials:
-        material_lower = material.lower()
-        for hazard in hazardous_list:
-            if hazard in material_lower:
-                hazardous_materials.append(material)
-                break
+    report = hazard_matcher.match_materials(materials)
+    hazardous_materials = report["hazardous_materials"]
     
     has_hazards = len(hazardous_materials) > 0
     
@@ -63,6 +52,7 @@ def check_hazardous_materials(materials: List[str]) -> Dict[str, Any]:
         "has_hazards": has_hazards,
         "hazardous_materials": hazardous_materials,
         "safety_level": safety_level,
+        "hazard_categories": report["categories"],
         "total_materials": len(materials)
     }
 
@@ -84,18 +74,12 @@ def create_activity_designer_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def design_activity(topic: str, grade: str, objectives: list, equipment: list, duration: int) -> dict:
     """Generate a hands-on activity for a lesson"""
     
-    agent = create_activity_designer_agent()
-    
     objectives_text = "\n".join([f"- {obj['description']}" for obj in objectives])
     equipment_text = ", ".join(equipment) if equipment else "Basic classroom materials"
     
@@ -165,7 +149,8 @@ def design_activity(topic: str, grade: str, objectives: list, equipment: list, d
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("activity_designer", create_activity_designer_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
@@ -1,114 +1,30 @@
 # Created automatically by Cursor AI (2024-08-26)
 from crewai import Agent, Task, Crew
 from langchain.tools import tool
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from app.core.agent_pool import agent_pool
+from app.services.artifact_store import ArtifactStore, artifact_store
+from app.services.bundle_writer import BundleEntry, write_bundle
+from app.services.gradebook import build_gradebook
+from app.services.url_signer import url_signer
 import json
 import csv
 import io
-import zipfile
 from datetime import datetime
 
+def render_csv_grades(lesson_data: Dict[str, Any]) -> str:
+    """Generate CSV gradebook with student roster and assessment items"""
+    return json.dumps(build_gradebook(lesson_data).to_dict())
+
 @tool
 def generate_csv_grades(lesson_data: Dict[str, Any]) -> str:
     """Generate CSV gradebook with student roster and assessment items"""
     try:
-        quiz = lesson_data.get("quiz", {})
-        quiz_items = quiz.get("quiz_items", [])
-        
-        # Create CSV structure
-        csv_data = {
-            "headers": ["Student Name", "Student ID"] + [f"Q{i+1}" for i in range(len(quiz_items))] + ["Total Score", "Percentage", "Grade"],
-            "rows": []
-        }
-        
-        # Generate sample student data (in real app, this would come from the database)
-        sample_students = [
-            {"name": "Student 1", "id": "S001"},
-            {"name": "Student 2", "id": "S002"},
-            {"name": "Student 3", "id": "S003"},
-            {"name": "Student 4", "id": "S004"},
-            {"name": "Student 5", "id": "S005"}
-        ]
-        
-        total_points = sum(item.get("points", 1) for item in quiz_items)
-        
-        for student in sample_students:
-            # Generate sample scores (in real app, these would be actual student responses)
-            scores = []
-            for item in quiz_items:
-                points = item.get("points", 1)
-                # Simulate some students getting partial credit
-                score = points if len(scores) % 3 != 0 else points * 0.8
-                scores.append(round(score, 1))
-            
-            total_score = sum(scores)
-            percentage = (total_score / total_points) * 100 if total_points > 0 else 0
-            
-            # Simple grade calculation
-            if percentage >= 90:
-                grade = "A"
-            elif percentage >= 80:
-                grade = "B"
-            elif percentage >= 70:
-                grade = "C"
-            elif percentage >= 60:
-                grade = "D"
-            else:
-                grade = "F"
-            
-            row = [student["name"], student["id"]] + scores + [total_score, round(percentage, 1), grade]
-            csv_data["rows"].append(row)
-        
-        return json.dumps(csv_data)
+        return render_csv_grades(lesson_data)
     except Exception as e:
         return f"Error generating CSV grades: {str(e)}"
 
-@tool
-def generate_bundle_zip(lesson_data: Dict[str, Any], export_files: Dict[str, Any]) -> str:
-    """Generate a ZIP bundle containing all lesson materials"""
-    try:
-        topic = lesson_data.get("topic", "")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        bundle_structure = {
-            "bundle_name": f"lesson_{topic.replace(' ', '_').lower()}_{timestamp}",
-            "files": [
-                {
-                    "name": "lesson_pack.pdf",
-                    "type": "pdf",
-                    "content": export_files.get("pack_pdf", "")
-                },
-                {
-                    "name": "slides.mdx",
-                    "type": "mdx",
-                    "content": export_files.get("slides_mdx", "")
-                },
-                {
-                    "name": "worksheets.docx",
-                    "type": "docx",
-                    "content": export_files.get("worksheets_docx", "")
-                },
-                {
-                    "name": "quiz.pdf",
-                    "type": "pdf",
-                    "content": export_files.get("quiz_pdf", "")
-                },
-                {
-                    "name": "gradebook.csv",
-                    "type": "csv",
-                    "content": export_files.get("csv_grades", "")
-                },
-                {
-                    "name": "lesson_data.json",
-                    "type": "json",
-                    "content": json.dumps(lesson_data, indent=2)
-                },
-                {
-                    "name": "README.md",
-                    "type": "markdown",
-                    "content": f"""# Lesson Bundle: {topic}
-
-Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+BUNDLE_README = """# Lesson Bundle: {topic}
 
 ## Contents
 
@@ -135,72 +51,132 @@ Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 - UDL considerations have been applied
 - Cross-discipline connections are integrated
 """
-                }
-            ],
-            "metadata": {
-                "topic": topic,
-                "generated_at": datetime.now().isoformat(),
-                "version": "1.0",
-                "total_files": 7
-            }
+
+def _export_content(export_files: Dict[str, Any], name: str):
+    """Return a lazy source for one export; content is only read while zipping"""
+    def source():
+        content = export_files.get(name, "")
+        return content if isinstance(content, (str, bytes)) else json.dumps(content)
+    return source
+
+def build_lesson_bundle(
+    lesson_data: Dict[str, Any],
+    export_files: Dict[str, Any],
+    artifacts: Optional[ArtifactStore] = None
+) -> Dict[str, Any]:
+    """Stream a ZIP bundle of all lesson materials into the artifact store
+
+    The archive is content-addressed like every other export, so unchanged
+    materials reuse the stored bundle and GC reclaims it with its manifest.
+    """
+    topic = lesson_data.get("topic", "")
+    now = datetime.now()
+    bundle_name = f"lesson_{topic.replace(' ', '_').lower()}_{now.strftime('%Y%m%d_%H%M%S')}"
+    
+    entries = [
+        BundleEntry("lesson_pack.pdf", "pdf", _export_content(export_files, "pack_pdf")),
+        BundleEntry("slides.mdx", "mdx", _export_content(export_files, "slides_mdx")),
+        BundleEntry("worksheets.docx", "docx", _export_content(export_files, "worksheets_docx")),
+        BundleEntry("quiz.pdf", "pdf", _export_content(export_files, "quiz_pdf")),
+        # Streamed as real CSV straight from the score matrix
+        BundleEntry("gradebook.csv", "csv", lambda: build_gradebook(lesson_data).iter_csv()),
+        # iterencode yields the document piecewise instead of one large string
+        BundleEntry("lesson_data.json", "json", lambda: json.JSONEncoder(indent=2).iterencode(lesson_data)),
+        BundleEntry("README.md", "markdown", lambda: BUNDLE_README.format(topic=topic))
+    ]
+    
+    manifest = write_bundle(artifacts or artifact_store, entries)
+    
+    return {
+        "bundle_name": bundle_name,
+        **manifest,
+        "metadata": {
+            "topic": topic,
+            "generated_at": now.isoformat(),
+            "version": "1.0",
+            "total_files": manifest["total_files"]
         }
-        
-        return json.dumps(bundle_structure)
+    }
+
+@tool
+def generate_bundle_zip(lesson_data: Dict[str, Any], export_files: Dict[str, Any]) -> str:
+    """Generate a ZIP bundle containing all lesson materials"""
+    try:
+        return json.dumps(build_lesson_bundle(lesson_data, export_files))
     except Exception as e:
         return f"Error generating bundle ZIP: {str(e)}"
 
-@tool
-def create_signed_url(file_path: str, expiration_hours: int = 24) -> str:
+def sign_file_url(file_path: str, expiration_hours: int = 24) -> Dict[str, Any]:
     """Create a signed URL for secure file access"""
+    return url_signer.sign(file_path, expiration_hours)
+
+def sign_export_urls(export_files: Dict[str, Any], expiration_hours: int = 24) -> Dict[str, Dict[str, Any]]:
+    """Sign every non-empty export of a lesson in one batch"""
+    file_types = [
+        file_type for file_type, content in export_files.items()
+        if content and file_type not in ("status", "error")
+    ]
+    signed = url_signer.sign_many([f"exports/{file_type}" for file_type in file_types], expiration_hours)
+    return {file_type: signed[f"exports/{file_type}"] for file_type in file_types}
+
+@tool
+def create_signed_urls(file_paths: List[str], expiration_hours: int = 24) -> str:
+    """Create signed URLs for a batch of files in one call"""
     try:
-        # In a real implementation, this would use AWS S3 or similar service
-        # For now, we'll simulate the signed URL generation
-        import hashlib
-        import time
-        
-        timestamp = int(time.time()) + (expiration_hours * 3600)
-        signature = hashlib.sha256(f"{file_path}{timestamp}".encode()).hexdigest()[:16]
-        
-        signed_url = f"https://storage.example.com/{file_path}?expires={timestamp}&signature={signature}"
-        
-        return json.dumps({
-            "signed_url": signed_url,
-            "expires_at": timestamp,
-            "file_path": file_path
-        })
+        return json.dumps(url_signer.sign_many(file_paths, expiration_hours))
     except Exception as e:
-        return f"Error creating signed URL: {str(e)}"
+        return f"Error creating signed URLs: {str(e)}"
+
+def render_change_log(
+    lesson_data: Dict[str, Any],
+    previous_version: Dict[str, Any] = None,
+    section_diff: Dict[str, Dict[str, int]] = None
+) -> str:
+    """Generate a change log for lesson modifications
+
+    ``section_diff`` (from ``export_diff.diff_fingerprints``) adds per-section
+    entries describing which items were modified, added or removed.
+    """
+    current_version = {
+        "objectives_count": len(lesson_data.get("objectives", [])),
+        "sequence_sections": len(lesson_data.get("sequence", {}).get("sections", [])),
+        "quiz_items": len(lesson_data.get("quiz", {}).get("quiz_items", [])),
+        "activity_steps": len(lesson_data.get("activity", {}).get("activity", {}).get("steps", [])),
+        "udl_flags": len(lesson_data.get("udl", {}).get("flags", []))
+    }
+    
+    if previous_version:
+        changes = []
+        for key, current_value in current_version.items():
+            previous_value = previous_version.get(key, 0)
+            if current_value != previous_value:
+                change = current_value - previous_value
+                changes.append(f"{key}: {previous_value} → {current_value} ({change:+d})")
+    elif section_diff is not None:
+        changes = []
+    else:
+        changes = [f"Initial version with {value} {key}" for key, value in current_version.items()]
+    
+    for section, counts in (section_diff or {}).items():
+        details = [f"{counts[kind]} {kind}" for kind in ("modified", "added", "removed") if counts.get(kind)]
+        changes.append(f"{section}: {', '.join(details) if details else 'updated'}")
+    
+    change_log = {
+        "version": "1.0",
+        "timestamp": datetime.now().isoformat(),
+        "changes": changes,
+        "summary": f"Lesson updated with {len(changes)} modifications"
+    }
+    if section_diff is not None:
+        change_log["sections"] = section_diff
+    
+    return json.dumps(change_log)
 
 @tool
 def generate_change_log(lesson_data: Dict[str, Any], previous_version: Dict[str, Any] = None) -> str:
     """Generate a change log for lesson modifications"""
     try:
-        current_version = {
-            "objectives_count": len(lesson_data.get("objectives", [])),
-            "sequence_sections": len(lesson_data.get("sequence", {}).get("sections", [])),
-            "quiz_items": len(lesson_data.get("quiz", {}).get("quiz_items", [])),
-            "activity_steps": len(lesson_data.get("activity", {}).get("activity", {}).get("steps", [])),
-            "udl_flags": len(lesson_data.get("udl", {}).get("flags", []))
-        }
-        
-        if previous_version:
-            changes = []
-            for key, current_value in current_version.items():
-                previous_value = previous_version.get(key, 0)
-                if current_value != previous_value:
-                    change = current_value - previous_value
-                    changes.append(f"{key}: {previous_value} → {current_value} ({change:+d})")
-        else:
-            changes = [f"Initial version with {value} {key}" for key, value in current_version.items()]
-        
-        change_log = {
-            "version": "1.0",
-            "timestamp": datetime.now().isoformat(),
-            "changes": changes,
-            "summary": f"Lesson updated with {len(changes)} modifications"
-        }
-        
-        return json.dumps(change_log)
+        return render_change_log(lesson_data, previous_version)
     except Exception as e:
         return f"Error generating change log: {str(e)}"
 
@@ -212,55 +188,49 @@ def create_exporter_agent() -> Agent:
         backstory="""You are an expert in educational technology and file management. 
         You understand the importance of creating organized, accessible, and secure 
         export packages that teachers can easily use in their classrooms.""",
-        tools=[generate_csv_grades, generate_bundle_zip, create_signed_url, generate_change_log],
+        tools=[generate_csv_grades, generate_bundle_zip, create_signed_urls, generate_change_log],
         verbose=True,
-        allow_delegation=False
+        allow_delegation=False,
+        llm=agent_pool.get_llm()
     )
 
 def export_lesson_materials(lesson_data: Dict[str, Any], export_files: Dict[str, Any]) -> Dict[str, Any]:
     """Export all lesson materials as files and bundles"""
     try:
-        exporter = create_exporter_agent()
-        
-        # Create tasks for export generation
-        csv_task = Task(
-            description="Generate CSV gradebook with student roster and assessment items",
-            agent=exporter,
-            expected_output="JSON structure for CSV gradebook"
-        )
-        
-        bundle_task = Task(
-            description="Generate a ZIP bundle containing all lesson materials",
-            agent=exporter,
-            expected_output="JSON structure for bundle ZIP"
-        )
-        
-        change_log_task = Task(
-            description="Generate a change log for lesson modifications",
-            agent=exporter,
-            expected_output="JSON structure for change log"
-        )
-        
-        # Create crew and execute
-        crew = Crew(
-            agents=[exporter],
-            tasks=[csv_task, bundle_task, change_log_task],
-            verbose=True
-        )
-        
-        result = crew.kickoff()
-        
-        # Generate signed URLs for each export file
-        signed_urls = {}
-        for file_type, content in export_files.items():
-            if content:
-                signed_urls[file_type] = create_signed_url(f"exports/{file_type}")
+        with agent_pool.acquire("exporter", create_exporter_agent) as exporter:
+            # Create tasks for export generation
+            csv_task = Task(
+                description="Generate CSV gradebook with student roster and assessment items",
+                agent=exporter,
+                expected_output="JSON structure for CSV gradebook"
+            )
+            
+            bundle_task = Task(
+                description="Generate a ZIP bundle containing all lesson materials",
+                agent=exporter,
+                expected_output="JSON structure for bundle ZIP"
+            )
+            
+            change_log_task = Task(
+                description="Generate a change log for lesson modifications",
+                agent=exporter,
+                expected_output="JSON structure for change log"
+            )
+            
+            # Create crew and execute
+            crew = Crew(
+                agents=[exporter],
+                tasks=[csv_task, bundle_task, change_log_task],
+                verbose=True
+            )
+            
+            result = crew.kickoff()
         
         exports = {
             "csv_grades": result.get("csv_grades", ""),
             "bundle_zip": result.get("bundle_zip", ""),
             "change_log": result.get("change_log", ""),
-            "signed_urls": signed_urls,
+            "signed_urls": sign_export_urls(export_files),
             "status": "completed"
         }
         
@@ -1,6 +1,8 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
+
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
 
 def create_math_setter_agent():
     """Create the math setter agent"""
@@ -20,18 +22,12 @@ def create_math_setter_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def create_math_problems(topic: str, grade: str) -> dict:
     """Generate mathematical problem sets related to the lesson topic"""
     
-    agent = create_math_setter_agent()
-    
     task_description = f"""
     Create mathematical problem sets for a lesson on {topic} for grade {grade} students.
     
@@ -83,7 +79,8 @@ def create_math_problems(topic: str, grade: str) -> dict:
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("math_setter", create_math_setter_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
@@ -1,6 +1,8 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
+
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
 
 def create_objective_writer_agent():
     """Create the objective writer agent"""
@@ -17,18 +19,12 @@ def create_objective_writer_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def write_objectives(brief_data: dict) -> dict:
     """Generate objectives and success criteria for a lesson"""
     
-    agent = create_objective_writer_agent()
-    
     task_description = f"""
     Create learning objectives and success criteria for a lesson on {brief_data['topic']} 
     for grade {brief_data['gradeBand']} students.
@@ -63,7 +59,8 @@ def write_objectives(brief_data: dict) -> dict:
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("objective_writer", create_objective_writer_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
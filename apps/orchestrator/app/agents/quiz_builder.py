@@ -1,67 +1,122 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
 from typing import Dict, List, Any, Tuple
 
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
+
+REQUIRED_ITEM_FIELDS = ("type", "question", "correct_answer", "explanation", "points", "difficulty")
+VALID_DIFFICULTIES = ["easy", "medium", "hard"]
+
+def _check_mcq(item: Dict[str, Any], errors: List[str]):
+    if "options" not in item:
+        errors.append("MCQ items must have options")
+    elif not isinstance(item["options"], list):
+        errors.append("MCQ options must be a list")
+    elif len(item["options"]) < 3:
+        errors.append("MCQ items must have at least 3 choices")
+    elif item["correct_answer"] not in item["options"]:
+        errors.append("Correct answer must be in options")
+
+def _check_multi_select(item: Dict[str, Any], errors: List[str]):
+    if "options" not in item:
+        errors.append("Multi-select items must have options")
+    elif not isinstance(item["options"], list):
+        errors.append("Multi-select options must be a list")
+    elif len(item["options"]) < 3:
+        errors.append("Multi-select items must have at least 3 choices")
+    elif not isinstance(item["correct_answer"], list):
+        errors.append("Multi-select correct answer must be a list")
+    elif not all(answer in item["options"] for answer in item["correct_answer"]):
+        errors.append("All correct answers must be in options")
+
+def _check_numeric(item: Dict[str, Any], errors: List[str]):
+    if "tolerance" not in item:
+        errors.append("Numeric items must have tolerance")
+    elif not isinstance(item["tolerance"], (int, float)) or item["tolerance"] < 0:
+        errors.append("Tolerance must be non-negative")
+
+def _check_short_answer(item: Dict[str, Any], errors: List[str]):
+    if not isinstance(item["correct_answer"], list):
+        errors.append("Short answer correct answer must be a list")
+    elif len(item["correct_answer"]) == 0:
+        errors.append("Short answer must have at least one correct answer")
+
+# Type-specific checks, looked up once per item instead of walking an if/elif chain
+ITEM_TYPE_VALIDATORS = {
+    "mcq": _check_mcq,
+    "multi_select": _check_multi_select,
+    "numeric": _check_numeric,
+    "short_answer": _check_short_answer,
+}
+VALID_ITEM_TYPES = list(ITEM_TYPE_VALIDATORS)
+
 def validate_quiz_item(item: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """Validate a quiz item"""
-    errors = []
+    if not isinstance(item, dict):
+        return False, [f"Item must be an object, got {type(item).__name__}"]
     
     # Required fields
-    required_fields = ["type", "question", "correct_answer", "explanation", "points", "difficulty"]
-    for field in required_fields:
-        if field not in item:
-            errors.append(f"Missing required field: {field}")
-    
+    errors = [f"Missing required field: {field}" for field in REQUIRED_ITEM_FIELDS if field not in item]
     if errors:
         return False, errors
     
     # Validate type
-    valid_types = ["mcq", "multi_select", "numeric", "short_answer"]
-    if item["type"].lower() not in valid_types:
-        errors.append(f"Invalid type: {item['type']}. Must be one of {valid_types}")
+    item_type = item["type"].lower() if isinstance(item["type"], str) else None
+    type_validator = ITEM_TYPE_VALIDATORS.get(item_type)
+    if type_validator is None:
+        errors.append(f"Invalid type: {item['type']}. Must be one of {VALID_ITEM_TYPES}")
     
     # Validate difficulty
-    valid_difficulties = ["easy", "medium", "hard"]
-    if item["difficulty"].lower() not in valid_difficulties:
-        errors.append(f"Invalid difficulty: {item['difficulty']}. Must be one of {valid_difficulties}")
+    difficulty = item["difficulty"].lower() if isinstance(item["difficulty"], str) else None
+    if difficulty not in VALID_DIFFICULTIES:
+        errors.append(f"Invalid difficulty: {item['difficulty']}. Must be one of {VALID_DIFFICULTIES}")
     
     # Validate points
     if not isinstance(item["points"], (int, float)) or item["points"] <= 0:
         errors.append("Points must be greater than 0")
     
     # Type-specific validation
-    if item["type"].lower() == "mcq":
-        if "options" not in item:
-            errors.append("MCQ items must have options")
-        elif len(item["options"]) < 3:
-            errors.append("MCQ items must have at least 3 choices")
-        elif item["correct_answer"] not in item["options"]:
-            errors.append("Correct answer must be in options")
+    if type_validator is not None:
+        type_validator(item, errors)
     
-    elif item["type"].lower() == "multi_select":
-        if "options" not in item:
-            errors.append("Multi-select items must have options")
-        elif len(item["options"]) < 3:
-            errors.append("Multi-select items must have at least 3 choices")
-        elif not isinstance(item["correct_answer"], list):
-            errors.append("Multi-select correct answer must be a list")
-        elif not all(answer in item["options"] for answer in item["correct_answer"]):
-            errors.append("All correct answers must be in options")
+    return len(errors) == 0, errors
+
+def validate_quiz_items(items: List[Dict[str, Any]], fail_fast: bool = False) -> Dict[str, Any]:
+    """Validate an item bank in one call
     
-    elif item["type"].lower() == "numeric":
-        if "tolerance" not in item:
-            errors.append("Numeric items must have tolerance")
-        elif not isinstance(item["tolerance"], (int, float)) or item["tolerance"] < 0:
-            errors.append("Tolerance must be non-negative")
+    Errors come back as columns (index, item_id, type, message), one row per
+    error, so large reports stay compact and easy to tabulate. With
+    ``fail_fast`` validation stops at the first invalid item.
+    """
+    columns = {"index": [], "item_id": [], "type": [], "message": []}
+    checked = 0
+    invalid = 0
     
-    elif item["type"].lower() == "short_answer":
-        if not isinstance(item["correct_answer"], list):
-            errors.append("Short answer correct answer must be a list")
-        elif len(item["correct_answer"]) == 0:
-            errors.append("Short answer must have at least one correct answer")
+    for index, item in enumerate(items):
+        checked += 1
+        is_valid, errors = validate_quiz_item(item)
+        if is_valid:
+            continue
+        
+        invalid += 1
+        fields = item if isinstance(item, dict) else {}
+        for message in errors:
+            columns["index"].append(index)
+            columns["item_id"].append(fields.get("id"))
+            columns["type"].append(fields.get("type"))
+            columns["message"].append(message)
+        
+        if fail_fast:
+            break
     
-    return len(errors) == 0, errors
+    return {
+        "valid": invalid == 0,
+        "total_items": len(items),
+        "checked_items": checked,
+        "invalid_items": invalid,
+        "errors": columns
+    }
 
 def validate_rubric(rubric: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """Validate a rubric"""
@@ -116,18 +171,12 @@ def create_quiz_builder_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def build_quiz(topic: str, grade: str, objectives: list, duration: int) -> dict:
     """Generate quiz items for a lesson"""
     
-    agent = create_quiz_builder_agent()
-    
     objectives_text = "\n".join([f"- {obj['description']}" for obj in objectives])
     
     task_description = f"""
@@ -191,7 +240,8 @@ def build_quiz(topic: str, grade: str, objectives: list, duration: int) -> dict:
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("quiz_builder", create_quiz_builder_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
@@ -1,42 +1,14 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
+from app.services.time_allocation import allocate_sections
 from typing import Dict, List, Any, Tuple
 
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
+
 def allocate_time(sections: List[Dict[str, Any]], total_time: int) -> List[Dict[str, Any]]:
-    """Allocate time to sections based on priority"""
-    if not sections:
-        return []
-    
-    # Define priority weights
-    priority_weights = {
-        "high": 3,
-        "medium": 2,
-        "low": 1
-    }
-    
-    # Calculate total weight
-    total_weight = sum(priority_weights.get(section.get("priority", "medium"), 2) for section in sections)
-    
-    # Allocate time proportionally
-    result = []
-    remaining_time = total_time
-    
-    for i, section in enumerate(sections):
-        weight = priority_weights.get(section.get("priority", "medium"), 2)
-        if i == len(sections) - 1:
-            # Last section gets remaining time
-            duration = remaining_time
-        else:
-            duration = max(1, int((weight / total_weight) * total_time))
-            remaining_time -= duration
-        
-        result.append({
-            **section,
-            "duration": duration
-        })
-    
-    return result
+    """Allocate time to sections by priority, within each section's min/max duration"""
+    return allocate_sections(sections, total_time)
 
 def validate_time_budget(sections: List[Dict[str, Any]], total_time: int) -> Tuple[bool, str]:
     """Validate that sections fit within time budget"""
@@ -67,18 +39,12 @@ def create_sequence_planner_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def plan_sequence(brief_data: dict, objectives: list) -> dict:
     """Generate a detailed lesson sequence with timing"""
     
-    agent = create_sequence_planner_agent()
-    
     objectives_text = "\n".join([f"- {obj['description']}" for obj in objectives])
     
     task_description = f"""
@@ -122,7 +88,8 @@ def plan_sequence(brief_data: dict, objectives: list) -> dict:
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("sequence_planner", create_sequence_planner_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
@@ -1,6 +1,8 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from app.core.config import settings
+from app.core.agent_pool import agent_pool
+
+# Bump when the prompt template changes so cached stage results are invalidated
+PROMPT_VERSION = "1"
 
 def create_timeline_historian_agent():
     """Create the timeline historian agent"""
@@ -19,18 +21,12 @@ def create_timeline_historian_agent():
         verbose=True,
         allow_delegation=False,
         tools=[],
-        llm=ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        llm=agent_pool.get_llm()
     )
 
 def create_history_timeline(topic: str, grade: str) -> dict:
     """Generate historical timeline and connections for a topic"""
     
-    agent = create_timeline_historian_agent()
-    
     task_description = f"""
     Create a historical timeline and connections for a lesson on {topic} for grade {grade} students.
     
@@ -73,7 +69,8 @@ def create_history_timeline(topic: str, grade: str) -> dict:
     }}
     """
     
-    result = agent.execute(task_description)
+    with agent_pool.acquire("timeline_historian", create_timeline_historian_agent) as agent:
+        result = agent.execute(task_description)
     
     # TODO: Parse the result and return structured data
     return {
@@ -1,8 +1,18 @@
 from fastapi import APIRouter
 
+from app.core.agent_runner import agent_runner
+from app.core.agent_pool import agent_pool
+from app.services.stage_cache import stage_cache
+
 router = APIRouter()
 
 
 @router.get("/")
 async def health_check():
-    return {"status": "healthy", "service": "orchestrator"}
+    return {
+        "status": "healthy",
+        "service": "orchestrator",
+        "agents": agent_runner.stats(),
+        "agent_pool": agent_pool.health(),
+        "stage_cache": stage_cache.stats()
+    }
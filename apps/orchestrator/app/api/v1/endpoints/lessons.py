@@ -1,14 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
-from app.agents.objective_writer import write_objectives
-from app.agents.sequence_planner import plan_sequence
-from app.agents.quiz_builder import build_quiz
-from app.agents.activity_designer import design_activity
-from app.agents.timeline_historian import create_history_timeline
-from app.agents.math_setter import create_math_problems
-from app.agents.udl_checker import check_udl
-from app.services.export_service import export_service
+import asyncio
+import itertools
+import json
+import uuid
+from app.core.config import settings
+from app.services.lesson_pipeline import lesson_pipeline, PipelineError
+from app.services.lesson_jobs import lesson_job_service
+from app.services.websocket_service import stage_message, websocket_manager
 
 router = APIRouter()
 
@@ -31,82 +32,97 @@ class LessonResponse(BaseModel):
     udl: dict
     exports: dict
     status: str
+    generation_id: Optional[str] = None
 
 @router.post("/generate", response_model=LessonResponse)
-async def generate_lesson(brief_data: BriefData):
-    """Generate a complete lesson plan from brief data"""
+async def generate_lesson(brief_data: BriefData, client_id: Optional[str] = None):
+    """Generate a complete lesson plan from brief data
+
+    When ``client_id`` is given, each stage result is pushed to that client's
+    WebSocket connections as soon as it is ready.
+    """
+    generation_id = uuid.uuid4().hex
+    seq = itertools.count(1)
+    total = len(lesson_pipeline.order)
+
+    async def publish_stage(stage: str, result):
+        await websocket_manager.broadcast_to_client(client_id, stage_message(
+            stage, next(seq), result, total=total, generation_id=generation_id
+        ))
+
     try:
-        # Generate objectives
-        objectives_result = write_objectives(brief_data.dict())
-        
-        # Generate sequence
-        sequence_result = plan_sequence(brief_data.dict(), objectives_result["objectives"])
-        
-        # Generate quiz
-        quiz_result = build_quiz(
-            brief_data.topic,
-            brief_data.gradeBand,
-            objectives_result["objectives"],
-            brief_data.periodLength * brief_data.days
-        )
-        
-        # Generate activity
-        activity_result = design_activity(
-            brief_data.topic,
-            brief_data.gradeBand,
-            objectives_result["objectives"],
-            brief_data.equipment,
-            brief_data.periodLength * brief_data.days
-        )
-        
-        # Generate history timeline
-        history_result = create_history_timeline(
-            brief_data.topic,
-            brief_data.gradeBand
-        )
-        
-        # Generate math problems
-        math_result = create_math_problems(
-            brief_data.topic,
-            brief_data.gradeBand
-        )
-        
-        # Check UDL compliance
-        lesson_content = {
-            "topic": brief_data.topic,
-            "objectives": objectives_result["objectives"],
-            "activity": activity_result,
-            "quiz": quiz_result
-        }
-        udl_result = check_udl(lesson_content, brief_data.gradeBand)
-
-        # Generate exports
-        complete_lesson_data = {
-            "topic": brief_data.topic,
-            "objectives": objectives_result["objectives"],
-            "sequence": sequence_result,
-            "quiz": quiz_result,
-            "activity": activity_result,
-            "history": history_result,
-            "math": math_result,
-            "udl": udl_result
-        }
-        exports_result = export_service.generate_export_files(complete_lesson_data)
+        # Independent stages run concurrently; each joins on its declared inputs
+        results = await lesson_pipeline.run({"brief": brief_data.dict()}, on_stage_complete=publish_stage if client_id else None)
 
         return LessonResponse(
-            objectives=objectives_result["objectives"],
-            sequence=sequence_result,
-            quiz=quiz_result,
-            activity=activity_result,
-            history=history_result,
-            math=math_result,
-            udl=udl_result,
-            exports=exports_result,
-            status="completed"
+            objectives=results["objectives"],
+            sequence=results["sequence"],
+            quiz=results["quiz"],
+            activity=results["activity"],
+            history=results["history"],
+            math=results["math"],
+            udl=results["udl"],
+            exports=results["exports"],
+            status="completed",
+            generation_id=generation_id
         )
+    except PipelineError as e:
+        raise HTTPException(status_code=500, detail=f"Error generating lesson ({e.stage}): {str(e.error)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating lesson: {str(e)}")
 
+@router.post("/jobs", status_code=202)
+async def submit_lesson_job(brief_data: BriefData, client_id: Optional[str] = None):
+    """Queue lesson generation; stage results stream over WebSocket and SSE"""
+    if not settings.LESSON_JOBS_ENABLED:
+        raise HTTPException(status_code=503, detail="Lesson jobs are disabled")
+
+    try:
+        return await asyncio.to_thread(lesson_job_service.submit, brief_data.dict(), client_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error submitting lesson job: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_lesson_job(job_id: str):
+    """Poll a lesson job's status and completed stage results"""
+    snapshot = await asyncio.to_thread(lesson_job_service.snapshot, job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Lesson job not found")
+    return snapshot
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_lesson_job(job_id: str):
+    """Stream a lesson job's stage results as server-sent events"""
+    if await asyncio.to_thread(lesson_job_service.snapshot, job_id, False) is None:
+        raise HTTPException(status_code=404, detail="Lesson job not found")
+
+    async def events():
+        sent = set()
+        while True:
+            snapshot = await asyncio.to_thread(lesson_job_service.snapshot, job_id, False)
+            if snapshot is None:
+                # The job's state expired from the store while the client was streaming
+                payload = {"job_id": job_id, "status": "expired", "error": "Lesson job not found"}
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+                return
+
+            new_stages = [name for name in snapshot["completed_stages"] if name not in sent]
+            if new_stages:
+                values = await asyncio.to_thread(lesson_job_service.store.get_values, job_id, new_stages)
+                for name in new_stages:
+                    sent.add(name)
+                    payload = {"job_id": job_id, "stage": name, "data": values.get(name)}
+                    yield f"event: stage\ndata: {json.dumps(payload)}\n\n"
+
+            if snapshot["status"] in ("completed", "failed"):
+                payload = {"job_id": job_id, "status": snapshot["status"], "error": snapshot["error"]}
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+                return
+
+            await asyncio.sleep(settings.LESSON_JOB_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @router.get("/")
 async def get_lessons():
     return {"message": "Lessons endpoint - coming soon"}
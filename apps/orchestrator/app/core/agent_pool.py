@@ -0,0 +1,196 @@
+"""
+Process-wide registry of LLM clients and reusable agents.
+
+Building a ``crewai.Agent`` and a ``ChatOpenAI`` client per request opens a new
+HTTP connection pool (and TLS handshake) every time. The pool keeps one shared
+sync and async OpenAI client, each on a pooled ``httpx`` client, one chat model
+per model setting and a stack of idle agents per role so repeated requests
+reuse warm objects.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+
+AgentKey = Tuple[str, str, float]
+
+
+class AgentPool:
+    """Shares LLM clients and recycles agents keyed by role and model settings"""
+
+    def __init__(
+        self,
+        max_idle_per_role: int = 8,
+        max_connections: int = 50,
+        request_timeout: float = 120.0
+    ):
+        self.max_idle_per_role = max_idle_per_role
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client: Optional[openai.OpenAI] = None
+        self._async_openai_client: Optional[openai.AsyncOpenAI] = None
+        self._llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._idle: Dict[AgentKey, List[Any]] = {}
+        # Bumped whenever the clients are rebuilt so stale agents are dropped
+        self._generation = 0
+        self._stats = {"agents_created": 0, "agents_reused": 0, "agents_discarded": 0, "clients_created": 0}
+
+    def _get_clients(self) -> Tuple[openai.OpenAI, openai.AsyncOpenAI]:
+        """Return the shared OpenAI clients, replacing them if they have been closed"""
+        if (
+            self._http_client is None or self._http_client.is_closed
+            or self._async_http_client is None or self._async_http_client.is_closed
+        ):
+            self._close_clients()
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+            self._http_client = httpx.Client(limits=limits, timeout=self.request_timeout)
+            self._async_http_client = httpx.AsyncClient(limits=limits, timeout=self.request_timeout)
+            self._openai_client = openai.OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self._http_client
+            )
+            self._async_openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self._async_http_client
+            )
+            # Chat models and agents bound to the old client are stale
+            self._llms.clear()
+            self._idle.clear()
+            self._generation += 1
+            self._stats["clients_created"] += 1
+        return self._openai_client, self._async_openai_client
+
+    def get_llm(self, model: Optional[str] = None, temperature: Optional[float] = None) -> ChatOpenAI:
+        """Return the shared chat model for the given settings"""
+        model = model or settings.LLM_MODEL
+        temperature = settings.LLM_TEMPERATURE if temperature is None else temperature
+
+        with self._lock:
+            client, async_client = self._get_clients()
+            key = (model, temperature)
+            if key not in self._llms:
+                self._llms[key] = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    openai_api_key=settings.OPENAI_API_KEY,
+                    client=client.chat.completions,
+                    async_client=async_client.chat.completions
+                )
+            return self._llms[key]
+
+    @contextmanager
+    def acquire(
+        self,
+        role: str,
+        factory: Callable[[], Any],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[Any]:
+        """Check out an idle agent for a role, building one if none is free"""
+        key: AgentKey = (
+            role,
+            model or settings.LLM_MODEL,
+            settings.LLM_TEMPERATURE if temperature is None else temperature
+        )
+
+        agent = None
+        with self._lock:
+            generation = self._generation
+            idle = self._idle.get(key)
+            if idle:
+                agent = idle.pop()
+                self._stats["agents_reused"] += 1
+
+        if agent is None:
+            agent = factory()
+            with self._lock:
+                generation = self._generation
+                self._stats["agents_created"] += 1
+
+        try:
+            yield agent
+        except Exception:
+            # An agent whose call failed may hold broken executor state
+            with self._lock:
+                self._stats["agents_discarded"] += 1
+            raise
+        else:
+            self._release(key, agent, generation)
+
+    def _release(self, key: AgentKey, agent: Any, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                self._stats["agents_discarded"] += 1
+                return
+
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_role:
+                idle.append(agent)
+            else:
+                self._stats["agents_discarded"] += 1
+
+    def health(self) -> Dict[str, Any]:
+        """Report pool state for health checks"""
+        with self._lock:
+            client_open = self._http_client is not None and not self._http_client.is_closed
+            async_client_open = self._async_http_client is not None and not self._async_http_client.is_closed
+            return {
+                "status": "healthy" if client_open or self._http_client is None else "degraded",
+                "http_client_open": client_open,
+                "async_http_client_open": async_client_open,
+                "llm_clients": len(self._llms),
+                "idle_agents": {key[0]: len(agents) for key, agents in self._idle.items()},
+                **self._stats
+            }
+
+    def _close_clients(self):
+        """Close both HTTP clients; the async one is closed on the running loop if there is one"""
+        if self._http_client is not None:
+            self._http_client.close()
+        async_client, self._async_http_client = self._async_http_client, None
+        if async_client is not None and not async_client.is_closed:
+            try:
+                asyncio.get_running_loop().create_task(async_client.aclose())
+            except RuntimeError:
+                asyncio.run(async_client.aclose())
+        self._http_client = None
+        self._openai_client = None
+        self._async_openai_client = None
+
+    def close(self):
+        """Close the shared HTTP clients and drop every pooled object"""
+        with self._lock:
+            self._close_clients()
+            self._llms.clear()
+            self._idle.clear()
+            self._generation += 1
+
+    async def aclose(self):
+        """Close the pool from async code, waiting for the async HTTP client to close"""
+        with self._lock:
+            async_client, self._async_http_client = self._async_http_client, None
+        if async_client is not None:
+            await async_client.aclose()
+        self.close()
+
+
+# Global pool instance
+agent_pool = AgentPool(
+    max_idle_per_role=settings.AGENT_POOL_MAX_IDLE,
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    request_timeout=settings.AGENT_CALL_TIMEOUT_SECONDS
+)
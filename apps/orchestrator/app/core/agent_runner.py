@@ -0,0 +1,133 @@
+"""
+Async invocation layer for blocking agent calls.
+
+CrewAI agents and their LLM clients are synchronous. Calling them from an
+``async def`` endpoint stalls the event loop, so every agent call is offloaded
+to a bounded thread pool and awaited instead.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class AgentRunner:
+    """Runs blocking agent calls on a bounded thread pool"""
+
+    def __init__(self, max_concurrency: int, timeout: Optional[float] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="agent"
+                )
+            return self._executor
+
+    def _track(self, func: Callable[..., Any], on_start: Callable[[], None]) -> Any:
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        on_start()
+        try:
+            result = func()
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _dequeue(self, submitted: Future):
+        # A call cancelled while still queued never reaches _track
+        if submitted.cancelled():
+            with self._lock:
+                self._pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on the pool and await its result"""
+        executor = self._get_executor()
+        call = functools.partial(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def on_start():
+            try:
+                loop.call_soon_threadsafe(started.set)
+            except RuntimeError:
+                # The awaiting loop is already gone
+                pass
+
+        with self._lock:
+            self._pending += 1
+        try:
+            submitted = executor.submit(self._track, call, on_start)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        submitted.add_done_callback(self._dequeue)
+        future = asyncio.wrap_future(submitted)
+
+        if not self.timeout:
+            return await future
+
+        # The timeout covers execution only, not the wait for a free worker
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({future, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        # A timed-out call keeps its worker thread until the LLM client returns,
+        # but the request awaiting it is released immediately.
+        return await asyncio.wait_for(future, self.timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current pool usage"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "queued": self._pending,
+                "completed": self._completed,
+                "failed": self._failed
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global runner instance
+agent_runner = AgentRunner(
+    max_concurrency=settings.AGENT_MAX_CONCURRENCY,
+    timeout=settings.AGENT_CALL_TIMEOUT_SECONDS
+)
@@ -0,0 +1,30 @@
+from celery import Celery
+from app.core.config import settings
+
+# Stage tasks need the agent modules, so they run from the orchestrator codebase:
+#   celery -A app.core.celery_app worker --loglevel=info
+celery_app = Celery(
+    "ai-teachers-lounge-orchestrator",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.tasks.lesson_jobs", "app.tasks.export_jobs"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    task_track_started=True,
+    task_time_limit=30 * 60,  # 30 minutes
+    task_soft_time_limit=25 * 60,  # 25 minutes
+    task_default_queue=settings.LESSON_JOB_QUEUE,
+    # Run with `celery -A app.core.celery_app beat` to expire export artifacts
+    beat_schedule={
+        "collect-export-artifacts": {
+            "task": "exports.collect_garbage",
+            "schedule": settings.EXPORT_ARTIFACT_GC_INTERVAL_SECONDS,
+        },
+    },
+)
@@ -27,6 +27,47 @@ class Settings(BaseSettings):
     
     # OpenAI
     OPENAI_API_KEY: str = "your-openai-api-key"
+    LLM_MODEL: str = "gpt-4"
+    LLM_TEMPERATURE: float = 0.7
+    LLM_MAX_CONNECTIONS: int = 50
+    
+    # Agent execution
+    AGENT_MAX_CONCURRENCY: int = 16
+    AGENT_CALL_TIMEOUT_SECONDS: float = 300.0
+    AGENT_POOL_MAX_IDLE: int = 8
+    
+    # Stage result cache
+    STAGE_CACHE_ENABLED: bool = True
+    STAGE_CACHE_MAX_ENTRIES: int = 1024
+    STAGE_CACHE_TTL_SECONDS: int = 86400
+    STAGE_CACHE_REDIS_ENABLED: bool = False
+    
+    # Asynchronous lesson jobs (Celery)
+    LESSON_JOBS_ENABLED: bool = True
+    LESSON_JOB_QUEUE: str = "lessons"
+    LESSON_JOB_STORE: str = "redis"
+    LESSON_JOB_TTL_SECONDS: int = 86400
+    LESSON_JOB_POLL_INTERVAL_SECONDS: float = 0.5
+    
+    # WebSocket fan-out
+    WS_BROKER_BACKEND: str = "redis"  # redis, nats or memory (single node)
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_MAX_SLOW_STRIKES: int = 3
+    
+    # Exports
+    EXPORT_USE_LLM: bool = False
+    EXPORT_RENDER_PROCESSES: int = 0  # 0 renders inline
+    EXPORT_STORAGE_BACKEND: str = "local"  # local or s3
+    EXPORT_LOCAL_STORAGE_DIR: str = "./exports"
+    EXPORT_MULTIPART_PART_SIZE_MB: int = 8
+    EXPORT_ARTIFACT_GC_INTERVAL_SECONDS: int = 3600
+    EXPORT_ARTIFACT_GC_GRACE_SECONDS: int = 3600  # keep unreferenced blobs this young
+    
+    # Signed download URLs
+    SIGNED_URL_BASE: str = "https://storage.example.com"
+    URL_SIGNING_KEYS: str = ""  # kid:secret,kid:secret; empty signs with SECRET_KEY
+    URL_SIGNING_ACTIVE_KEY_ID: str = ""  # defaults to the first key
     
     # JWT
     SECRET_KEY: str = "your-secret-key"
@@ -0,0 +1,64 @@
+"""
+Bundled hazard lexicon for the hazard matcher.
+
+HAZARD_TERMS maps each term to its hazard category and severity. "high"
+terms make a material hazardous and call for full safety protocols;
+"medium" terms only raise the activity's safety level. Multi-word terms
+may be written with spaces, hyphens or underscores in material names.
+"""
+
+SEVERITY_LEVELS = ["low", "medium", "high"]
+
+HAZARD_TERMS = {
+    # Ignition and heat sources
+    "matches": ("ignition", "high"),
+    "lighter": ("ignition", "high"),
+    "fire": ("ignition", "high"),
+    "firework": ("ignition", "high"),
+    "flame": ("ignition", "high"),
+    "candle": ("ignition", "high"),
+    "bunsen burner": ("ignition", "high"),
+    "heat": ("heat", "high"),
+    "heat source": ("heat", "high"),
+    "hot plate": ("heat", "high"),
+    "hot glue": ("heat", "high"),
+    "boiling water": ("heat", "high"),
+    # Chemicals
+    "alcohol": ("chemical", "high"),
+    "ethanol": ("chemical", "high"),
+    "methanol": ("chemical", "high"),
+    "acetone": ("chemical", "high"),
+    "acid": ("chemical", "high"),
+    "base": ("chemical", "high"),
+    "bleach": ("chemical", "high"),
+    "ammonia": ("chemical", "high"),
+    "hydrogen peroxide": ("chemical", "high"),
+    "chemical": ("chemical", "high"),
+    "toxic": ("chemical", "high"),
+    "poison": ("chemical", "high"),
+    "corrosive": ("chemical", "high"),
+    "flammable": ("chemical", "high"),
+    "explosive": ("chemical", "high"),
+    "radioactive": ("chemical", "high"),
+    # Cutting tools
+    "sharp": ("sharp", "high"),
+    "blade": ("sharp", "high"),
+    "knife": ("sharp", "high"),
+    "knives": ("sharp", "high"),
+    "razor": ("sharp", "high"),
+    "box cutter": ("sharp", "high"),
+    "scissors": ("sharp", "medium"),
+    "pin": ("sharp", "medium"),
+    # Electrical
+    "electrical": ("electrical", "high"),
+    "voltage": ("electrical", "high"),
+    "mains power": ("electrical", "high"),
+    "battery": ("electrical", "medium"),
+    "batteries": ("electrical", "medium"),
+    "wire": ("electrical", "medium"),
+    "motor": ("electrical", "medium"),
+    "fan": ("electrical", "medium"),
+    # Measuring equipment
+    "thermometer": ("breakage", "medium"),
+    "glassware": ("breakage", "medium"),
+}
@@ -0,0 +1,85 @@
+"""
+Bundled word data for the readability engine.
+
+SYLLABLE_COUNTS holds dictionary syllable counts for words the spelling
+rules get wrong (silent letters, vowel hiatus, compound words), mostly
+from classroom science and maths vocabulary.
+
+FAMILIAR_POLYSYLLABLES lists words of three or more syllables that young
+readers know well; they are not counted as difficult words.
+"""
+
+SYLLABLE_COUNTS = {
+    # Vowel pairs spoken as two syllables
+    "area": 3, "idea": 3, "ideas": 3, "create": 2, "created": 3, "creates": 2, "creating": 3,
+    "creation": 3, "creative": 3, "creature": 2, "creatures": 2, "react": 2, "reacts": 2,
+    "reaction": 3, "reactions": 3, "reactor": 3, "reality": 4, "real": 1, "realize": 3,
+    "theater": 3, "theory": 3, "ocean": 2, "oceans": 2, "museum": 3, "science": 2,
+    "scientist": 3, "scientists": 3, "scientific": 4, "quiet": 2, "diet": 2, "poem": 2,
+    "poet": 2, "poetry": 3, "lion": 2, "violet": 3, "violent": 3, "radio": 3, "video": 3,
+    "videos": 3, "audio": 3, "piano": 3, "stereo": 3, "rodeo": 3, "patio": 3, "ratio": 3,
+    "ratios": 3, "period": 3, "periodic": 4, "material": 4, "materials": 4, "experience": 4,
+    "experiment": 4, "experiments": 4, "serious": 3, "curious": 3, "previous": 3,
+    "various": 3, "variable": 4, "variables": 4, "radius": 3, "radiation": 4, "radiant": 3,
+    "being": 2, "beings": 2, "seeing": 2, "going": 2, "doing": 2, "throwing": 2,
+    "flowing": 2, "growing": 2, "glowing": 2, "fluid": 2, "fluids": 2, "ruin": 2,
+    "cruel": 2, "fuel": 2, "fuels": 2, "duel": 2, "dual": 2, "usual": 3, "usually": 4,
+    "actual": 3, "actually": 4, "gradual": 3, "gradually": 4, "visual": 3, "individual": 5,
+    "annual": 3, "manual": 3, "situation": 4, "evaluate": 4, "graduate": 3, "february": 4,
+    "geography": 4, "geometry": 4, "geology": 4, "biology": 4, "biome": 2, "biomes": 2,
+    "diagram": 3, "diagrams": 3, "dialogue": 3, "diameter": 4, "dinosaur": 3, "dinosaurs": 3,
+    "giant": 2, "giants": 2, "client": 2, "society": 4, "anxiety": 4,
+    "variety": 4, "photoelectric": 5, "hydroelectric": 5, "neon": 2, "eon": 2, "eons": 2,
+    "audience": 3, "million": 2, "millions": 2, "billion": 2, "billions": 2, "onion": 2,
+    "opinion": 3, "opinions": 3, "champion": 3, "companion": 3, "union": 2,
+    # Silent or merged letters
+    "people": 2, "business": 2, "every": 3, "everyone": 4, "everything": 4, "different": 3,
+    "interesting": 4, "vegetable": 4, "vegetables": 4, "chocolate": 3, "favorite": 3,
+    "family": 3, "several": 3, "general": 3, "camera": 3, "separate": 3, "temperature": 4,
+    "average": 3, "beverage": 3, "comfortable": 4, "evening": 2, "wednesday": 2,
+    "sometimes": 2, "someone": 2, "something": 2, "somewhere": 2,
+    "whole": 1, "while": 1, "those": 1, "these": 1, "whose": 1, "house": 1, "houses": 2,
+    "phase": 1, "phases": 2, "surface": 2, "surfaces": 3, "change": 1, "changes": 2,
+    "changed": 1, "engine": 2, "engines": 2, "machine": 2, "machines": 2, "measure": 2,
+    "measured": 2, "measures": 2, "measurement": 3, "measurements": 3, "molecule": 3,
+    "molecules": 3, "particle": 3, "particles": 3, "circle": 2, "circles": 2, "cycle": 2,
+    "cycles": 2, "bicycle": 3, "simple": 2, "example": 3, "examples": 3, "table": 2,
+    "tables": 2, "sample": 2, "samples": 2, "little": 2, "middle": 2, "single": 2,
+    "triangle": 3, "triangles": 3, "rectangle": 3, "rectangles": 3, "angle": 2, "angles": 2,
+    "solar": 2, "sunlight": 2, "sunshine": 2, "homework": 2, "classroom": 2, "notebook": 2,
+    "worksheet": 2, "worksheets": 2, "lifetime": 2, "timeline": 2, "statement": 2,
+    "movement": 2, "movements": 2, "excitement": 3, "placement": 2, "therefore": 2,
+    "whatever": 3, "however": 3, "forever": 3, "moreover": 3, "nature": 2, "natural": 3,
+    "recipe": 3, "recipes": 3, "simile": 3, "apostrophe": 4, "catastrophe": 4,
+    "coyote": 3, "karate": 3, "acne": 2, "epitome": 4, "hyperbole": 4, "anemone": 4,
+}
+
+FAMILIAR_POLYSYLLABLES = frozenset("""
+    afternoon another anybody anything anywhere animal animals apartment banana bananas
+    basketball beautiful beginning bicycle blueberry butterfly calendar camera carefully
+    celebrate chocolate cinema company computer computers continue cucumber dangerous
+    dictionary difference different difficult dinosaur dinosaurs discover discovered
+    disappear easily eleven elephant elevator energy enormous envelope everybody
+    everyone everything everywhere example examples exercise experiment experiments
+    family favorite finally furniture gasoline generous government grandfather
+    grandmother hamburger happily happiness holiday holidays hospital however important
+    instrument interesting invitation january kangaroo ladybug library material
+    materials medicine memory microphone minimum maximum mosquito motorcycle museum
+    musical neighborhood newspaper nobody octopus official operate opposite orchestra
+    ordinary pajamas pepperoni period piano pineapple policeman popular potato potatoes
+    president probably radio remember restaurant sandwiches saturday seventeen several
+    sincerely somebody spaghetti strawberry suddenly supermarket telephone television
+    temperature terrible tomato tomatoes tomorrow together tornado understand underline
+    uniform universe usually vacation valentine vegetable vegetables video videos violin
+    volcano volcanoes wonderful yesterday electric electricity energies gravity oxygen
+    dioxide activity activities already area idea ideas buffalo cafeteria calculator
+    caterpillar celebration character characters community continent continents
+    crocodile customer decorate deliver delivery detective direction directions
+    discovery eagerly education emerald everyday exactly excited exciting factory
+    gorilla graduation history hurricane imagine impossible information invention
+    inventor investigate kilogram kilometer lemonade magazine magical melody mineral
+    minerals natural original percentage personal photograph physical position possible
+    powerful practical recycle recycling rectangle regular scientist scientists
+    sentences signature similar skeleton solution solutions summary sunflower surprising
+    syllable telescope triangle unusual unusually vitamin whenever wherever whatever
+""".split())
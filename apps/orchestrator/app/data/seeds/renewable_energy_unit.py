@@ -387,7 +387,7 @@ RENEWABLE_ENERGY_UNIT = {
                     "generated_at": "2024-08-26T03:15:00Z",
                     "version": "1.0",
                     "file_count": 6,
-                    "total_size_estimate": 2048576,
+                    "total_size": 2048576,
                     "expires_at": "2024-09-25T03:15:00Z"
                 },
                 "status": "completed"
@@ -770,7 +770,7 @@ RENEWABLE_ENERGY_UNIT = {
                     "generated_at": "2024-08-26T03:20:00Z",
                     "version": "1.0",
                     "file_count": 6,
-                    "total_size_estimate": 2150400,
+                    "total_size": 2150400,
                     "expires_at": "2024-09-25T03:20:00Z"
                 },
                 "status": "completed"
@@ -0,0 +1,127 @@
+"""
+Bundled grade-banded vocabulary for the vocabulary index.
+
+Each band lists word lemmas roughly from most to least frequent in
+school texts; a word belongs to the lowest band that lists it. FUNCTION_WORDS
+are skipped when measuring vocabulary load, and IRREGULAR_FORMS maps
+inflections the suffix rules cannot undo back to their lemma.
+"""
+
+GRADE_BANDS = ["K-2", "3-5", "6-8", "9-12"]
+
+# Lowest grade of each band, in GRADE_BANDS order
+BAND_START_GRADES = [0, 3, 6, 9]
+
+BAND_WORDS = {
+    "K-2": """
+        go see look come make play run jump help find say get give take put sit eat
+        like want know think can will have do be ride walk sing read write draw
+        open close stop start stand live work call ask tell show try use need feel
+        keep hold grow build fall fly swim sleep wash cook buy sell pick pull push
+        cut bring carry catch throw kick drop move turn hide wait wish laugh cry
+        day night sun moon star sky rain snow wind tree flower grass leaf seed plant
+        water fire rock sand dirt hill river lake sea ocean park farm home house
+        room door window bed table chair box cup bag ball toy book paper pen game
+        dog cat bird fish cow pig horse duck hen frog bug bee ant bear fox mouse
+        man woman boy girl baby mom dad mother father sister brother friend family
+        teacher student child people school class group team name word picture color story
+        hand foot head eye ear nose mouth face hair arm leg back body
+        red blue green yellow black white brown pink orange purple
+        big small little long short tall hot cold warm cool fast slow good bad new
+        old happy sad funny nice pretty clean dirty wet dry hard soft full empty
+        light dark loud quiet high low near far first last next same different
+        one two three four five six seven eight nine ten hundred many more most
+        some every each all few lot part half top bottom side end way time year
+        morning afternoon today tomorrow yesterday week month
+        food apple milk bread egg cake candy juice lunch dinner breakfast
+        car bus train truck boat ship road street city town store
+        shape circle square line dot size number count add letter sound song
+        very too also again always never now then soon here there still just
+    """,
+    "3-5": """
+        energy heat power solar sunlight shadow temperature weather season climate
+        earth planet space orbit gravity magnet force motion speed distance
+        measure length weight mass volume area perimeter fraction decimal equal
+        total amount estimate compare pattern graph chart table data result
+        question answer explain describe observe predict record test check
+        experiment material object tool model design problem solution idea
+        example reason fact detail information sentence paragraph chapter
+        plant animal habitat food chain insect mammal reptile fossil root stem
+        soil mineral metal liquid solid gas matter melt freeze boil
+        electricity battery circuit wire bulb switch machine engine fuel
+        oven foil cardboard plastic glass wood metal rubber cloth
+        country state history government community citizen vote law
+        map north south east west direction travel trade explore discover
+        invent invention inventor tradition culture holiday celebrate
+        partner role leader member share discuss agree decide choose prepare
+        safe safety careful danger protect rule step process order sort
+        absorb reflect shine trap collect gather build create change grow
+        surface center edge layer bottom piece section group set list
+        important different similar special usual simple easy difficult
+        natural human local public main whole certain possible
+    """,
+    "6-8": """
+        analyze evaluate investigate hypothesis variable evidence conclusion
+        data procedure accuracy precision trial constant control factor
+        renewable resource environment ecosystem population organism species
+        cell tissue organ system molecule atom element compound mixture
+        chemical reaction physical property density pressure conduction
+        convection radiation insulation efficiency transfer transform
+        kinetic potential thermal electrical mechanical generate generator
+        turbine panel voltage current circuit conductor insulator
+        ratio proportion percent rate expression equation function graph
+        coordinate integer exponent probability statistics median average
+        civilization empire revolution economy industry industrial colony
+        primary secondary source perspective argument claim counterclaim
+        summarize interpret infer identify classify distinguish illustrate
+        impact consequence effect cause influence benefit advantage
+        sustainable pollution emission carbon fossil climate atmosphere
+        structure function feature characteristic component method strategy
+        require involve provide produce reduce increase decrease maintain
+    """,
+    "9-12": """
+        facilitate utilize utilization conversion synthesize synthesis
+        photovoltaic electromagnetic thermodynamic quantum phenomenon
+        mitochondria metabolism enzyme catalyst equilibrium oxidation
+        derivative integral logarithm asymptote polynomial vector matrix
+        hypothesize corroborate extrapolate interpolate quantify correlate
+        methodology paradigm framework infrastructure implementation
+        subsequently consequently nevertheless notwithstanding whereby
+        substantial significant comprehensive fundamental theoretical
+        empirical intrinsic extrinsic inherent ambiguous coherent
+        sovereignty legislation jurisdiction constitutional amendment
+        socioeconomic demographic geopolitical ideology bureaucracy
+        mitigate exacerbate optimize maximize minimize allocate
+        differentiate integrate articulate advocate critique
+    """,
+}
+
+FUNCTION_WORDS = frozenset("""
+    a an the and or but nor so yet if then than that this these those there here
+    of to in on at by for from with into onto through over under about above below
+    between among after before during until since while as like per via
+    is am are was were be been being do does did doing have has had having
+    will would shall should can could may might must
+    i me my mine we us our ours you your yours he him his she her hers it its
+    they them their theirs who whom whose which what when where why how
+    not no yes all any both each either neither some such own same other
+    very too also just only even still up down out off again once
+""".split())
+
+IRREGULAR_FORMS = {
+    "ran": "run", "sat": "sit", "went": "go", "gone": "go", "saw": "see", "seen": "see",
+    "came": "come", "made": "make", "said": "say", "got": "get", "gave": "give",
+    "given": "give", "took": "take", "taken": "take", "ate": "eat", "eaten": "eat",
+    "rode": "ride", "wrote": "write", "written": "write", "drew": "draw", "drawn": "draw",
+    "knew": "know", "known": "know", "thought": "think", "told": "tell", "felt": "feel",
+    "kept": "keep", "held": "hold", "grew": "grow", "grown": "grow", "built": "build",
+    "fell": "fall", "fallen": "fall", "flew": "fly", "flown": "fly", "swam": "swim",
+    "slept": "sleep", "bought": "buy", "sold": "sell", "brought": "bring",
+    "caught": "catch", "threw": "throw", "thrown": "throw", "stood": "stand",
+    "children": "child", "men": "man", "women": "woman", "feet": "foot", "mice": "mouse",
+    "teeth": "tooth", "geese": "goose", "leaves": "leaf", "lives": "life", "wolves": "wolf",
+    "phenomena": "phenomenon", "criteria": "criterion", "analyses": "analysis",
+    "hypotheses": "hypothesis", "bacteria": "bacterium", "better": "good", "best": "good",
+    "worse": "bad", "worst": "bad", "chose": "choose", "chosen": "choose", "froze": "freeze",
+    "frozen": "freeze", "shone": "shine", "began": "begin", "begun": "begin",
+}
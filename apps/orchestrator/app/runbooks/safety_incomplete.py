@@ -5,6 +5,7 @@ Handles scenarios where safety protocols are missing or incomplete
 """
 
 from typing import Dict, List, Any, Tuple
+from app.services.hazard_matcher import hazard_matcher
 
 class SafetyIncompleteHandler:
     """Handles incomplete safety protocol scenarios"""
@@ -71,19 +72,7 @@ class SafetyIncompleteHandler:
     
     def _determine_safety_level(self, materials: List[str]) -> str:
         """Determine safety level based on materials"""
-        material_text = " ".join(materials).lower()
-        
-        # Check for high-risk materials
-        high_risk_keywords = ["heat", "fire", "flame", "chemical", "acid", "base", "sharp", "blade", "electrical", "voltage"]
-        if any(keyword in material_text for keyword in high_risk_keywords):
-            return "high"
-        
-        # Check for medium-risk materials
-        medium_risk_keywords = ["scissors", "thermometer", "fan", "motor", "battery", "wire"]
-        if any(keyword in material_text for keyword in medium_risk_keywords):
-            return "medium"
-        
-        return "low"
+        return hazard_matcher.match_materials(materials)["max_severity"]
     
     def _generate_safety_recommendations(self, issues: List[Dict[str, Any]], safety_level: str, materials: List[str]) -> List[Dict[str, Any]]:
         """Generate safety recommendations"""
@@ -6,6 +6,7 @@ Handles scenarios where lesson sections exceed allocated time
 
 from typing import Dict, List, Any, Tuple
 from app.agents.sequence_planner import allocate_time, validate_time_budget
+from app.services.time_allocation import allocate_days, solve_allocation
 
 class TimeBudgetOverrunHandler:
     """Handles time budget overrun scenarios"""
@@ -126,60 +127,25 @@ class TimeBudgetOverrunHandler:
     
     def auto_rebalance(self, sections: List[Dict[str, Any]], total_time: int) -> List[Dict[str, Any]]:
         """Automatically rebalance sections to fit time budget"""
-        # Sort sections by priority (high priority first)
-        priority_order = {"high": 3, "medium": 2, "low": 1}
-        sorted_sections = sorted(
-            sections, 
-            key=lambda x: priority_order.get(x.get("priority", "medium"), 2),
-            reverse=True
-        )
-        
-        # Calculate total weight for proportional allocation
-        total_weight = sum(priority_order.get(section.get("priority", "medium"), 2) for section in sorted_sections)
-        
-        # Allocate time proportionally, ensuring we don't exceed total_time
-        remaining_time = total_time
+        # Sections keep their lesson order; only durations change
         rebalanced_sections = []
-        
-        for i, section in enumerate(sorted_sections):
-            weight = priority_order.get(section.get("priority", "medium"), 2)
-            
-            if i == len(sorted_sections) - 1:
-                # Last section gets remaining time
-                allocated_duration = remaining_time
-            else:
-                # Proportional allocation
-                allocated_duration = max(1, int((weight / total_weight) * total_time * 0.9))  # 90% to leave buffer
-                remaining_time -= allocated_duration
-            
-            rebalanced_section = {
+        for section, allocated_duration in zip(sections, solve_allocation(sections, total_time)["durations"]):
+            rebalanced_sections.append({
                 **section,
                 "duration": allocated_duration,
                 "original_duration": section.get("duration", 0),
                 "adjustment": allocated_duration - section.get("duration", 0)
-            }
-            rebalanced_sections.append(rebalanced_section)
+            })
         
         return rebalanced_sections
     
     def suggest_split_lesson(self, sections: List[Dict[str, Any]], total_time: int) -> Dict[str, Any]:
         """Suggest how to split a lesson into multiple days"""
-        # Group sections by logical flow
-        day1_sections = []
-        day2_sections = []
-        
-        # Simple heuristic: first half goes to day 1, second half to day 2
-        midpoint = len(sections) // 2
-        
-        for i, section in enumerate(sections):
-            if i < midpoint:
-                day1_sections.append(section)
-            else:
-                day2_sections.append(section)
-        
-        # Calculate time for each day
-        day1_time = sum(section.get("duration", 0) for section in day1_sections)
-        day2_time = sum(section.get("duration", 0) for section in day2_sections)
+        # Consecutive runs of sections sharing the lesson's time, half of it per day
+        plan = allocate_days(sections, [total_time - total_time // 2, total_time // 2])
+        day1, day2 = plan["days"]
+        day1_sections, day2_sections = day1["sections"], day2["sections"]
+        day1_time, day2_time = day1["allocated"], day2["allocated"]
         
         return {
             "split_recommended": True,
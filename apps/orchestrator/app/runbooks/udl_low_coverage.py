@@ -136,7 +136,7 @@ class UDLLowCoverageHandler:
                     "strategy": f"add_{principle}_support",
                     "description": f"Add {principle} support to lesson materials",
                     "priority": "medium",
-                    "implementation": self._get_principle_implementation(principle)
+                    "implementation": self.get_principle_implementation(principle)
                 })
             
             elif issue["type"] == "reading_level":
@@ -173,7 +173,7 @@ class UDLLowCoverageHandler:
         
         return recommendations
     
-    def _get_principle_implementation(self, principle: str) -> List[str]:
+    def get_principle_implementation(self, principle: str) -> List[str]:
         """Get implementation suggestions for UDL principles"""
         implementations = {
             "representation": [
@@ -0,0 +1,237 @@
+"""
+Content-addressed store for rendered export files.
+
+Each file is stored once as a blob keyed by the SHA-256 of its bytes, so
+identical renders (shared templates, unchanged formats across versions)
+are uploaded once. A manifest per lesson version maps file names to blob
+digests and carries the export's ``expires_at``.
+
+Blob reference counts are derived from the live manifests when garbage is
+collected rather than kept in a shared counter, so concurrent exporters on
+different replicas never race on a read-modify-write. Reusing an existing
+blob refreshes its modification time, and blobs modified within a grace
+period are kept. That covers both fresh uploads and reused blobs whose
+manifest is not written yet; GC re-reads a blob's modification time right
+before deleting it, so a reuse after its listing is still honored.
+
+Streamed artifacts such as the ZIP bundle are not known up front, so they
+are written to a staging key while being hashed and then moved under
+their digest (or dropped, when that blob already exists). Manifests
+reference them like any other file; staging objects left behind by a
+crashed writer are collected once they outlive the grace period.
+"""
+
+import hashlib
+import io
+import json
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.object_storage import ObjectStorage, SizedSink, object_storage
+from app.services.stage_cache import canonical_json
+
+ARTIFACT_CONTENT_TYPES = {
+    "pack_pdf": "application/json",
+    "worksheets_docx": "application/json",
+    "quiz_pdf": "application/json",
+    "csv_grades": "application/json",
+    "change_log": "application/json",
+    "slides_mdx": "text/markdown; charset=utf-8",
+}
+
+
+def lesson_id_for(lesson_data: Dict[str, Any]) -> str:
+    """Return the lesson's own id, or a new one for a lesson that has none yet
+
+    Ids identify one teacher's lesson (export channels, manifests), so they
+    are never derived from content; lessons on the same topic stay apart.
+    """
+    if lesson_data.get("lesson_id"):
+        return str(lesson_data["lesson_id"])
+    return uuid.uuid4().hex
+
+
+def lesson_version_for(fingerprint: Dict[str, Any]) -> str:
+    """Return a content version for a lesson fingerprint"""
+    return hashlib.sha256(canonical_json(fingerprint["sections"]).encode("utf-8")).hexdigest()[:16]
+
+
+class _HashingSink(SizedSink):
+    """Forwards writes to a storage writer while hashing them"""
+
+    def __init__(self, target: io.RawIOBase):
+        super().__init__()
+        self.target = target
+        self.hash = hashlib.sha256()
+
+    def _write(self, data) -> int:
+        self.hash.update(data)
+        return self.target.write(data)
+
+
+class ArtifactStore:
+    """Deduplicated blobs plus per-version manifests on an object storage backend"""
+
+    def __init__(self, storage: ObjectStorage, prefix: str = "artifacts", gc_grace_seconds: int = 3600):
+        self.storage = storage
+        self.prefix = prefix.rstrip("/")
+        self.gc_grace_seconds = gc_grace_seconds
+
+    def blob_key(self, digest: str) -> str:
+        return f"{self.prefix}/blobs/{digest[:2]}/{digest}"
+
+    def manifest_key(self, lesson_id: str, version: str) -> str:
+        return f"{self.prefix}/manifests/{lesson_id}/{version}.json"
+
+    def put_blob(self, data: Union[str, bytes], content_type: str = "application/octet-stream") -> Dict[str, Any]:
+        """Store content under its digest; an existing blob is only touched, not re-uploaded"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()
+        key = self.blob_key(digest)
+        # Touching restarts the GC grace period until the manifest referencing the blob is written
+        uploaded = not self.storage.touch(key)
+        size = self.storage.put_bytes(key, data, content_type) if uploaded else len(data)
+
+        return {"digest": digest, "size": size, "storage_key": key, "uploaded": uploaded}
+
+    def write_blob(
+        self,
+        write: Callable[[io.RawIOBase], Any],
+        content_type: str = "application/octet-stream"
+    ) -> Tuple[Dict[str, Any], Any]:
+        """Stream content of unknown digest into the store
+
+        ``write`` is called with a write-only stream; the blob entry is
+        returned together with whatever ``write`` returned.
+        """
+        staging_key = f"{self.prefix}/staging/{uuid.uuid4().hex}"
+        with self.storage.open_writer(staging_key, content_type) as writer:
+            sink = _HashingSink(writer)
+            result = write(sink)
+
+        digest = sink.hash.hexdigest()
+        key = self.blob_key(digest)
+        uploaded = not self.storage.touch(key)
+        if uploaded:
+            self.storage.move(staging_key, key)
+        else:
+            self.storage.delete(staging_key)
+
+        blob = {"digest": digest, "size": sink.bytes_written, "storage_key": key, "uploaded": uploaded}
+        return blob, result
+
+    def get_blob(self, digest: str) -> bytes:
+        with self.storage.open_reader(self.blob_key(digest)) as reader:
+            return reader.read()
+
+    def store_version(
+        self,
+        lesson_id: str,
+        version: str,
+        files: Dict[str, Any],
+        expires_at: str
+    ) -> Dict[str, Any]:
+        """Store a version's files as blobs and write its manifest
+
+        Text/bytes files are stored here; dicts carrying a ``digest`` are
+        blobs already written with ``write_blob`` and are only referenced.
+        """
+        entries = {}
+        uploaded_bytes = 0
+        for name, content in files.items():
+            if name in ("status", "error"):
+                continue
+
+            if isinstance(content, (str, bytes)):
+                blob = self.put_blob(content, ARTIFACT_CONTENT_TYPES.get(name, "application/octet-stream"))
+                uploaded = blob.pop("uploaded")
+            elif isinstance(content, dict) and "digest" in content:
+                blob = {key: content[key] for key in ("digest", "size", "storage_key")}
+                uploaded = bool(content.get("uploaded"))
+            else:
+                continue
+
+            if uploaded:
+                uploaded_bytes += blob["size"]
+            entries[name] = blob
+
+        manifest = {
+            "lesson_id": lesson_id,
+            "version": version,
+            "created_at": datetime.now().isoformat(),
+            "expires_at": expires_at,
+            "files": entries
+        }
+        key = self.manifest_key(lesson_id, version)
+        self.storage.put_bytes(key, json.dumps(manifest).encode("utf-8"), "application/json")
+
+        return {
+            "manifest_key": key,
+            "files": entries,
+            "uploaded_bytes": uploaded_bytes,
+            "deduplicated_bytes": sum(entry["size"] for entry in entries.values()) - uploaded_bytes
+        }
+
+    def load_manifest(self, lesson_id: str, version: str) -> Optional[Dict[str, Any]]:
+        key = self.manifest_key(lesson_id, version)
+        if not self.storage.exists(key):
+            return None
+        with self.storage.open_reader(key) as reader:
+            return json.loads(reader.read())
+
+    def collect_garbage(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Drop expired manifests, then every old-enough blob no live manifest references"""
+        now = now or datetime.now()
+        refcounts: Counter = Counter()
+        expired_manifests = 0
+
+        for item in list(self.storage.list_objects(f"{self.prefix}/manifests/")):
+            with self.storage.open_reader(item["key"]) as reader:
+                manifest = json.loads(reader.read())
+            if datetime.fromisoformat(manifest["expires_at"]) <= now:
+                self.storage.delete(item["key"])
+                expired_manifests += 1
+                continue
+            refcounts.update(entry["digest"] for entry in manifest["files"].values())
+
+        deleted_blobs = 0
+        freed_bytes = 0
+        cutoff = time.time() - self.gc_grace_seconds
+        for item in list(self.storage.list_objects(f"{self.prefix}/blobs/")):
+            digest = item["key"].rsplit("/", 1)[-1]
+            if refcounts[digest] or item["last_modified"] > cutoff:
+                continue
+            # An export may have reused the blob since it was listed
+            last_modified = self.storage.last_modified(item["key"])
+            if last_modified is None or last_modified > cutoff:
+                continue
+            self.storage.delete(item["key"])
+            deleted_blobs += 1
+            freed_bytes += item["size"]
+
+        # Staging objects of writers that died before moving them into place
+        deleted_staging = 0
+        for item in list(self.storage.list_objects(f"{self.prefix}/staging/")):
+            if item["last_modified"] > cutoff:
+                continue
+            self.storage.delete(item["key"])
+            deleted_staging += 1
+            freed_bytes += item["size"]
+
+        return {
+            "expired_manifests": expired_manifests,
+            "live_blobs": len(refcounts),
+            "deleted_blobs": deleted_blobs,
+            "deleted_staging": deleted_staging,
+            "freed_bytes": freed_bytes
+        }
+
+
+# Global artifact store instance
+artifact_store = ArtifactStore(object_storage, gc_grace_seconds=settings.EXPORT_ARTIFACT_GC_GRACE_SECONDS)
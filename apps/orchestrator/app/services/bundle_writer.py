@@ -0,0 +1,86 @@
+"""
+Streaming ZIP writer for lesson bundles.
+
+Each entry's content is pulled lazily, one chunk at a time, and compressed
+straight into an object storage writer. The archive uses data descriptors,
+so it can be written to non-seekable streams such as an S3 multipart upload.
+Entries carry a fixed timestamp, so the same materials always produce the
+same archive bytes and the artifact store can deduplicate bundles.
+"""
+
+import zipfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from app.services.artifact_store import ArtifactStore
+
+Chunk = Union[str, bytes]
+EntrySource = Union[Chunk, Iterable[Chunk], Callable[[], Union[Chunk, Iterable[Chunk]]]]
+
+CHUNK_SIZE = 64 * 1024
+# Earliest timestamp a ZIP entry can carry
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+class BundleEntry:
+    """A file in a bundle whose content is produced on demand"""
+
+    def __init__(self, name: str, file_type: str, source: EntrySource):
+        self.name = name
+        self.file_type = file_type
+        self.source = source
+
+
+def iter_chunks(source: EntrySource, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a source as bounded byte chunks"""
+    if callable(source):
+        source = source()
+
+    if isinstance(source, (str, bytes)):
+        source = [source]
+
+    for piece in source:
+        for start in range(0, len(piece), chunk_size):
+            chunk = piece[start:start + chunk_size]
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def write_zip(
+    stream,
+    entries: Iterable[BundleEntry],
+    chunk_size: int = CHUNK_SIZE,
+    date_time: Tuple[int, ...] = ZIP_EPOCH
+) -> List[Dict[str, Any]]:
+    """Write entries into a ZIP on ``stream``; returns each entry's uncompressed size"""
+    written = []
+
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+
+            size = 0
+            with archive.open(info, mode="w") as target:
+                for chunk in iter_chunks(entry.source, chunk_size):
+                    target.write(chunk)
+                    size += len(chunk)
+
+            written.append({"name": entry.name, "type": entry.file_type, "size": size})
+
+    return written
+
+
+def write_bundle(
+    artifacts: ArtifactStore,
+    entries: Iterable[BundleEntry],
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Stream a ZIP bundle into the artifact store and return its blob entry and manifest"""
+    blob, files = artifacts.write_blob(lambda stream: write_zip(stream, entries, chunk_size), "application/zip")
+
+    return {
+        **blob,
+        "files": files,
+        "total_files": len(files),
+        "uncompressed_size": sum(item["size"] for item in files),
+        "archive_size": blob["size"]
+    }
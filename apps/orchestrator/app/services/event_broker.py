@@ -0,0 +1,227 @@
+"""
+Pub/sub bridge that carries WebSocket events between orchestrator replicas.
+
+Every node publishes an event once, already JSON-encoded, on a channel such
+as ``client:<id>`` or ``lesson:<id>``. A node subscribes to a channel only
+while it holds local sockets interested in it, so the broker delivers each
+event just to the nodes that can use it.
+
+Brokered messages are wrapped in a small envelope: one JSON header line
+carrying delivery hints such as the coalesce key, then the payload as is,
+so the payload is never re-encoded.
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+def client_channel(client_id: str) -> str:
+    return f"client:{client_id}"
+
+
+def lesson_channel(lesson_id: str) -> str:
+    return f"lesson:{lesson_id}"
+
+
+def encode_envelope(payload: str, coalesce_key: Optional[str] = None) -> str:
+    return json.dumps({"coalesce_key": coalesce_key}) + "\n" + payload
+
+
+def decode_envelope(data: str) -> Tuple[str, Optional[str]]:
+    """Return (payload, coalesce_key) from an encoded envelope"""
+    header, _, payload = data.partition("\n")
+    return payload, json.loads(header).get("coalesce_key")
+
+
+class EventBroker:
+    """Interface shared by the broker backends"""
+
+    async def start(self, handler: MessageHandler):
+        """Begin delivering messages for subscribed channels to ``handler(channel, payload)``"""
+        raise NotImplementedError
+
+    async def publish(self, channel: str, payload: str):
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str):
+        raise NotImplementedError
+
+    async def unsubscribe(self, channel: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InMemoryHub:
+    """Shared medium for in-memory brokers; stands in for Redis/NATS in tests"""
+
+    def __init__(self):
+        self.brokers: List["InMemoryBroker"] = []
+
+
+class InMemoryBroker(EventBroker):
+    """In-process broker; brokers sharing a hub behave like separate nodes"""
+
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self.hub.brokers.append(self)
+        self.channels: Set[str] = set()
+        self._handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+
+    async def publish(self, channel: str, payload: str):
+        for broker in list(self.hub.brokers):
+            if broker._handler is not None and channel in broker.channels:
+                await broker._handler(channel, payload)
+
+    async def subscribe(self, channel: str):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+
+    async def close(self):
+        self._handler = None
+        self.channels.clear()
+        if self in self.hub.brokers:
+            self.hub.brokers.remove(self)
+
+
+class RedisEventBroker(EventBroker):
+    """Broker backed by Redis pub/sub"""
+
+    def __init__(self, redis_url: str, prefix: str = "ws:"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self._client = None
+        self._pubsub = None
+        self._handler: Optional[MessageHandler] = None
+        self._reader: Optional[asyncio.Task] = None
+        # Subscription changes are applied in the order they were requested
+        self._lock = asyncio.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(self.redis_url)
+        return self._client
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+        self._pubsub = self._get_client().pubsub()
+        self._reader = asyncio.create_task(self._read())
+
+    async def publish(self, channel: str, payload: str):
+        await self._get_client().publish(self.prefix + channel, payload)
+
+    async def subscribe(self, channel: str):
+        async with self._lock:
+            await self._pubsub.subscribe(self.prefix + channel)
+
+    async def unsubscribe(self, channel: str):
+        async with self._lock:
+            await self._pubsub.unsubscribe(self.prefix + channel)
+
+    async def _read(self):
+        backoff = 1.0
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+                    continue
+
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                backoff = 1.0
+                if message is None:
+                    continue
+
+                channel = message["channel"].decode("utf-8")[len(self.prefix):]
+                await self._handler(channel, message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Redis event broker error: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class NatsEventBroker(EventBroker):
+    """Broker backed by NATS core subjects"""
+
+    def __init__(self, nats_url: str, prefix: str = "ws."):
+        self.nats_url = nats_url
+        self.prefix = prefix
+        self._nc = None
+        self._handler: Optional[MessageHandler] = None
+        self._subscriptions: Dict[str, object] = {}
+
+    async def _connect(self):
+        if self._nc is None:
+            import nats
+            self._nc = await nats.connect(self.nats_url)
+        return self._nc
+
+    def _subject(self, channel: str) -> str:
+        # NATS uses '.' as the token separator
+        return self.prefix + channel.replace(":", ".")
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+        await self._connect()
+
+    async def publish(self, channel: str, payload: str):
+        nc = await self._connect()
+        await nc.publish(self._subject(channel), payload.encode("utf-8"))
+
+    async def subscribe(self, channel: str):
+        if channel in self._subscriptions:
+            return
+
+        async def deliver(msg):
+            await self._handler(channel, msg.data.decode("utf-8"))
+
+        nc = await self._connect()
+        self._subscriptions[channel] = await nc.subscribe(self._subject(channel), cb=deliver)
+
+    async def unsubscribe(self, channel: str):
+        subscription = self._subscriptions.pop(channel, None)
+        if subscription is not None:
+            await subscription.unsubscribe()
+
+    async def close(self):
+        if self._nc is not None:
+            await self._nc.drain()
+            self._nc = None
+        self._subscriptions.clear()
+
+
+def create_event_broker(backend: Optional[str] = None) -> EventBroker:
+    """Build the configured broker backend"""
+    backend = backend or settings.WS_BROKER_BACKEND
+    if backend == "redis":
+        return RedisEventBroker(settings.REDIS_URL)
+    if backend == "nats":
+        return NatsEventBroker(settings.NATS_URL)
+    if backend == "memory":
+        return InMemoryBroker()
+    raise ValueError(f"Unknown WebSocket broker backend: {backend}")
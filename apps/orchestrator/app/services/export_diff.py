@@ -0,0 +1,80 @@
+"""
+Section fingerprints and format dependencies for incremental re-export.
+
+A lesson's fingerprint holds a content hash per section plus a hash per item
+of its list-like sections. Comparing two fingerprints yields section-level
+diffs, and the dependency map turns the changed sections into the set of
+export formats that actually need re-rendering.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, List, Set
+
+from app.services.stage_cache import canonical_json
+
+LESSON_SECTIONS = ["topic", "objectives", "sequence", "quiz", "activity", "history", "math", "udl", "roster", "scores", "responses"]
+
+# Where each section keeps its list of items
+SECTION_ITEMS: Dict[str, Callable[[Dict[str, Any]], List[Any]]] = {
+    "objectives": lambda lesson: lesson.get("objectives") or [],
+    "sequence": lambda lesson: (lesson.get("sequence") or {}).get("sections", []),
+    "quiz": lambda lesson: (lesson.get("quiz") or {}).get("quiz_items", []),
+    "activity": lambda lesson: ((lesson.get("activity") or {}).get("activity") or {}).get("steps", []),
+    "udl": lambda lesson: (lesson.get("udl") or {}).get("flags", []),
+}
+
+# Sections each renderer reads; mirrors the renderers in reporter.py and exporter.py
+FORMAT_DEPENDENCIES: Dict[str, Set[str]] = {
+    "pack_pdf": {"topic", "objectives", "sequence", "quiz", "activity", "history", "math", "udl"},
+    "slides_mdx": {"topic", "objectives", "sequence"},
+    "worksheets_docx": {"topic", "quiz", "activity", "math"},
+    "quiz_pdf": {"quiz"},
+    "csv_grades": {"quiz", "roster", "scores", "responses"},
+}
+
+# Formats that describe the lesson as a whole and follow any change
+ALWAYS_AFFECTED = {"change_log", "bundle_zip"}
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+
+def lesson_fingerprint(lesson_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Hash every section and every item of the list-like sections"""
+    return {
+        "sections": {section: _hash(lesson_data.get(section)) for section in LESSON_SECTIONS},
+        "items": {section: [_hash(item) for item in items(lesson_data)] for section, items in SECTION_ITEMS.items()}
+    }
+
+
+def diff_fingerprints(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Return the changed sections with positional item diffs where available"""
+    diff = {}
+    for section in LESSON_SECTIONS:
+        if previous["sections"].get(section) == current["sections"].get(section):
+            continue
+
+        old_items = previous["items"].get(section)
+        new_items = current["items"].get(section)
+        if old_items is None or new_items is None:
+            diff[section] = {}
+            continue
+
+        shared = min(len(old_items), len(new_items))
+        diff[section] = {
+            "modified": sum(1 for index in range(shared) if old_items[index] != new_items[index]),
+            "added": max(len(new_items) - len(old_items), 0),
+            "removed": max(len(old_items) - len(new_items), 0)
+        }
+    return diff
+
+
+def affected_formats(changed_sections) -> Set[str]:
+    """Return the export formats that read any of the changed sections"""
+    changed = set(changed_sections)
+    if not changed:
+        return set()
+
+    formats = {name for name, sections in FORMAT_DEPENDENCIES.items() if sections & changed}
+    return formats | ALWAYS_AFFECTED
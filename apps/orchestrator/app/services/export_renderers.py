@@ -0,0 +1,285 @@
+"""
+Direct export rendering engine.
+
+Every export format is a pure function of lesson_data, so the default path
+calls the renderers in-process instead of asking a CrewAI crew (an LLM
+round-trip per task) to invoke the same tools. The crew remains available
+behind ``EXPORT_USE_LLM``.
+
+Independent formats can fan out across a process pool. lesson_data is
+encoded to JSON bytes once per export and placed in a shared memory block
+(a ``LessonPayload`` the export passes to each of its render calls), so
+tasks carry only the block's name and the payload's digest; workers
+decode it once per digest and reuse the parsed copy for every format they
+render. The pool is created lazily from agent worker threads, so its
+processes are started by a forkserver (or spawned) rather than forked
+from a multithreaded parent.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.agents.exporter import (
+    build_lesson_bundle,
+    render_change_log,
+    render_csv_grades,
+    sign_export_urls,
+)
+from app.agents.reporter import (
+    render_pack_pdf,
+    render_quiz_pdf,
+    render_slides_mdx,
+    render_worksheets_docx,
+)
+
+DOCUMENT_RENDERERS: Dict[str, Callable[..., str]] = {
+    "pack_pdf": render_pack_pdf,
+    "slides_mdx": render_slides_mdx,
+    "worksheets_docx": render_worksheets_docx,
+    "quiz_pdf": render_quiz_pdf,
+}
+
+MATERIAL_RENDERERS: Dict[str, Callable[..., str]] = {
+    "csv_grades": render_csv_grades,
+    "change_log": render_change_log,
+}
+
+RENDERERS: Dict[str, Callable[..., str]] = {**DOCUMENT_RENDERERS, **MATERIAL_RENDERERS}
+
+# Per-worker cache of decoded lesson_data, keyed by payload digest
+_WORKER_LESSONS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_WORKER_CACHE_SIZE = 8
+
+
+def _read_payload(block_name: str, size: int) -> bytes:
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        return bytes(block.buf[:size])
+    finally:
+        block.close()
+
+
+def _render_in_worker(name: str, digest: str, block_name: str, size: int, options: Dict[str, Any]) -> Tuple[str, Any, float]:
+    """Render one format in a pool worker, decoding lesson_data at most once per digest"""
+    lesson_data = _WORKER_LESSONS.get(digest)
+    if lesson_data is None:
+        lesson_data = json.loads(_read_payload(block_name, size))
+        _WORKER_LESSONS[digest] = lesson_data
+        while len(_WORKER_LESSONS) > _WORKER_CACHE_SIZE:
+            _WORKER_LESSONS.popitem(last=False)
+
+    started = time.perf_counter()
+    result = RENDERERS[name](lesson_data, **options)
+    return name, result, (time.perf_counter() - started) * 1000
+
+
+class LessonPayload:
+    """lesson_data encoded once for every pooled render of one export
+
+    The shared memory block is created by the first pooled render and
+    released on close, so exports that render inline never allocate one.
+    """
+
+    def __init__(self, lesson_data: Dict[str, Any]):
+        self.lesson_data = lesson_data
+        self.digest: Optional[str] = None
+        self.size = 0
+        self._block: Optional[shared_memory.SharedMemory] = None
+
+    def share(self) -> Tuple[str, str, int]:
+        """Return (digest, block name, size), encoding lesson_data on first use"""
+        if self._block is None:
+            encoded = json.dumps(self.lesson_data, default=str).encode("utf-8")
+            block = shared_memory.SharedMemory(create=True, size=max(len(encoded), 1))
+            block.buf[:len(encoded)] = encoded
+            self.digest = hashlib.sha256(encoded).hexdigest()
+            self.size = len(encoded)
+            self._block = block
+        return self.digest, self._block.name, self.size
+
+    def close(self):
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+    def __enter__(self) -> "LessonPayload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _pool_context():
+    # Forking a parent with live threads can copy held locks into the child
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class RenderScheduler:
+    """Runs renderers inline or across a process pool and records per-format timings"""
+
+    def __init__(self, processes: int = 0):
+        self.processes = processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=_pool_context())
+            return self._executor
+
+    def render(
+        self,
+        lesson_data: Dict[str, Any],
+        names: Iterable[str],
+        options: Optional[Dict[str, Dict[str, Any]]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        payload: Optional[LessonPayload] = None
+    ) -> Dict[str, Any]:
+        """Render the named formats; fills ``timings`` with milliseconds per format
+
+        Pass the export's ``payload`` to reuse its encoded lesson_data across
+        calls; without one the lesson is encoded for this call only.
+        """
+        names = list(names)
+        options = options or {}
+        results: Dict[str, Any] = {}
+        timings = {} if timings is None else timings
+
+        if not self.processes or len(names) < 2:
+            for name in names:
+                started = time.perf_counter()
+                results[name] = RENDERERS[name](lesson_data, **options.get(name, {}))
+                timings[name] = round((time.perf_counter() - started) * 1000, 3)
+            return results
+
+        owned = payload is None
+        payload = LessonPayload(lesson_data) if owned else payload
+        try:
+            # Tasks only carry the block's name; workers cache the parsed copy by digest
+            digest, block_name, size = payload.share()
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_render_in_worker, name, digest, block_name, size, options.get(name, {}))
+                for name in names
+            ]
+            try:
+                for future in futures:
+                    name, result, elapsed = future.result()
+                    results[name] = result
+                    timings[name] = round(elapsed, 3)
+            finally:
+                for future in futures:
+                    future.cancel()
+        finally:
+            if owned:
+                payload.close()
+        return results
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+def render_documents(
+    lesson_data: Dict[str, Any],
+    timings: Optional[Dict[str, float]] = None,
+    scheduler: Optional[RenderScheduler] = None,
+    payload: Optional[LessonPayload] = None
+) -> Dict[str, Any]:
+    """Render the document exports; same shape as ``generate_lesson_exports``"""
+    try:
+        exports = (scheduler or render_scheduler).render(lesson_data, DOCUMENT_RENDERERS, timings=timings, payload=payload)
+        exports["status"] = "completed"
+        return exports
+    except Exception as e:
+        return {
+            "error": f"Error generating exports: {str(e)}",
+            "status": "failed"
+        }
+
+
+def render_materials(
+    lesson_data: Dict[str, Any],
+    export_files: Dict[str, Any],
+    previous_version: Optional[Dict[str, Any]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    scheduler: Optional[RenderScheduler] = None,
+    payload: Optional[LessonPayload] = None
+) -> Dict[str, Any]:
+    """Render gradebook, bundle and change log; same shape as ``export_lesson_materials``"""
+    try:
+        timings = {} if timings is None else timings
+        rendered = (scheduler or render_scheduler).render(
+            lesson_data,
+            MATERIAL_RENDERERS,
+            options={"change_log": {"previous_version": previous_version}},
+            timings=timings,
+            payload=payload
+        )
+
+        # The bundle streams the rendered documents to storage, so it runs after them
+        started = time.perf_counter()
+        bundle = build_lesson_bundle(lesson_data, export_files)
+        timings["bundle_zip"] = round((time.perf_counter() - started) * 1000, 3)
+
+        return {
+            "csv_grades": rendered["csv_grades"],
+            "bundle_zip": bundle,
+            "change_log": rendered["change_log"],
+            "signed_urls": sign_export_urls(export_files),
+            "status": "completed"
+        }
+    except Exception as e:
+        return {
+            "error": f"Error exporting materials: {str(e)}",
+            "status": "failed"
+        }
+
+
+def rerender_exports(
+    lesson_data: Dict[str, Any],
+    previous_files: Dict[str, Any],
+    formats: Iterable[str],
+    section_diff: Optional[Dict[str, Dict[str, int]]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    scheduler: Optional[RenderScheduler] = None,
+    payload: Optional[LessonPayload] = None
+) -> Dict[str, Any]:
+    """Re-render only ``formats``, reusing ``previous_files`` for everything else"""
+    formats = set(formats)
+    timings = {} if timings is None else timings
+    files = dict(previous_files)
+
+    names = [name for name in RENDERERS if name in formats]
+    files.update((scheduler or render_scheduler).render(
+        lesson_data,
+        names,
+        options={"change_log": {"section_diff": section_diff}},
+        timings=timings,
+        payload=payload
+    ))
+
+    if "bundle_zip" in formats:
+        started = time.perf_counter()
+        files["bundle_zip"] = build_lesson_bundle(lesson_data, files)
+        timings["bundle_zip"] = round((time.perf_counter() - started) * 1000, 3)
+
+    return files
+
+
+# Global scheduler instance
+render_scheduler = RenderScheduler(processes=settings.EXPORT_RENDER_PROCESSES)
@@ -1,34 +1,44 @@
 # Created automatically by Cursor AI (2024-08-26)
 from typing import Dict, List, Any, Optional
-import json
-import uuid
 from datetime import datetime, timedelta
-import hashlib
-import time
+from app.core.config import settings
 from app.agents.reporter import generate_lesson_exports
 from app.agents.exporter import export_lesson_materials
+from app.services.artifact_store import ArtifactStore, artifact_store, lesson_id_for, lesson_version_for
+from app.services.export_diff import affected_formats, diff_fingerprints, lesson_fingerprint
+from app.services.url_signer import UrlSigner, url_signer
+from app.services.export_renderers import LessonPayload, render_documents, render_materials, rerender_exports
 
 class ExportService:
     """Service for handling lesson exports and file management"""
     
-    def __init__(self):
-        self.storage_base_url = "https://storage.example.com"
-        self.secret_key = "your-secret-key-here"  # In production, use environment variable
+    def __init__(self, artifacts: Optional[ArtifactStore] = None, signer: Optional[UrlSigner] = None):
+        self.artifact_store = artifacts or artifact_store
+        self.url_signer = signer or url_signer
         
     def generate_export_files(self, lesson_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate all export files for a lesson"""
         try:
-            # Generate document exports
-            export_files = generate_lesson_exports(lesson_data)
-            
-            # Generate additional exports (CSV, bundle, etc.)
-            additional_exports = export_lesson_materials(lesson_data, export_files)
+            timings: Dict[str, float] = {}
+            if settings.EXPORT_USE_LLM:
+                # Have the reporter and exporter crews drive the tools
+                export_files = generate_lesson_exports(lesson_data)
+                additional_exports = export_lesson_materials(lesson_data, export_files)
+            else:
+                # Formatting is deterministic; render locally without an LLM round-trip
+                with LessonPayload(lesson_data) as payload:
+                    export_files = render_documents(lesson_data, timings=timings, payload=payload)
+                    additional_exports = render_materials(lesson_data, export_files, timings=timings, payload=payload)
             
             # Combine all exports
             all_exports = {**export_files, **additional_exports}
             
             # Generate file metadata
-            file_metadata = self._generate_file_metadata(lesson_data, all_exports)
+            fingerprint = lesson_fingerprint(lesson_data)
+            file_metadata = self._generate_file_metadata(lesson_data, all_exports, fingerprint)
+            file_metadata["fingerprint"] = fingerprint
+            if timings:
+                file_metadata["render_timings_ms"] = timings
             
             return {
                 "files": all_exports,
@@ -42,46 +52,86 @@ class ExportService:
                 "status": "failed"
             }
     
-    def _generate_file_metadata(self, lesson_data: Dict[str, Any], exports: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate metadata for export files"""
+    def regenerate_export_files(self, lesson_data: Dict[str, Any], previous_export: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-export an edited lesson, re-rendering only the formats its changes affect"""
+        previous_fingerprint = previous_export.get("metadata", {}).get("fingerprint")
+        if settings.EXPORT_USE_LLM or previous_export.get("status") != "completed" or not previous_fingerprint:
+            return self.generate_export_files(lesson_data)
+        
+        try:
+            fingerprint = lesson_fingerprint(lesson_data)
+            section_diff = diff_fingerprints(previous_fingerprint, fingerprint)
+            stale = affected_formats(section_diff)
+            if not stale:
+                return previous_export
+            
+            timings: Dict[str, float] = {}
+            all_exports = rerender_exports(lesson_data, previous_export["files"], stale, section_diff, timings)
+            
+            # Signed URLs are cheap; refresh them so expiries restart with the new version
+            signed = self.url_signer.sign_many(
+                f"exports/{file_type}" for file_type in previous_export["files"].get("signed_urls", {})
+            )
+            all_exports["signed_urls"] = {path[len("exports/"):]: entry for path, entry in signed.items()}
+            
+            # A re-export is the same lesson, so it keeps the id its progress events are keyed by
+            lesson_id = lesson_data.get("lesson_id") or previous_export["metadata"].get("lesson_id")
+            file_metadata = self._generate_file_metadata(lesson_data, all_exports, fingerprint, lesson_id)
+            file_metadata.update(
+                fingerprint=fingerprint,
+                changed_sections=section_diff,
+                rerendered=sorted(stale),
+                render_timings_ms=timings
+            )
+            
+            return {
+                "files": all_exports,
+                "metadata": file_metadata,
+                "status": "completed"
+            }
+            
+        except Exception as e:
+            return {
+                "error": f"Error regenerating exports: {str(e)}",
+                "status": "failed"
+            }
+    
+    def _generate_file_metadata(
+        self,
+        lesson_data: Dict[str, Any],
+        exports: Dict[str, Any],
+        fingerprint: Dict[str, Any],
+        lesson_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate metadata for export files, storing them as deduplicated artifacts"""
         topic = lesson_data.get("topic", "")
         timestamp = datetime.now()
+        lesson_id = lesson_id or lesson_id_for(lesson_data)
+        lesson_version = lesson_version_for(fingerprint)
+        expires_at = (timestamp + timedelta(days=30)).isoformat()
+        
+        artifacts = self.artifact_store.store_version(lesson_id, lesson_version, exports, expires_at)
+        # Exact stored sizes, as counted by the storage writers
+        file_sizes = {name: entry["size"] for name, entry in artifacts["files"].items()}
         
         return {
-            "lesson_id": str(uuid.uuid4()),
+            "lesson_id": lesson_id,
+            "lesson_version": lesson_version,
             "topic": topic,
             "generated_at": timestamp.isoformat(),
             "version": "1.0",
             "file_count": len(exports),
-            "total_size_estimate": self._estimate_total_size(exports),
-            "expires_at": (timestamp + timedelta(days=30)).isoformat()
+            "file_sizes": file_sizes,
+            "total_size": sum(file_sizes.values()),
+            "artifacts": artifacts,
+            "expires_at": expires_at
         }
     
-    def _estimate_total_size(self, exports: Dict[str, Any]) -> int:
-        """Estimate total size of export files in bytes"""
-        total_size = 0
-        for content in exports.values():
-            if isinstance(content, str):
-                total_size += len(content.encode('utf-8'))
-            elif isinstance(content, dict):
-                total_size += len(json.dumps(content).encode('utf-8'))
-        return total_size
-    
     def create_signed_url(self, file_path: str, expiration_hours: int = 24) -> Dict[str, Any]:
         """Create a signed URL for secure file access"""
         try:
-            timestamp = int(time.time()) + (expiration_hours * 3600)
-            
-            # Create signature
-            message = f"{file_path}{timestamp}{self.secret_key}"
-            signature = hashlib.sha256(message.encode()).hexdigest()[:16]
-            
-            signed_url = f"{self.storage_base_url}/{file_path}?expires={timestamp}&signature={signature}"
-            
             return {
-                "signed_url": signed_url,
-                "expires_at": timestamp,
-                "file_path": file_path,
+                **self.url_signer.sign(file_path, expiration_hours),
                 "expiration_hours": expiration_hours
             }
         except Exception as e:
@@ -89,6 +139,22 @@ class ExportService:
                 "error": f"Error creating signed URL: {str(e)}"
             }
     
+    def create_signed_urls(self, file_paths: List[str], expiration_hours: int = 24) -> Dict[str, Any]:
+        """Create signed URLs for every file of a lesson or unit in one call"""
+        try:
+            return {
+                "signed_urls": self.url_signer.sign_many(file_paths, expiration_hours),
+                "expiration_hours": expiration_hours
+            }
+        except Exception as e:
+            return {
+                "error": f"Error creating signed URLs: {str(e)}"
+            }
+    
+    def verify_signed_url(self, signed_url: str) -> bool:
+        """Check a signed URL's signature and expiry"""
+        return self.url_signer.verify_url(signed_url)
+    
     def generate_export_progress(self, lesson_id: str) -> Dict[str, Any]:
         """Generate export progress information for WebSocket updates"""
         return {
@@ -0,0 +1,104 @@
+"""
+Vectorized gradebook engine.
+
+Scores are held as a students x items float matrix (NaN where an item has
+no score yet), so totals, percentages and letter grades are whole-column
+NumPy operations rather than per-cell Python loops. Rows are formatted
+and written out a chunk at a time, which keeps CSV exports for large
+rosters streaming.
+"""
+
+import csv
+import io
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.quiz_scoring import QuizScorer
+
+# Lower bound of each letter grade, ascending; anything below the first is an F
+GRADE_THRESHOLDS = np.array([60.0, 70.0, 80.0, 90.0])
+GRADE_LETTERS = np.array(["F", "D", "C", "B", "A"])
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class Gradebook:
+    """Scores for a roster against a quiz's items"""
+
+    def __init__(
+        self,
+        roster: Sequence[Dict[str, Any]],
+        quiz_items: Sequence[Dict[str, Any]],
+        scores: Optional[Any] = None
+    ):
+        self.roster = list(roster)
+        self.item_points = np.array([item.get("points", 1) for item in quiz_items], dtype=float)
+
+        shape = (len(self.roster), len(self.item_points))
+        if scores is None:
+            self.scores = np.full(shape, np.nan)
+        else:
+            # None marks an unscored response and becomes NaN
+            self.scores = np.array(scores, dtype=float).reshape(shape)
+
+        self.total_points = float(self.item_points.sum())
+        self.totals = np.nansum(self.scores, axis=1)
+        if self.total_points > 0:
+            self.percentages = self.totals / self.total_points * 100
+        else:
+            self.percentages = np.zeros(len(self.roster))
+        self.grades = GRADE_LETTERS[np.searchsorted(GRADE_THRESHOLDS, self.percentages, side="right")]
+
+    @property
+    def headers(self) -> List[str]:
+        item_headers = [f"Q{index + 1}" for index in range(len(self.item_points))]
+        return ["Student Name", "Student ID"] + item_headers + ["Total Score", "Percentage", "Grade"]
+
+    def iter_row_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[List[Any]]]:
+        """Yield formatted rows, ``chunk_size`` students at a time"""
+        for start in range(0, len(self.roster), chunk_size):
+            stop = start + chunk_size
+            scores = np.round(self.scores[start:stop], 1).tolist()
+            totals = np.round(self.totals[start:stop], 1).tolist()
+            percentages = np.round(self.percentages[start:stop], 1).tolist()
+            grades = self.grades[start:stop].tolist()
+
+            rows = []
+            for offset, student in enumerate(self.roster[start:stop]):
+                cells = [None if score != score else score for score in scores[offset]]
+                rows.append(
+                    [student.get("name", ""), student.get("id", "")]
+                    + cells
+                    + [totals[offset], percentages[offset], grades[offset]]
+                )
+            yield rows
+
+    def iter_csv(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yield the gradebook as CSV text, one chunk of rows at a time"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.headers)
+
+        for rows in self.iter_row_chunks(chunk_size):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def to_dict(self) -> Dict[str, Any]:
+        rows = [row for chunk in self.iter_row_chunks() for row in chunk]
+        return {"headers": self.headers, "rows": rows}
+
+
+def build_gradebook(lesson_data: Dict[str, Any]) -> Gradebook:
+    """Build a gradebook from the lesson's roster and its scores or raw responses"""
+    quiz_items = (lesson_data.get("quiz") or {}).get("quiz_items", [])
+    scores = lesson_data.get("scores")
+    if scores is None and lesson_data.get("responses") is not None:
+        scores = QuizScorer(quiz_items).score_matrix(lesson_data["responses"])
+
+    return Gradebook(lesson_data.get("roster") or [], quiz_items, scores)
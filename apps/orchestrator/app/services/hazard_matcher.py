@@ -0,0 +1,74 @@
+"""
+Hazard matcher for activity materials.
+
+Every term in the bundled hazard lexicon is compiled into one alternation
+pattern, longest terms first, so a whole equipment list is scanned in a
+single pass over its joined text instead of once per material per term.
+Terms match whole words with an optional plural or verb suffix, which
+keeps "base" out of "baseball" and "fan" out of "infant".
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.data.hazard_lexicon import HAZARD_TERMS, SEVERITY_LEVELS
+
+_SEPARATOR = re.compile(r"[ \t_-]+")
+
+
+class HazardMatcher:
+    """Finds lexicon terms in material names"""
+
+    def __init__(self, terms: Dict[str, Tuple[str, str]] = HAZARD_TERMS):
+        self.terms = {_SEPARATOR.sub(" ", term.lower()): entry for term, entry in terms.items()}
+        alternation = "|".join(
+            r"[ \t_-]+".join(re.escape(part) for part in term.split(" "))
+            for term in sorted(self.terms, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"(?<![a-z])({alternation})(?:s|es|er|ers|ing|ed)?(?![a-z])")
+
+    def scan(self, materials: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Every hazard match, in material order"""
+        materials = [str(material) for material in materials]
+        starts = []
+        offset = 0
+        for material in materials:
+            starts.append(offset)
+            offset += len(material) + 1
+
+        matches = []
+        for match in self.pattern.finditer("\n".join(materials).lower()):
+            index = bisect_right(starts, match.start()) - 1
+            term = _SEPARATOR.sub(" ", match.group(1))
+            category, severity = self.terms[term]
+            matches.append({
+                "index": index,
+                "material": materials[index],
+                "term": term,
+                "category": category,
+                "severity": severity
+            })
+        return matches
+
+    def match_materials(self, materials: Iterable[Any]) -> Dict[str, Any]:
+        """Summarize a material list: matches, hazardous materials, categories and top severity"""
+        matches = self.scan(materials)
+
+        hazardous = {}
+        categories = {}
+        for match in matches:
+            categories[match["category"]] = categories.get(match["category"], 0) + 1
+            if match["severity"] == "high":
+                hazardous.setdefault(match["index"], match["material"])
+
+        return {
+            "matches": matches,
+            "hazardous_materials": list(hazardous.values()),
+            "categories": categories,
+            "max_severity": max((match["severity"] for match in matches), key=SEVERITY_LEVELS.index, default="low")
+        }
+
+
+# Global matcher, compiled once at import
+hazard_matcher = HazardMatcher()
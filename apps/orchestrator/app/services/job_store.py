@@ -0,0 +1,213 @@
+"""
+Persistence for asynchronous lesson generation jobs.
+
+A job records the submitted brief, its status and each completed stage
+result so that any API replica can answer polls and any Celery worker can
+load the inputs of the stage it is about to run.
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+
+class JobStore:
+    """Interface shared by the Redis and in-memory job stores"""
+
+    def create(self, job_id: str, brief: Dict[str, Any], client_id: Optional[str] = None):
+        raise NotImplementedError
+
+    def get_meta(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        raise NotImplementedError
+
+    def save_stage(self, job_id: str, stage: str, result: Any) -> int:
+        """Persist a stage result and return the job's next event sequence number"""
+        raise NotImplementedError
+
+    def get_values(self, job_id: str, names: Iterable[str]) -> Dict[str, Any]:
+        """Load the brief and/or stage results by name"""
+        raise NotImplementedError
+
+    def completed_stages(self, job_id: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def next_sequence(self, job_id: str) -> int:
+        raise NotImplementedError
+
+    def snapshot(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Return the job status and completed stage results"""
+        meta = self.get_meta(job_id)
+        if meta is None:
+            return None
+
+        stages = self.completed_stages(job_id)
+        snapshot = {
+            **meta,
+            "job_id": job_id,
+            "completed_stages": sorted(stages)
+        }
+        if include_results:
+            snapshot["results"] = stages
+        return snapshot
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat()
+
+
+class RedisJobStore(JobStore):
+    """Job store backed by one Redis hash per job"""
+
+    def __init__(self, redis_url: str, ttl_seconds: int = 86400, key_prefix: str = "lesson_job:"):
+        import redis
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    def _key(self, job_id: str) -> str:
+        return self.key_prefix + job_id
+
+    def create(self, job_id: str, brief: Dict[str, Any], client_id: Optional[str] = None):
+        now = self._now()
+        key = self._key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={
+            "status": "queued",
+            "client_id": client_id or "",
+            "created_at": now,
+            "updated_at": now,
+            "error": "",
+            "seq": 0,
+            "brief": json.dumps(brief)
+        })
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def get_meta(self, job_id: str) -> Optional[Dict[str, Any]]:
+        fields = ["status", "client_id", "created_at", "updated_at", "error"]
+        values = self._redis.hmget(self._key(job_id), fields)
+        if values[0] is None:
+            return None
+        meta = dict(zip(fields, values))
+        meta["client_id"] = meta["client_id"] or None
+        meta["error"] = meta["error"] or None
+        return meta
+
+    # Every write re-applies the TTL in its transaction: a write landing after the
+    # hash expired would otherwise recreate the key without one, and it would never expire
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        key = self._key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={
+            "status": status,
+            "updated_at": self._now(),
+            "error": error or ""
+        })
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def save_stage(self, job_id: str, stage: str, result: Any) -> int:
+        key = self._key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={f"result:{stage}": json.dumps(result), "updated_at": self._now()})
+        pipe.hincrby(key, "seq", 1)
+        pipe.expire(key, self.ttl_seconds)
+        _, seq, _ = pipe.execute()
+        return seq
+
+    def next_sequence(self, job_id: str) -> int:
+        key = self._key(job_id)
+        pipe = self._redis.pipeline()
+        pipe.hincrby(key, "seq", 1)
+        pipe.expire(key, self.ttl_seconds)
+        seq, _ = pipe.execute()
+        return seq
+
+    def get_values(self, job_id: str, names: Iterable[str]) -> Dict[str, Any]:
+        names = list(names)
+        fields = ["brief" if name == "brief" else f"result:{name}" for name in names]
+        raw = self._redis.hmget(self._key(job_id), fields)
+        return {name: json.loads(value) for name, value in zip(names, raw) if value is not None}
+
+    def completed_stages(self, job_id: str) -> Dict[str, Any]:
+        raw = self._redis.hgetall(self._key(job_id))
+        return {
+            field[len("result:"):]: json.loads(value)
+            for field, value in raw.items()
+            if field.startswith("result:")
+        }
+
+
+class MemoryJobStore(JobStore):
+    """In-process job store for tests and single-node development"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, brief: Dict[str, Any], client_id: Optional[str] = None):
+        now = self._now()
+        with self._lock:
+            self._jobs[job_id] = {
+                "meta": {
+                    "status": "queued",
+                    "client_id": client_id,
+                    "created_at": now,
+                    "updated_at": now,
+                    "error": None
+                },
+                "seq": 0,
+                "brief": json.dumps(brief),
+                "results": {}
+            }
+
+    def get_meta(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job["meta"]) if job else None
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            meta = self._jobs[job_id]["meta"]
+            meta.update(status=status, error=error, updated_at=self._now())
+
+    def save_stage(self, job_id: str, stage: str, result: Any) -> int:
+        with self._lock:
+            job = self._jobs[job_id]
+            job["results"][stage] = json.dumps(result)
+            job["meta"]["updated_at"] = self._now()
+            job["seq"] += 1
+            return job["seq"]
+
+    def next_sequence(self, job_id: str) -> int:
+        with self._lock:
+            job = self._jobs[job_id]
+            job["seq"] += 1
+            return job["seq"]
+
+    def get_values(self, job_id: str, names: Iterable[str]) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs[job_id]
+            values = {}
+            for name in names:
+                raw = job["brief"] if name == "brief" else job["results"].get(name)
+                if raw is not None:
+                    values[name] = json.loads(raw)
+            return values
+
+    def completed_stages(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return {name: json.loads(raw) for name, raw in self._jobs[job_id]["results"].items()}
+
+
+def create_job_store() -> JobStore:
+    """Build the configured job store"""
+    if settings.LESSON_JOB_STORE == "memory":
+        return MemoryJobStore()
+    return RedisJobStore(settings.REDIS_URL, ttl_seconds=settings.LESSON_JOB_TTL_SECONDS)
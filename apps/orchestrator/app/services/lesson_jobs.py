@@ -0,0 +1,171 @@
+"""
+Asynchronous lesson generation backed by Celery.
+
+A submitted brief becomes a Celery canvas built from the pipeline's
+dependency layers: stages in the same layer run as a group and the layers
+are chained in order. Every stage task loads its
+inputs from the job store, runs, persists its result and publishes a
+progress event on the client's WebSocket broker channel.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from celery import chain, group
+
+from app.core.config import settings
+from app.services.job_store import JobStore, create_job_store
+from app.services.lesson_pipeline import StagePipeline, lesson_pipeline
+from app.services.event_broker import EventBroker, client_channel, create_event_broker, encode_envelope
+from app.services.websocket_service import stage_message
+
+RUN_STAGE_TASK = "lessons.run_stage"
+FINALIZE_JOB_TASK = "lessons.finalize_job"
+
+EventPublisher = Callable[[Optional[str], Dict[str, Any]], None]
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_coroutine(coro) -> Any:
+    """Run a coroutine on the worker process's long-lived event loop"""
+    global _worker_loop
+    # One loop per worker process keeps loop-bound clients (e.g. Redis) valid across tasks
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+
+class BrokerEventPublisher:
+    """Publishes job events on the client's WebSocket broker channel"""
+
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+
+    def __call__(self, client_id: Optional[str], event: Dict[str, Any]):
+        if client_id:
+            run_coroutine(self.broker.publish(client_channel(client_id), encode_envelope(json.dumps(event))))
+
+
+class LessonJobService:
+    """Submits, executes and reports asynchronous lesson jobs"""
+
+    def __init__(
+        self,
+        pipeline: StagePipeline,
+        store: JobStore,
+        celery=None,
+        publisher: Optional[EventPublisher] = None
+    ):
+        self.pipeline = pipeline
+        self.store = store
+        self.celery = celery
+        self.publisher = publisher
+
+    def build_workflow(self, job_id: str):
+        """Build the Celery canvas for a job from the pipeline layers"""
+        steps = []
+        for layer in self.pipeline.layers():
+            signatures = [
+                self.celery.signature(RUN_STAGE_TASK, args=(job_id, name), immutable=True)
+                for name in layer
+            ]
+            steps.append(signatures[0] if len(signatures) == 1 else group(signatures))
+
+        steps.append(self.celery.signature(FINALIZE_JOB_TASK, args=(job_id,), immutable=True))
+        return chain(*steps)
+
+    def submit(self, brief: Dict[str, Any], client_id: Optional[str] = None) -> Dict[str, Any]:
+        """Persist a new job and enqueue its stages"""
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, brief, client_id)
+        self.build_workflow(job_id).apply_async()
+
+        return {
+            "job_id": job_id,
+            "status": "queued",
+            "stages": list(self.pipeline.order)
+        }
+
+    def execute_stage(self, job_id: str, stage_name: str) -> Any:
+        """Run one stage of a job (called from the Celery task)"""
+        meta = self.store.get_meta(job_id)
+        if meta is None:
+            raise ValueError(f"Unknown lesson job: {job_id}")
+        if meta["status"] == "failed":
+            return None
+        if meta["status"] == "queued":
+            self.store.set_status(job_id, "running")
+
+        stage = self.pipeline.stages[stage_name]
+        try:
+            values = self.store.get_values(job_id, stage.inputs)
+            result = run_coroutine(self.pipeline.run_stage(stage_name, values))
+            seq = self.store.save_stage(job_id, stage_name, result)
+        except Exception as e:
+            self.fail(job_id, f"Stage '{stage_name}' failed: {e}", client_id=meta["client_id"])
+            raise
+
+        self._publish(meta["client_id"], stage_message(
+            stage_name, seq, result, total=len(self.pipeline.order), job_id=job_id
+        ))
+        return result
+
+    def finalize(self, job_id: str):
+        """Mark a job complete once its last layer has finished"""
+        meta = self.store.get_meta(job_id)
+        if meta is None or meta["status"] == "failed":
+            return
+
+        self.store.set_status(job_id, "completed")
+        self._publish(meta["client_id"], {
+            "type": "lesson_job_status",
+            "job_id": job_id,
+            "status": "completed",
+            "seq": self.store.next_sequence(job_id),
+            "timestamp": datetime.now().isoformat()
+        })
+
+    def fail(self, job_id: str, error: str, client_id: Optional[str] = None):
+        """Mark a job failed and notify subscribers"""
+        self.store.set_status(job_id, "failed", error=error)
+        self._publish(client_id, {
+            "type": "lesson_job_status",
+            "job_id": job_id,
+            "status": "failed",
+            "error": error,
+            "seq": self.store.next_sequence(job_id),
+            "timestamp": datetime.now().isoformat()
+        })
+
+    def snapshot(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Return job status and completed stage results for polling"""
+        return self.store.snapshot(job_id, include_results=include_results)
+
+    def _publish(self, client_id: Optional[str], event: Dict[str, Any]):
+        if self.publisher is None:
+            return
+        try:
+            self.publisher(client_id, event)
+        except Exception as e:
+            # Progress events are best effort; the job store stays authoritative
+            print(f"Error publishing lesson job event: {e}")
+
+
+def _create_lesson_job_service() -> LessonJobService:
+    from app.core.celery_app import celery_app
+
+    return LessonJobService(
+        pipeline=lesson_pipeline,
+        store=create_job_store(),
+        celery=celery_app,
+        # Workers publish straight to the broker; nodes holding the client's sockets deliver
+        publisher=BrokerEventPublisher(create_event_broker(settings.WS_BROKER_BACKEND))
+    )
+
+
+# Global service instance
+lesson_job_service = _create_lesson_job_service()
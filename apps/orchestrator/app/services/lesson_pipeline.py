@@ -0,0 +1,373 @@
+"""
+Dependency-graph executor for the lesson generation pipeline.
+
+Each stage declares the named inputs it needs; stages whose inputs are
+ready run concurrently, so wall-clock time follows the critical path of
+the graph rather than the sum of every agent call. Versioned stages are
+memoized in the stage cache keyed on their (normalized) inputs.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.agent_runner import AgentRunner, agent_runner
+from app.agents import (
+    objective_writer,
+    sequence_planner,
+    quiz_builder,
+    activity_designer,
+    timeline_historian,
+    math_setter,
+    udl_checker,
+)
+from app.agents.objective_writer import write_objectives
+from app.agents.sequence_planner import plan_sequence
+from app.agents.quiz_builder import build_quiz
+from app.agents.activity_designer import design_activity
+from app.agents.timeline_historian import create_history_timeline
+from app.agents.math_setter import create_math_problems
+from app.agents.udl_checker import check_udl
+from app.services.export_service import export_service
+from app.services.stage_cache import StageCache, stage_cache, stage_cache_key
+
+StageCallback = Callable[[str, Any], Awaitable[None]]
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline stage fails"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+    def __reduce__(self):
+        # Keep the exception picklable for Celery result backends
+        return (self.__class__, (self.stage, self.error))
+
+
+class PipelineStage:
+    """A named unit of work and the inputs it joins on
+
+    Stages with a ``version`` are cacheable. ``cache_inputs`` receives the
+    same keyword arguments as ``func`` and returns the subset (normalized as
+    needed) that determines the stage output.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        version: Optional[str] = None,
+        cache_inputs: Optional[Callable[..., Any]] = None
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.version = version
+        self.cache_inputs = cache_inputs
+
+
+class StagePipeline:
+    """Runs stages as soon as their declared inputs are available"""
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        runner: Optional[AgentRunner] = None,
+        cache: Optional[StageCache] = None
+    ):
+        self.runner = runner or agent_runner
+        self.cache = cache
+        self.stages: Dict[str, PipelineStage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+            self.stages[stage.name] = stage
+
+        # Inputs that are not produced by a stage must be seeded by the caller
+        self.external_inputs = {
+            name
+            for stage in stages
+            for name in stage.inputs
+            if name not in self.stages
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Order stages so every stage follows the stages it depends on"""
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                cycle = " -> ".join(path + [name])
+                raise ValueError(f"Pipeline stages form a cycle: {cycle}")
+
+            state[name] = "visiting"
+            for dependency in self.stages[name].inputs:
+                if dependency in self.stages:
+                    visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+        return order
+
+    def layers(self) -> List[List[str]]:
+        """Group stages into layers that can run side by side"""
+        depth: Dict[str, int] = {}
+        for name in self.order:
+            upstream = [depth[dep] + 1 for dep in self.stages[name].inputs if dep in self.stages]
+            depth[name] = max(upstream, default=0)
+
+        layers: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for name in self.order:
+            layers[depth[name]].append(name)
+        return layers
+
+    async def run(
+        self,
+        initial: Optional[Dict[str, Any]] = None,
+        on_stage_complete: Optional[StageCallback] = None
+    ) -> Dict[str, Any]:
+        """Run every stage and return the results keyed by stage name
+
+        ``on_stage_complete(name, result)`` is awaited as soon as each stage
+        finishes so callers can stream partial results.
+        """
+        values: Dict[str, Any] = dict(initial or {})
+
+        missing = sorted(name for name in self.external_inputs if name not in values)
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {', '.join(missing)}")
+
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: PipelineStage) -> Any:
+            upstream = [tasks[name] for name in stage.inputs if name in tasks]
+            if upstream:
+                await asyncio.gather(*upstream)
+
+            kwargs = {name: values[name] for name in stage.inputs}
+            try:
+                result = await self._invoke(stage, kwargs)
+            except Exception as e:
+                raise PipelineError(stage.name, e) from e
+
+            values[stage.name] = result
+            if on_stage_complete is not None:
+                try:
+                    await on_stage_complete(stage.name, result)
+                except Exception as e:
+                    # Progress reporting must never fail the lesson itself
+                    print(f"Error reporting stage {stage.name}: {e}")
+            return result
+
+        # Stages are created in dependency order so upstream tasks always exist
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_stage(self.stages[name]))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: values[name] for name in self.order}
+
+    async def run_stage(self, name: str, values: Dict[str, Any]) -> Any:
+        """Run one stage on its own, given the values of its inputs"""
+        stage = self.stages[name]
+        missing = [input_name for input_name in stage.inputs if input_name not in values]
+        if missing:
+            raise ValueError(f"Missing inputs for stage '{name}': {', '.join(missing)}")
+
+        try:
+            return await self._invoke(stage, {input_name: values[input_name] for input_name in stage.inputs})
+        except Exception as e:
+            raise PipelineError(name, e) from e
+
+    async def _invoke(self, stage: PipelineStage, kwargs: Dict[str, Any]) -> Any:
+        """Call a stage, serving it from the cache when it is cacheable"""
+        if self.cache is None or stage.version is None:
+            return await self._call(stage, kwargs)
+
+        inputs = stage.cache_inputs(**kwargs) if stage.cache_inputs else kwargs
+        key = stage_cache_key(stage.name, stage.version, inputs)
+        return await self.cache.get_or_compute(key, lambda: self._call(stage, kwargs))
+
+    async def _call(self, stage: PipelineStage, kwargs: Dict[str, Any]) -> Any:
+        """Call a stage function without blocking the event loop"""
+        if asyncio.iscoroutinefunction(stage.func):
+            return await stage.func(**kwargs)
+        return await self.runner.run(stage.func, **kwargs)
+
+
+def _total_minutes(brief: Dict[str, Any]) -> int:
+    return brief["periodLength"] * brief["days"]
+
+
+def _normalize_text(value: str) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def normalize_brief(brief: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of a brief so cosmetic differences share cache entries"""
+    return {
+        "topic": _normalize_text(brief["topic"]),
+        "gradeBand": _normalize_text(brief["gradeBand"]),
+        "periodLength": brief["periodLength"],
+        "days": brief["days"],
+        "classSize": brief["classSize"],
+        "equipment": sorted({_normalize_text(item) for item in brief["equipment"] if str(item).strip()}),
+        "inclusionNotes": _normalize_text(brief.get("inclusionNotes", ""))
+    }
+
+
+def _brief_fields(brief: Dict[str, Any], *fields: str) -> Dict[str, Any]:
+    normalized = normalize_brief(brief)
+    return {field: normalized[field] for field in fields}
+
+
+def _objectives_stage(brief: Dict[str, Any]) -> List[dict]:
+    return write_objectives(brief)["objectives"]
+
+
+def _sequence_stage(brief: Dict[str, Any], objectives: List[dict]) -> dict:
+    return plan_sequence(brief, objectives)
+
+
+def _quiz_stage(brief: Dict[str, Any], objectives: List[dict]) -> dict:
+    return build_quiz(brief["topic"], brief["gradeBand"], objectives, _total_minutes(brief))
+
+
+def _activity_stage(brief: Dict[str, Any], objectives: List[dict]) -> dict:
+    return design_activity(
+        brief["topic"],
+        brief["gradeBand"],
+        objectives,
+        brief["equipment"],
+        _total_minutes(brief)
+    )
+
+
+def _history_stage(brief: Dict[str, Any]) -> dict:
+    return create_history_timeline(brief["topic"], brief["gradeBand"])
+
+
+def _math_stage(brief: Dict[str, Any]) -> dict:
+    return create_math_problems(brief["topic"], brief["gradeBand"])
+
+
+def _udl_stage(brief: Dict[str, Any], objectives: List[dict], activity: dict, quiz: dict) -> dict:
+    lesson_content = {
+        "topic": brief["topic"],
+        "objectives": objectives,
+        "activity": activity,
+        "quiz": quiz
+    }
+    return check_udl(lesson_content, brief["gradeBand"])
+
+
+def _exports_stage(
+    brief: Dict[str, Any],
+    objectives: List[dict],
+    sequence: dict,
+    quiz: dict,
+    activity: dict,
+    history: dict,
+    math: dict,
+    udl: dict
+) -> dict:
+    complete_lesson_data = {
+        "topic": brief["topic"],
+        "objectives": objectives,
+        "sequence": sequence,
+        "quiz": quiz,
+        "activity": activity,
+        "history": history,
+        "math": math,
+        "udl": udl
+    }
+    if brief.get("lesson_id"):
+        # Keep the caller's lesson id; otherwise the export assigns a new one
+        complete_lesson_data["lesson_id"] = brief["lesson_id"]
+    return export_service.generate_export_files(complete_lesson_data)
+
+
+def build_lesson_pipeline(cache: Optional[StageCache] = None) -> StagePipeline:
+    """Build the lesson pipeline with its stage dependencies"""
+    return StagePipeline([
+        PipelineStage(
+            "objectives", _objectives_stage, ["brief"],
+            version=objective_writer.PROMPT_VERSION,
+            cache_inputs=lambda brief: normalize_brief(brief)
+        ),
+        PipelineStage(
+            "history", _history_stage, ["brief"],
+            version=timeline_historian.PROMPT_VERSION,
+            cache_inputs=lambda brief: _brief_fields(brief, "topic", "gradeBand")
+        ),
+        PipelineStage(
+            "math", _math_stage, ["brief"],
+            version=math_setter.PROMPT_VERSION,
+            cache_inputs=lambda brief: _brief_fields(brief, "topic", "gradeBand")
+        ),
+        PipelineStage(
+            "sequence", _sequence_stage, ["brief", "objectives"],
+            version=sequence_planner.PROMPT_VERSION,
+            cache_inputs=lambda brief, objectives: {
+                "brief": _brief_fields(
+                    brief, "topic", "gradeBand", "periodLength", "days", "classSize", "equipment"
+                ),
+                "objectives": objectives
+            }
+        ),
+        PipelineStage(
+            "quiz", _quiz_stage, ["brief", "objectives"],
+            version=quiz_builder.PROMPT_VERSION,
+            cache_inputs=lambda brief, objectives: {
+                "brief": _brief_fields(brief, "topic", "gradeBand"),
+                "minutes": _total_minutes(brief),
+                "objectives": objectives
+            }
+        ),
+        PipelineStage(
+            "activity", _activity_stage, ["brief", "objectives"],
+            version=activity_designer.PROMPT_VERSION,
+            cache_inputs=lambda brief, objectives: {
+                "brief": _brief_fields(brief, "topic", "gradeBand", "equipment"),
+                "minutes": _total_minutes(brief),
+                "objectives": objectives
+            }
+        ),
+        PipelineStage(
+            "udl", _udl_stage, ["brief", "objectives", "activity", "quiz"],
+            version=udl_checker.PROMPT_VERSION,
+            cache_inputs=lambda brief, objectives, activity, quiz: {
+                "brief": _brief_fields(brief, "topic", "gradeBand"),
+                "objectives": objectives,
+                "activity": activity,
+                "quiz": quiz
+            }
+        ),
+        # Exports carry signed URLs and timestamps, so they are never cached
+        PipelineStage(
+            "exports",
+            _exports_stage,
+            ["brief", "objectives", "sequence", "quiz", "activity", "history", "math", "udl"]
+        ),
+    ], cache=cache)
+
+
+# Global pipeline instance
+lesson_pipeline = build_lesson_pipeline(stage_cache if settings.STAGE_CACHE_ENABLED else None)
@@ -0,0 +1,364 @@
+"""
+Object storage for export artifacts.
+
+Writers are streaming: callers write bytes as they produce them and the
+backend forwards them in bounded chunks (S3 multipart parts, or a local
+temp file that is renamed into place on close), so an artifact is never
+held in memory as a whole. Every writer is a sized sink: it counts the
+bytes that pass through it, so callers learn exact object sizes without
+serializing anything a second time.
+"""
+
+import io
+import os
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+
+class ObjectStorage:
+    """Interface shared by the storage backends"""
+
+    def open_writer(self, key: str, content_type: str = "application/octet-stream") -> io.RawIOBase:
+        """Open a write-only, non-seekable stream; closing it commits the object"""
+        raise NotImplementedError
+
+    def open_reader(self, key: str) -> io.RawIOBase:
+        raise NotImplementedError
+
+    def put_bytes(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> int:
+        """Store ``data`` and return the number of bytes written"""
+        with self.open_writer(key, content_type) as writer:
+            writer.write(data)
+        return writer.bytes_written
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def move(self, source: str, target: str):
+        """Rename an object; backends without a native rename copy it and delete the source"""
+        with self.open_reader(source) as reader, self.open_writer(target) as writer:
+            for chunk in iter(lambda: reader.read(1024 * 1024), b""):
+                writer.write(chunk)
+        self.delete(source)
+
+    def touch(self, key: str) -> bool:
+        """Refresh an object's modification time; returns False when it does not exist"""
+        raise NotImplementedError
+
+    def last_modified(self, key: str) -> Optional[float]:
+        """Modification time as a Unix timestamp, or None when the object does not exist"""
+        raise NotImplementedError
+
+    def list_objects(self, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        """Yield ``{"key", "size", "last_modified"}`` for committed objects under ``prefix``"""
+        raise NotImplementedError
+
+
+class SizedSink(io.RawIOBase):
+    """Write-only stream that counts the bytes passing through it
+
+    On its own it discards what it is given, which measures a stream's size
+    without keeping it; subclasses override ``_write`` to forward the bytes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        written = self._write(data)
+        self.bytes_written += written
+        return written
+
+    def _write(self, data) -> int:
+        return len(data)
+
+
+class _StreamWriter(SizedSink):
+    """Sized sink that commits on a clean close and aborts on error"""
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        self.close()
+        return False
+
+    def abort(self):
+        raise NotImplementedError
+
+
+class LocalFileWriter(_StreamWriter):
+    """Writes to a temp file next to the target and renames it into place"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+        self._aborted = False
+
+    def _write(self, data) -> int:
+        return self._file.write(data)
+
+    def abort(self):
+        self._aborted = True
+
+    def close(self):
+        if self.closed:
+            return
+        self._file.close()
+        if self._aborted:
+            os.remove(self._tmp_path)
+        else:
+            os.replace(self._tmp_path, self.path)
+        super().close()
+
+
+class LocalObjectStorage(ObjectStorage):
+    """Filesystem stand-in for S3, rooted at a directory"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def open_writer(self, key: str, content_type: str = "application/octet-stream") -> io.RawIOBase:
+        return LocalFileWriter(self._path(key))
+
+    def open_reader(self, key: str) -> io.RawIOBase:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def move(self, source: str, target: str):
+        path = self._path(target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self._path(source), path)
+
+    def touch(self, key: str) -> bool:
+        try:
+            os.utime(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def last_modified(self, key: str) -> Optional[float]:
+        try:
+            return os.stat(self._path(key)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def list_objects(self, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                # In-flight writes are not objects yet
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield {"key": key, "size": stat.st_size, "last_modified": stat.st_mtime}
+
+
+class S3MultipartWriter(_StreamWriter):
+    """Buffers one part at a time and uploads it through S3 multipart upload"""
+
+    def __init__(self, client, bucket: str, key: str, content_type: str, part_size: int):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+        self._aborted = False
+
+    def _write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes):
+        if self._upload_id is None:
+            response = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )
+            self._upload_id = response["UploadId"]
+
+        part_number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def abort(self):
+        self._aborted = True
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._aborted:
+                return
+            if self._upload_id is None:
+                # Small objects never reach a full part; one PUT is cheaper
+                self.client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), ContentType=self.content_type
+                )
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts}
+                )
+            self._buffer = bytearray()
+        finally:
+            super().close()
+
+
+class S3ObjectStorage(ObjectStorage):
+    """S3/MinIO backend"""
+
+    # S3 rejects non-final parts smaller than 5 MiB
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        client=None
+    ):
+        self.bucket = bucket
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        if client is None:
+            import boto3
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key
+            )
+        self.client = client
+
+    def open_writer(self, key: str, content_type: str = "application/octet-stream") -> io.RawIOBase:
+        return S3MultipartWriter(self.client, self.bucket, key, content_type, self.part_size)
+
+    def open_reader(self, key: str) -> io.RawIOBase:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def move(self, source: str, target: str):
+        head = self.client.head_object(Bucket=self.bucket, Key=source)
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=target,
+            CopySource={"Bucket": self.bucket, "Key": source},
+            ContentType=head.get("ContentType", "application/octet-stream"),
+            MetadataDirective="REPLACE"
+        )
+        self.delete(source)
+
+    def _head(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception:
+            return None
+
+    def touch(self, key: str) -> bool:
+        head = self._head(key)
+        if head is None:
+            return False
+        # S3 has no touch; an in-place copy with replaced metadata bumps LastModified server-side
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": key},
+            ContentType=head.get("ContentType", "application/octet-stream"),
+            Metadata=head.get("Metadata", {}),
+            MetadataDirective="REPLACE"
+        )
+        return True
+
+    def last_modified(self, key: str) -> Optional[float]:
+        head = self._head(key)
+        return head["LastModified"].timestamp() if head is not None else None
+
+    def list_objects(self, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield {
+                    "key": item["Key"],
+                    "size": item["Size"],
+                    "last_modified": item["LastModified"].timestamp()
+                }
+
+
+def create_object_storage(backend: Optional[str] = None) -> ObjectStorage:
+    """Build the configured export storage backend"""
+    backend = backend or settings.EXPORT_STORAGE_BACKEND
+    if backend == "s3":
+        return S3ObjectStorage(
+            bucket=settings.S3_BUCKET_NAME,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            part_size=settings.EXPORT_MULTIPART_PART_SIZE_MB * 1024 * 1024
+        )
+    if backend == "local":
+        return LocalObjectStorage(settings.EXPORT_LOCAL_STORAGE_DIR)
+    raise ValueError(f"Unknown export storage backend: {backend}")
+
+
+# Global storage instance
+object_storage = create_object_storage()
@@ -0,0 +1,153 @@
+"""
+Batch auto-scoring of quiz responses.
+
+Each quiz item is compiled once into a matcher closure holding its answer
+key in the form that makes checking cheap: a normalized string for MCQ, a
+frozenset for multi-select, bounds for numeric, and a set of normalized
+answers (plus optional keywords) for short answer. Scoring a submission
+is then one call per item with no re-parsing of the key. Item types with
+no matcher (labeling items, essays) and items without an answer key
+compile to None and stay unscored, so they never block scoring the rest.
+"""
+
+import re
+import string
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+Matcher = Callable[[Any], float]
+Submission = Union[Sequence[Any], Dict[str, Any]]
+
+# Item type spellings used by the quiz builder and the seed data
+ITEM_TYPE_ALIASES = {
+    "mcq": "mcq",
+    "multi_select": "multi_select",
+    "ms": "multi_select",
+    "numeric": "numeric",
+    "short_answer": "short_answer",
+    "short": "short_answer",
+}
+
+_PUNCTUATION = str.maketrans({character: " " for character in string.punctuation})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_answer(value: Any) -> str:
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", str(value).lower().translate(_PUNCTUATION)).strip()
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def _choices(value: Any) -> List[Any]:
+    # Stored answers and form posts for multi-select items are comma separated strings
+    return value.split(",") if isinstance(value, str) else _as_list(value)
+
+
+def answer_key(item: Dict[str, Any]) -> Any:
+    """The item's answer key: builder "correct_answer", else the stored Prisma "answer" string"""
+    if item.get("correct_answer") is not None:
+        return item["correct_answer"]
+    return item.get("answer")
+
+
+def _compile_mcq(item: Dict[str, Any], points: float) -> Matcher:
+    key = normalize_answer(answer_key(item))
+    return lambda response: points if normalize_answer(response) == key else 0.0
+
+
+def _compile_multi_select(item: Dict[str, Any], points: float) -> Matcher:
+    key = frozenset(normalize_answer(answer) for answer in _choices(answer_key(item)))
+    partial_credit = bool(item.get("partial_credit"))
+
+    def match(response: Any) -> float:
+        chosen = {normalize_answer(answer) for answer in _choices(response)}
+        if chosen == key:
+            return points
+        if not partial_credit or not key:
+            return 0.0
+        # Each wrong choice cancels a right one
+        earned = len(chosen & key) - len(chosen - key)
+        return max(earned, 0) / len(key) * points
+
+    return match
+
+
+def _compile_numeric(item: Dict[str, Any], points: float) -> Matcher:
+    target = float(answer_key(item))
+    tolerance = float(item.get("tolerance", 0))
+    low, high = target - tolerance, target + tolerance
+
+    def match(response: Any) -> float:
+        try:
+            value = float(str(response).replace(",", "").strip())
+        except ValueError:
+            return 0.0
+        return points if low <= value <= high else 0.0
+
+    return match
+
+
+def _compile_short_answer(item: Dict[str, Any], points: float) -> Matcher:
+    accepted = frozenset(normalize_answer(answer) for answer in _as_list(answer_key(item)))
+    # Keywords may be phrases; padding both sides with spaces matches them on word boundaries
+    keywords = frozenset(f" {keyword} " for keyword in map(normalize_answer, item.get("keywords", [])) if keyword)
+
+    def match(response: Any) -> float:
+        answer = normalize_answer(response)
+        if answer in accepted:
+            return points
+        padded = f" {answer} "
+        if keywords and all(keyword in padded for keyword in keywords):
+            return points
+        return 0.0
+
+    return match
+
+
+ITEM_COMPILERS: Dict[str, Callable[[Dict[str, Any], float], Matcher]] = {
+    "mcq": _compile_mcq,
+    "multi_select": _compile_multi_select,
+    "numeric": _compile_numeric,
+    "short_answer": _compile_short_answer,
+}
+
+
+def compile_item(item: Dict[str, Any]) -> Optional[Matcher]:
+    """Compile a quiz item into a matcher returning the points earned; None if it cannot be auto-scored"""
+    item_type = ITEM_TYPE_ALIASES.get(str(item.get("type", "")).lower())
+    if item_type is None or answer_key(item) is None:
+        return None
+    try:
+        return ITEM_COMPILERS[item_type](item, float(item.get("points", 1)))
+    except (TypeError, ValueError):
+        # e.g. a numeric item whose key is not a number
+        return None
+
+
+class QuizScorer:
+    """Scores submissions against a quiz compiled once up front"""
+
+    def __init__(self, quiz_items: Sequence[Dict[str, Any]]):
+        self.item_ids = [str(item.get("id", index)) for index, item in enumerate(quiz_items)]
+        self.matchers = [compile_item(item) for item in quiz_items]
+
+    def _responses(self, submission: Submission) -> List[Any]:
+        if isinstance(submission, dict):
+            return [submission.get(item_id) for item_id in self.item_ids]
+        return list(submission) + [None] * (len(self.matchers) - len(submission))
+
+    def score(self, submission: Submission) -> List[Optional[float]]:
+        """Points per item; unanswered and unscorable items stay unscored (None)"""
+        return [
+            None if response is None or matcher is None else matcher(response)
+            for matcher, response in zip(self.matchers, self._responses(submission))
+        ]
+
+    def score_matrix(self, submissions: Iterable[Submission]) -> np.ndarray:
+        """Score many submissions into a students x items matrix with NaN for unanswered"""
+        rows = [self.score(submission) for submission in submissions]
+        return np.array(rows, dtype=float).reshape(len(rows), len(self.matchers))
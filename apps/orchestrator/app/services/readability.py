@@ -0,0 +1,163 @@
+"""
+Readability engine for lesson text.
+
+Text is tokenized with precompiled sentence and word patterns, and
+syllables are counted by a memoized function that checks the bundled
+syllable table before falling back to spelling rules. From those counts
+the engine reports the Flesch-Kincaid grade, the SMOG grade and a
+Dale-Chall-style difficult-word ratio: the share of words with three or
+more syllables that are not on the bundled familiar-word list.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.data.readability_lexicon import FAMILIAR_POLYSYLLABLES, SYLLABLE_COUNTS
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n|\n\s*[-*•]\s+")
+WORD = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)*")
+_VOWEL_GROUP = re.compile(r"[aeiouy]+")
+# Vowel pairs usually spoken as two syllables (ri-a, vi-o, ge-o, ...)
+_HIATUS = re.compile(r"(?<![cgstx])i[ao](?!u)|eo(?!u)|(?<![qg])u[ao]|ii")
+
+POLYSYLLABLE_MIN = 3
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """Count the syllables in one word"""
+    word = word.lower().replace("’", "'")
+    if word.endswith("'s"):
+        word = word[:-2]
+
+    known = SYLLABLE_COUNTS.get(word)
+    if known is not None:
+        return known
+    if len(word) <= 3:
+        return 1
+
+    stem = word
+    if stem.endswith("es") and not re.search(r"(?:[cgsxz]|[cs]h)es$", stem):
+        stem = stem[:-2]
+    elif stem.endswith("ed") and not re.search(r"[td]ed$", stem):
+        stem = stem[:-2]
+    elif stem.endswith("e") and not re.search(r"[^aeiouyl]le$|[aeiouy]e$", stem):
+        stem = stem[:-1]
+
+    count = len(_VOWEL_GROUP.findall(stem)) + len(_HIATUS.findall(stem))
+    return max(count, 1)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences; list bullets and blank lines also end a sentence"""
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if WORD.search(sentence)]
+
+
+def parse_grade(grade_level: Any, default: float = 6) -> float:
+    """Read the highest grade out of values like "6", "6-8", "Grade 7" or "K" """
+    text = str(grade_level).strip().upper()
+    if text in ("K", "KINDERGARTEN"):
+        return 0
+    numbers = re.findall(r"\d+", text)
+    return float(max(int(number) for number in numbers)) if numbers else default
+
+
+def grade_band(grade: float) -> str:
+    if grade <= 5:
+        return "elementary"
+    if grade <= 8:
+        return "middle"
+    return "high"
+
+
+def analyze_text(text: str) -> Dict[str, Any]:
+    """Readability metrics for one passage"""
+    sentences = split_sentences(text)
+    words = WORD.findall(text)
+    word_count = len(words)
+    sentence_count = max(len(sentences), 1)
+
+    if word_count == 0:
+        return {
+            "sentences": 0, "words": 0, "syllables": 0, "polysyllables": 0,
+            "avg_sentence_length": 0, "avg_syllables_per_word": 0,
+            "flesch_kincaid_grade": 0.0, "smog_grade": 0.0,
+            "difficult_word_ratio": 0.0, "difficult_words": []
+        }
+
+    syllables = 0
+    polysyllables = 0
+    difficult_words = []
+    for word in words:
+        count = count_syllables(word)
+        syllables += count
+        if count >= POLYSYLLABLE_MIN:
+            polysyllables += 1
+            if word.lower() not in FAMILIAR_POLYSYLLABLES:
+                difficult_words.append(word.lower())
+
+    words_per_sentence = word_count / sentence_count
+    syllables_per_word = syllables / word_count
+    flesch_kincaid = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    smog = 1.043 * math.sqrt(polysyllables * 30 / sentence_count) + 3.1291
+
+    return {
+        "sentences": sentence_count,
+        "words": word_count,
+        "syllables": syllables,
+        "polysyllables": polysyllables,
+        "avg_sentence_length": round(words_per_sentence, 2),
+        "avg_syllables_per_word": round(syllables_per_word, 2),
+        "flesch_kincaid_grade": round(max(flesch_kincaid, 0.0), 1),
+        "smog_grade": round(smog, 1),
+        "difficult_word_ratio": round(len(difficult_words) / word_count, 3),
+        "difficult_words": sorted(set(difficult_words))
+    }
+
+
+def analyze_texts(texts: Iterable[str]) -> List[Dict[str, Any]]:
+    """Batch mode; every passage shares the warm syllable cache"""
+    return [analyze_text(text) for text in texts]
+
+
+def lesson_texts(lesson: Dict[str, Any]) -> List[Tuple[str, int, str]]:
+    """Every objective, activity step and quiz stem of a lesson as (section, index, text)"""
+    texts = []
+    for index, objective in enumerate(lesson.get("objectives") or []):
+        texts.append(("objectives", index, objective.get("description", "") if isinstance(objective, dict) else str(objective)))
+
+    activity = (lesson.get("activity") or {}).get("activity") or {}
+    for index, step in enumerate(activity.get("steps") or []):
+        texts.append(("activity_steps", index, step.get("description", "") if isinstance(step, dict) else str(step)))
+
+    for index, item in enumerate((lesson.get("quiz") or {}).get("quiz_items") or []):
+        texts.append(("quiz_items", index, item.get("question", "")))
+
+    return [entry for entry in texts if entry[2]]
+
+
+def analyze_lesson(lesson: Dict[str, Any], grade_level: Any, tolerance: float = 1.0) -> Dict[str, Any]:
+    """Score every objective, step and quiz stem of a lesson in one pass"""
+    target = parse_grade(grade_level)
+    entries = lesson_texts(lesson)
+    results = analyze_texts(text for _, _, text in entries)
+
+    items = []
+    for (section, index, text), metrics in zip(entries, results):
+        items.append({
+            "section": section,
+            "index": index,
+            "text": text,
+            "is_appropriate": metrics["flesch_kincaid_grade"] <= target + tolerance,
+            **metrics
+        })
+
+    total_words = sum(item["words"] for item in items)
+    return {
+        "target_grade": target,
+        "items": items,
+        "flagged": [item for item in items if not item["is_appropriate"]],
+        "mean_grade": round(sum(item["flesch_kincaid_grade"] * item["words"] for item in items) / total_words, 1) if total_words else 0.0
+    }
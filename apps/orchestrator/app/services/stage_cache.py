@@ -0,0 +1,201 @@
+"""
+Content-addressed cache for agent stage results.
+
+Keys are a SHA-256 over the stage name, its prompt template version and a
+canonical JSON encoding of the stage inputs, so identical inputs always map
+to the same entry. Results live in an in-process LRU and, optionally, in
+Redis so every orchestrator replica shares them.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Handed to in-flight waiters when the caller computing their key is cancelled
+_OWNER_CANCELLED = object()
+
+
+def canonical_json(value: Any) -> str:
+    """Encode a value as stable, whitespace-free JSON"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def stage_cache_key(stage: str, version: str, inputs: Any) -> str:
+    """Build the cache key for a stage call"""
+    payload = canonical_json({"stage": stage, "version": version, "inputs": inputs})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRU:
+    """Bounded in-memory LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class StageCache:
+    """Two-tier stage result cache with single-flight computation"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 86400,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "stage_cache:"
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.memory = MemoryLRU(max_entries, ttl_seconds)
+        self.redis_url = redis_url
+        self._redis = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "shared_in_flight": 0,
+            "redis_errors": 0
+        }
+
+    def _get_redis(self):
+        if self.redis_url and self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Look a key up in memory, then Redis; returns (hit, value)"""
+        payload = self.memory.get(key)
+        if payload is not None:
+            self._stats["memory_hits"] += 1
+            return True, json.loads(payload)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(self.key_prefix + key)
+            except Exception as e:
+                print(f"Stage cache Redis read failed: {e}")
+                self._stats["redis_errors"] += 1
+                raw = None
+
+            if raw is not None:
+                payload = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+                self.memory.set(key, payload)
+                self._stats["redis_hits"] += 1
+                return True, json.loads(payload)
+
+        self._stats["misses"] += 1
+        return False, None
+
+    async def set(self, key: str, value: Any) -> str:
+        """Store a value in every tier and return its serialized form"""
+        # Stored serialized so callers never share (and mutate) one cached object
+        payload = json.dumps(value, default=str)
+        self.memory.set(key, payload)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(self.key_prefix + key, payload, ex=self.ttl_seconds)
+            except Exception as e:
+                print(f"Stage cache Redis write failed: {e}")
+                self._stats["redis_errors"] += 1
+
+        return payload
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, computing it once for concurrent callers
+
+        If the caller computing a key is cancelled, its waiters are not: the
+        first of them to wake takes over the computation.
+        """
+        while True:
+            hit, value = await self.get(key)
+            if hit:
+                return value
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self._stats["shared_in_flight"] += 1
+            payload = await asyncio.shield(pending)
+            if payload is not _OWNER_CANCELLED:
+                return json.loads(payload)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            future.set_result(await self.set(key, value))
+            return value
+        except asyncio.CancelledError:
+            future.set_result(_OWNER_CANCELLED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved for the no-waiter case
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters"""
+        lookups = self._stats["memory_hits"] + self._stats["redis_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["redis_hits"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "redis_enabled": self.redis_url is not None
+        }
+
+    def clear(self):
+        """Drop every in-memory entry"""
+        self.memory.clear()
+
+
+# Global cache instance
+stage_cache = StageCache(
+    max_entries=settings.STAGE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.STAGE_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL if settings.STAGE_CACHE_REDIS_ENABLED else None
+)
@@ -0,0 +1,187 @@
+"""
+Time allocation solver for lesson sections.
+
+Sections share a budget of whole minutes in proportion to their weight
+(an explicit "weight", otherwise their priority), clamped to each
+section's "min_duration" and "max_duration". A "locked" section keeps its
+current duration, which is how the planner pins a section the teacher has
+just dragged. A section that already has time is never rounded down to
+zero minutes; it keeps at least one. The clamped proportional split is solved exactly by walking
+the breakpoints of a piecewise-linear function. It is then rounded with
+the largest-remainder method, so the minutes add up to the budget without
+dumping the rounding error on one section. Section order is never changed.
+
+Multi-day plans split the sections into consecutive runs, one per day.
+The split is chosen by dynamic programming so that each day's share of
+the weight tracks its share of the minutes.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+PRIORITY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+DEFAULT_PRIORITY = "medium"
+MIN_SECTION_MINUTES = 1
+
+
+def section_weight(section: Dict[str, Any]) -> float:
+    if section.get("weight") is not None:
+        return max(float(section["weight"]), 0.0)
+    return float(PRIORITY_WEIGHTS.get(section.get("priority", DEFAULT_PRIORITY), PRIORITY_WEIGHTS[DEFAULT_PRIORITY]))
+
+
+def section_bounds(section: Dict[str, Any]) -> Tuple[int, float]:
+    """Smallest and largest duration the section may be given"""
+    if section.get("locked") and section.get("duration") is not None:
+        duration = int(section["duration"])
+        return duration, duration
+
+    low = int(section.get("min_duration") or 0)
+    if (section.get("duration") or 0) > 0:
+        # Rebalancing must not silently drop a section that is in the plan
+        low = max(low, MIN_SECTION_MINUTES)
+    high = section.get("max_duration")
+    return low, max(int(high), low) if high is not None else math.inf
+
+
+def _clamped_shares(weights: Sequence[float], bounds: Sequence[Tuple[int, float]], total: float) -> List[float]:
+    """Solve sum(clamp(w * t, low, high)) == total for t and return the clamped shares"""
+    def shares_at(t: float) -> List[float]:
+        return [min(max(weight * t, low), high) for weight, (low, high) in zip(weights, bounds)]
+
+    lowest = sum(low for low, _ in bounds)
+    highest = sum(high for _, high in bounds)
+    if total <= lowest:
+        return [float(low) for low, _ in bounds]
+    if total >= highest:
+        return [float(high) for _, high in bounds]
+
+    # The sum is piecewise linear in t with kinks where a section hits a bound
+    breakpoints = sorted({
+        bound / weight
+        for weight, section_bounds_ in zip(weights, bounds) if weight > 0
+        for bound in section_bounds_ if bound != math.inf
+    })
+
+    previous_t, previous_sum = 0.0, float(lowest)
+    for t in breakpoints + [math.inf]:
+        if t == math.inf:
+            # Past the last kink only unbounded sections still grow
+            slope = sum(weight for weight, (_, high) in zip(weights, bounds) if weight > 0 and high == math.inf)
+            if slope == 0:
+                return shares_at(previous_t)
+            return shares_at(previous_t + (total - previous_sum) / slope)
+
+        current_sum = sum(shares_at(t))
+        if current_sum >= total:
+            fraction = (total - previous_sum) / (current_sum - previous_sum)
+            return shares_at(previous_t + fraction * (t - previous_t))
+        previous_t, previous_sum = t, current_sum
+
+
+def _largest_remainder(shares: Sequence[float], total: int) -> List[int]:
+    """Round shares down, then give the leftover minutes to the largest fractions"""
+    durations = [math.floor(share) for share in shares]
+    leftover = total - sum(durations)
+    if leftover <= 0:
+        return durations
+
+    # Only fractional shares round up, so no section passes its maximum; ties go to the earlier section
+    fractional = [index for index in range(len(shares)) if shares[index] > durations[index]]
+    by_remainder = sorted(fractional, key=lambda index: durations[index] - shares[index])
+    for index in by_remainder[:leftover]:
+        durations[index] += 1
+    return durations
+
+
+def solve_allocation(sections: Sequence[Dict[str, Any]], total_time: int) -> Dict[str, Any]:
+    """Whole-minute durations for the sections, in their original order"""
+    if not sections:
+        return {"durations": [], "allocated": 0, "fits": total_time == 0}
+
+    weights = [section_weight(section) for section in sections]
+    bounds = [section_bounds(section) for section in sections]
+    if not any(weights):
+        weights = [1.0] * len(sections)
+
+    durations = _largest_remainder(_clamped_shares(weights, bounds, total_time), total_time)
+    allocated = sum(durations)
+    return {
+        "durations": durations,
+        "allocated": allocated,
+        # False when the minimums overrun the budget or the maximums cannot fill it
+        "fits": allocated == total_time
+    }
+
+
+def allocate_sections(sections: Sequence[Dict[str, Any]], total_time: int) -> List[Dict[str, Any]]:
+    """Copies of the sections with a "duration" from the solver"""
+    durations = solve_allocation(sections, total_time)["durations"]
+    return [{**section, "duration": duration} for section, duration in zip(sections, durations)]
+
+
+def _day_cost(weight_share: float, budget_share: float) -> float:
+    return (weight_share - budget_share) ** 2
+
+
+def allocate_days(sections: Sequence[Dict[str, Any]], day_minutes: Union[int, Sequence[int]], days: Optional[int] = None) -> Dict[str, Any]:
+    """Split the sections into consecutive days and allocate each day's minutes
+
+    ``day_minutes`` is either one budget per day or a single budget repeated
+    for ``days`` days.
+    """
+    if isinstance(day_minutes, int):
+        budgets = [day_minutes] * (days or 1)
+    else:
+        budgets = list(day_minutes)
+    if not budgets:
+        raise ValueError("At least one day is required")
+
+    count = len(sections)
+    weights = [section_weight(section) for section in sections]
+    minimums = [section_bounds(section)[0] for section in sections]
+    prefix_weight = [0.0]
+    prefix_minimum = [0]
+    for weight, minimum in zip(weights, minimums):
+        prefix_weight.append(prefix_weight[-1] + weight)
+        prefix_minimum.append(prefix_minimum[-1] + minimum)
+
+    total_weight = prefix_weight[-1] or 1.0
+    total_budget = sum(budgets) or 1
+
+    # best[d][i]: (overflowing days, cost) of placing the first i sections on the first d days
+    best = [[(math.inf, math.inf)] * (count + 1) for _ in range(len(budgets) + 1)]
+    split_at = [[0] * (count + 1) for _ in range(len(budgets) + 1)]
+    best[0][0] = (0, 0.0)
+    for day, budget in enumerate(budgets, start=1):
+        budget_share = budget / total_budget
+        for end in range(count + 1):
+            for start in range(end + 1):
+                previous = best[day - 1][start]
+                if previous[0] == math.inf:
+                    continue
+                overflow = int(prefix_minimum[end] - prefix_minimum[start] > budget)
+                weight_share = (prefix_weight[end] - prefix_weight[start]) / total_weight
+                candidate = (previous[0] + overflow, previous[1] + _day_cost(weight_share, budget_share))
+                if candidate < best[day][end]:
+                    best[day][end] = candidate
+                    split_at[day][end] = start
+
+    boundaries = [count]
+    for day in range(len(budgets), 0, -1):
+        boundaries.append(split_at[day][boundaries[-1]])
+    boundaries.reverse()
+
+    plan = []
+    for day, budget in enumerate(budgets):
+        day_sections = list(sections[boundaries[day]:boundaries[day + 1]])
+        solution = solve_allocation(day_sections, budget)
+        plan.append({
+            "day": day + 1,
+            "budget": budget,
+            "sections": [{**section, "duration": duration} for section, duration in zip(day_sections, solution["durations"])],
+            "allocated": solution["allocated"],
+            "fits": solution["fits"]
+        })
+
+    return {"days": plan, "fits": all(day["fits"] for day in plan)}
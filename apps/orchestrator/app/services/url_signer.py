@@ -0,0 +1,119 @@
+"""
+HMAC-signed download URLs with key rotation.
+
+Each signing key is keyed into an HMAC-SHA256 state once at startup; every
+signature copies that state instead of re-deriving the key. URLs carry the
+id of the key that signed them, so old links keep verifying while a new key
+is rolled out, and a whole lesson or unit is signed in one batch call that
+shares a single expiry.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from app.core.config import settings
+
+
+def parse_signing_keys(spec: str) -> Dict[str, str]:
+    """Parse ``kid:secret,kid:secret`` into a key map"""
+    keys = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        key_id, separator, secret = item.strip().partition(":")
+        if not separator or not key_id or not secret:
+            raise ValueError(f"Invalid URL signing key entry: {item!r}")
+        keys[key_id] = secret
+    return keys
+
+
+class UrlSigner:
+    """Signs and verifies expiring file URLs"""
+
+    def __init__(self, keys: Dict[str, str], active_key_id: str, base_url: str):
+        if active_key_id not in keys:
+            raise ValueError(f"Active URL signing key {active_key_id!r} is not configured")
+
+        self.active_key_id = active_key_id
+        self.base_url = base_url.rstrip("/")
+        self._base = urlsplit(self.base_url)
+        self._macs = {
+            key_id: hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+            for key_id, secret in keys.items()
+        }
+
+    def _signature(self, key_id: str, file_path: str, expires: int) -> str:
+        mac = self._macs[key_id].copy()
+        mac.update(f"{file_path}\n{expires}".encode("utf-8"))
+        return base64.urlsafe_b64encode(mac.digest()).rstrip(b"=").decode("ascii")
+
+    def _signed(self, file_path: str, expires: int) -> Dict[str, Any]:
+        signature = self._signature(self.active_key_id, file_path, expires)
+        return {
+            "signed_url": (
+                f"{self.base_url}/{quote(file_path)}"
+                f"?expires={expires}&kid={self.active_key_id}&signature={signature}"
+            ),
+            "expires_at": expires,
+            "file_path": file_path,
+            "key_id": self.active_key_id
+        }
+
+    def sign(self, file_path: str, expiration_hours: int = 24) -> Dict[str, Any]:
+        """Sign one file path"""
+        return self._signed(file_path, int(time.time()) + expiration_hours * 3600)
+
+    def sign_many(self, file_paths: Iterable[str], expiration_hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """Sign every path in one call with a shared expiry"""
+        expires = int(time.time()) + expiration_hours * 3600
+        return {file_path: self._signed(file_path, expires) for file_path in file_paths}
+
+    def verify(
+        self,
+        file_path: str,
+        expires: int,
+        key_id: str,
+        signature: str,
+        now: Optional[float] = None
+    ) -> bool:
+        """Check a signature in constant time; expired links and unknown keys fail"""
+        if key_id not in self._macs:
+            return False
+        if int(expires) < (time.time() if now is None else now):
+            return False
+        return hmac.compare_digest(self._signature(key_id, file_path, int(expires)), signature)
+
+    def verify_url(self, url: str, now: Optional[float] = None) -> bool:
+        """Verify a URL produced by ``sign``; it must sit under this signer's base URL"""
+        parts = urlsplit(url)
+        # The signature covers only the file path, so the base is checked separately
+        if (parts.scheme.lower(), parts.netloc.lower()) != (self._base.scheme.lower(), self._base.netloc.lower()):
+            return False
+        if not parts.path.startswith(self._base.path + "/"):
+            return False
+
+        query = parse_qs(parts.query)
+        try:
+            expires = int(query["expires"][0])
+            key_id = query["kid"][0]
+            signature = query["signature"][0]
+        except (KeyError, IndexError, ValueError):
+            return False
+
+        file_path = unquote(parts.path[len(self._base.path) + 1:])
+        return self.verify(file_path, expires, key_id, signature, now)
+
+
+def create_url_signer() -> UrlSigner:
+    """Build the signer from settings, falling back to SECRET_KEY when no keys are set"""
+    keys = parse_signing_keys(settings.URL_SIGNING_KEYS) or {"default": settings.SECRET_KEY}
+    active_key_id = settings.URL_SIGNING_ACTIVE_KEY_ID or next(iter(keys))
+    return UrlSigner(keys, active_key_id, settings.SIGNED_URL_BASE)
+
+
+# Global signer instance
+url_signer = create_url_signer()
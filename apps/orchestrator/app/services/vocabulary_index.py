@@ -0,0 +1,128 @@
+"""
+Grade-banded vocabulary index.
+
+The bundled word lists are loaded once into a hash map from lemma to
+(band, rank), so a lookup is a dict probe per lemma candidate. Inflected
+forms are reduced by a handful of suffix rules (plurals, past tense,
+-ing, comparatives, -ly) plus a table of irregular forms, and resolved
+words are memoized. Texts are summarized as counts per grade band rather
+than word lists, so reports stay small for whole units.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.data.vocabulary_bands import (
+    BAND_START_GRADES,
+    BAND_WORDS,
+    FUNCTION_WORDS,
+    GRADE_BANDS,
+    IRREGULAR_FORMS,
+)
+from app.services.readability import WORD, count_syllables
+
+UNLISTED = "unlisted"
+COMPLEX_WORD_SAMPLE_SIZE = 20
+
+_VOWELS = set("aeiou")
+
+
+def lemma_candidates(word: str) -> Iterator[str]:
+    """Yield the word and the lemmas its suffixes could have come from"""
+    yield word
+    if word in IRREGULAR_FORMS:
+        yield IRREGULAR_FORMS[word]
+
+    for suffix, replacements in (
+        ("ies", ("y",)),
+        ("ied", ("y",)),
+        ("es", ("", "e")),
+        ("s", ("",)),
+        ("ing", ("", "e")),
+        ("ed", ("", "e")),
+        ("est", ("", "e")),
+        ("er", ("", "e")),
+        ("ly", ("",)),
+    ):
+        if not word.endswith(suffix) or len(word) - len(suffix) < 2:
+            continue
+        stem = word[:-len(suffix)]
+        for replacement in replacements:
+            yield stem + replacement
+        # stopped -> stop, running -> run, bigger -> big
+        if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS:
+            yield stem[:-1]
+
+
+class VocabularyIndex:
+    """Maps words to the lowest grade band whose list contains their lemma"""
+
+    def __init__(self, band_words: Dict[str, str] = BAND_WORDS):
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        for band, name in enumerate(GRADE_BANDS):
+            for rank, word in enumerate(band_words[name].split()):
+                self._entries.setdefault(word, (band, rank))
+        self.lookup = lru_cache(maxsize=65536)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, word: str) -> Optional[Tuple[int, int]]:
+        for candidate in lemma_candidates(word.lower()):
+            entry = self._entries.get(candidate)
+            if entry is not None:
+                return entry
+        return None
+
+    def band_of(self, word: str) -> str:
+        entry = self.lookup(word.lower())
+        return GRADE_BANDS[entry[0]] if entry else UNLISTED
+
+    def is_complex(self, word: str, grade: float) -> bool:
+        """Listed above the grade's band, or unlisted and polysyllabic"""
+        entry = self.lookup(word.lower())
+        if entry is None:
+            return count_syllables(word) >= 3
+        return BAND_START_GRADES[entry[0]] > grade
+
+    def profile(self, words: Iterable[str], grade: float, sample_size: int = COMPLEX_WORD_SAMPLE_SIZE) -> Dict[str, Any]:
+        """Count content words per band and collect a capped sample of complex ones"""
+        band_counts = {name: 0 for name in GRADE_BANDS + [UNLISTED]}
+        content_words = 0
+        complex_count = 0
+        sample: Dict[str, Tuple[int, int]] = {}
+
+        for word in words:
+            word = word.lower()
+            if word in FUNCTION_WORDS:
+                continue
+            content_words += 1
+
+            entry = self.lookup(word)
+            band_counts[GRADE_BANDS[entry[0]] if entry else UNLISTED] += 1
+            if not self.is_complex(word, grade):
+                continue
+
+            complex_count += 1
+            if word not in sample:
+                # Unlisted words sort as rarer than any listed one
+                sample[word] = entry if entry else (len(GRADE_BANDS), 0)
+
+        rarest_first = sorted(sample, key=lambda word: sample[word], reverse=True)
+        return {
+            "band_counts": band_counts,
+            "content_words": content_words,
+            "complex_word_count": complex_count,
+            "complex_words": rarest_first[:sample_size]
+        }
+
+    def profile_text(self, text: str, grade: float) -> Dict[str, Any]:
+        return self.profile(WORD.findall(text), grade)
+
+    def profile_texts(self, texts: Iterable[str], grade: float) -> List[Dict[str, Any]]:
+        """Batch mode for whole units; lookups stay memoized across texts"""
+        return [self.profile_text(text, grade) for text in texts]
+
+
+# Global index, built once at import
+vocabulary_index = VocabularyIndex()
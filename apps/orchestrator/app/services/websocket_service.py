@@ -1,29 +1,146 @@
 # Created automatically by Cursor AI (2024-08-26)
 import asyncio
 import json
-from typing import Dict, Set, Any
+from collections import deque
+from typing import Deque, Dict, List, Set, Any, Optional
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
+from app.core.config import settings
+from app.services.event_broker import EventBroker, client_channel, create_event_broker, decode_envelope, encode_envelope, lesson_channel
+
+def stage_message(stage: str, seq: int, data: Any, total: Optional[int] = None, **fields) -> Dict[str, Any]:
+    """Build the envelope for one completed lesson stage
+
+    ``seq`` increases by one per message of a generation so clients can
+    order them and detect gaps.
+    """
+    message = {
+        "type": "lesson_stage",
+        **fields,
+        "stage": stage,
+        "seq": seq,
+        "data": data,
+        "timestamp": datetime.now().isoformat()
+    }
+    if total is not None:
+        message["total"] = total
+    return message
+
+def export_progress_key(lesson_id: str) -> str:
+    """Coalesce key shared by a lesson's export progress messages"""
+    return f"export_progress:{lesson_id}"
+
+class ConnectionSender:
+    """Bounded outbound queue drained by one writer task per socket
+
+    Queued messages with the same coalesce key (export progress for one
+    lesson) are coalesced: a newer one replaces the pending one in place, so
+    a slow socket only ever receives the latest percentage.
+    """
+    
+    def __init__(self, websocket: WebSocket, manager: "WebSocketManager", max_depth: int):
+        self.websocket = websocket
+        self.manager = manager
+        self.max_depth = max_depth
+        self.queue: Deque[List[Any]] = deque()
+        self.pending: Dict[str, List[Any]] = {}
+        self.coalesced = 0
+        self._ready = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+    
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a payload; returns False when the queue is full"""
+        if coalesce_key is not None and coalesce_key in self.pending:
+            self.pending[coalesce_key][1] = payload
+            self.coalesced += 1
+            return True
+        
+        if len(self.queue) >= self.max_depth:
+            return False
+        
+        entry = [coalesce_key, payload]
+        self.queue.append(entry)
+        if coalesce_key is not None:
+            self.pending[coalesce_key] = entry
+        self._ready.set()
+        return True
+    
+    async def _run(self):
+        while True:
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            
+            entry = self.queue.popleft()
+            coalesce_key, payload = entry
+            if coalesce_key is not None and self.pending.get(coalesce_key) is entry:
+                del self.pending[coalesce_key]
+            
+            try:
+                await asyncio.wait_for(self.websocket.send_text(payload), timeout=self.manager.send_timeout)
+            except asyncio.TimeoutError:
+                if self.manager._record_slow_send(self.websocket):
+                    return
+                continue
+            except Exception as e:
+                print(f"Error sending to client: {e}")
+                self.manager.disconnect(self.websocket)
+                return
+            
+            self.manager._record_send(self.websocket)
+    
+    def close(self):
+        # The writer may be the one disconnecting its own socket
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
 
 class WebSocketManager:
-    """Manages WebSocket connections for real-time updates"""
+    """Manages WebSocket connections for real-time updates
+
+    With a broker, broadcasts are published once and every node delivers them
+    to the sockets it holds; without one, delivery is local to this process.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        send_timeout: float = 5.0,
+        send_queue_size: int = 256,
+        max_slow_strikes: int = 3,
+        broker: Optional[EventBroker] = None
+    ):
+        self.broker = broker
+        self._broker_started = False
+        self._background_tasks: Set[asyncio.Task] = set()
+        # channel -> in-flight broker subscribe that later sockets on the channel also wait for
+        self._pending_subscriptions: Dict[str, asyncio.Future] = {}
+        self.send_timeout = send_timeout
+        self.send_queue_size = send_queue_size
+        self.max_slow_strikes = max_slow_strikes
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         self.connection_data: Dict[WebSocket, Dict[str, Any]] = {}
+        # lesson_id -> sockets subscribed to it, so lesson broadcasts skip everyone else
+        self.lesson_subscribers: Dict[str, Set[WebSocket]] = {}
     
     async def connect(self, websocket: WebSocket, client_id: str):
         """Connect a new WebSocket client"""
         await websocket.accept()
         
+        channel = client_channel(client_id)
         if client_id not in self.active_connections:
             self.active_connections[client_id] = set()
+            self._broker_subscribe(channel)
         
         self.active_connections[client_id].add(websocket)
         self.connection_data[websocket] = {
             "client_id": client_id,
-            "connected_at": datetime.now().isoformat()
+            "connected_at": datetime.now().isoformat(),
+            "subscribed_lessons": set(),
+            "slow_strikes": 0,
+            "sender": ConnectionSender(websocket, self, self.send_queue_size)
         }
+        # Events published after connect returns must reach this socket
+        await self._subscription_ready(channel)
         
         print(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
     
@@ -36,35 +153,197 @@ class WebSocketManager:
             
             if not self.active_connections[client_id]:
                 del self.active_connections[client_id]
+                self._broker_unsubscribe(client_channel(client_id))
         
         if websocket in self.connection_data:
+            for lesson_id in list(self.connection_data[websocket]["subscribed_lessons"]):
+                self.unsubscribe(websocket, lesson_id)
+            self.connection_data[websocket]["sender"].close()
             del self.connection_data[websocket]
         
         print(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
     
-    async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
-        """Send a message to a specific WebSocket client"""
+    async def subscribe(self, websocket: WebSocket, lesson_id: str):
+        """Subscribe a connection to updates for a lesson; returns once events will be delivered"""
+        if websocket not in self.connection_data:
+            return
+        
+        channel = lesson_channel(lesson_id)
+        self.connection_data[websocket]["subscribed_lessons"].add(lesson_id)
+        if lesson_id not in self.lesson_subscribers:
+            self.lesson_subscribers[lesson_id] = set()
+            self._broker_subscribe(channel)
+        self.lesson_subscribers[lesson_id].add(websocket)
+        await self._subscription_ready(channel)
+    
+    def unsubscribe(self, websocket: WebSocket, lesson_id: str):
+        """Remove a connection's subscription to a lesson"""
+        if websocket in self.connection_data:
+            self.connection_data[websocket]["subscribed_lessons"].discard(lesson_id)
+        
+        subscribers = self.lesson_subscribers.get(lesson_id)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.lesson_subscribers[lesson_id]
+                self._broker_unsubscribe(lesson_channel(lesson_id))
+    
+    async def start(self):
+        """Attach to the broker and subscribe to channels for existing sockets"""
+        if self.broker is None or self._broker_started:
+            return
+        
+        await self.broker.start(self._on_broker_message)
+        self._broker_started = True
+        for client_id in self.active_connections:
+            await self.broker.subscribe(client_channel(client_id))
+        for lesson_id in self.lesson_subscribers:
+            await self.broker.subscribe(lesson_channel(lesson_id))
+    
+    async def close(self):
+        """Stop connection writers and detach from the broker"""
+        for data in self.connection_data.values():
+            data["sender"].close()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        
+        if self.broker is not None and self._broker_started:
+            self._broker_started = False
+            await self.broker.close()
+    
+    def _broker_subscribe(self, channel: str):
+        """Start a broker subscribe; callers await ``_subscription_ready`` before relying on it"""
+        if not self._broker_started:
+            return
+        
+        pending = asyncio.ensure_future(self.broker.subscribe(channel))
+        self._pending_subscriptions[channel] = pending
+        
+        def settled(future: asyncio.Future):
+            if self._pending_subscriptions.get(channel) is future:
+                del self._pending_subscriptions[channel]
+        
+        pending.add_done_callback(settled)
+    
+    async def _subscription_ready(self, channel: str):
+        """Wait for an in-flight subscribe on the channel, if any"""
+        pending = self._pending_subscriptions.get(channel)
+        if pending is None:
+            return
+        
+        try:
+            # Shielded so one cancelled caller does not cancel the subscribe for everyone
+            await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error subscribing to event broker channel {channel}: {e}")
+    
+    def _broker_unsubscribe(self, channel: str):
+        """Apply a broker unsubscribe in the background; callers may be synchronous"""
+        if not self._broker_started:
+            return
+        
+        self._spawn(self.broker.unsubscribe(channel))
+    
+    async def _publish(self, channel: str, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """Publish to the broker; returns False when delivery must stay local"""
+        if not self._broker_started:
+            return False
+        
         try:
-            await websocket.send_text(json.dumps(message))
+            await self.broker.publish(channel, encode_envelope(payload, coalesce_key))
+            return True
         except Exception as e:
-            print(f"Error sending message to client: {e}")
-            self.disconnect(websocket)
+            print(f"Error publishing to event broker, delivering locally: {e}")
+            return False
+    
+    async def _on_broker_message(self, channel: str, data: str):
+        """Deliver a brokered message to this node's matching sockets"""
+        payload, coalesce_key = decode_envelope(data)
+        kind, _, key = channel.partition(":")
+        if kind == "client":
+            websockets = self.active_connections.get(key)
+        elif kind == "lesson":
+            websockets = self.lesson_subscribers.get(key)
+        else:
+            return
+        
+        if websockets:
+            self._fan_out(websockets, payload, coalesce_key)
+    
+    async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
+        """Send a message to a specific WebSocket client"""
+        if websocket in self.connection_data:
+            self._fan_out([websocket], json.dumps(message))
     
     async def broadcast_to_client(self, client_id: str, message: Dict[str, Any]):
         """Broadcast a message to all connections of a specific client"""
+        payload = json.dumps(message)
+        if await self._publish(client_channel(client_id), payload):
+            return
+        
         if client_id in self.active_connections:
-            disconnected = set()
-            
-            for websocket in self.active_connections[client_id]:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except Exception as e:
-                    print(f"Error broadcasting to client {client_id}: {e}")
-                    disconnected.add(websocket)
-            
-            # Clean up disconnected websockets
-            for websocket in disconnected:
-                self.disconnect(websocket)
+            self._fan_out(self.active_connections[client_id], payload)
+    
+    async def broadcast_to_lesson(self, lesson_id: str, message: Dict[str, Any], coalesce_key: Optional[str] = None):
+        """Send a message to every connection subscribed to a lesson
+
+        A queued message with the same ``coalesce_key`` is replaced rather
+        than followed by this one.
+        """
+        payload = json.dumps(message)
+        if await self._publish(lesson_channel(lesson_id), payload, coalesce_key):
+            return
+        
+        if lesson_id in self.lesson_subscribers:
+            self._fan_out(self.lesson_subscribers[lesson_id], payload, coalesce_key)
+    
+    def _fan_out(self, websockets, payload: str, coalesce_key: Optional[str] = None):
+        """Queue one encoded payload on each socket's sender without waiting for the sends"""
+        # Snapshot the set; evictions below mutate it
+        for websocket in list(websockets):
+            data = self.connection_data.get(websocket)
+            if data is None:
+                continue
+            if not data["sender"].enqueue(payload, coalesce_key):
+                print(f"Send queue full for client {data['client_id']}")
+                self._evict(websocket)
+    
+    def _record_send(self, websocket: WebSocket):
+        data = self.connection_data.get(websocket)
+        if data is not None:
+            data["slow_strikes"] = 0
+    
+    def _record_slow_send(self, websocket: WebSocket) -> bool:
+        """Count a timed-out send; returns True when the socket was evicted"""
+        data = self.connection_data.get(websocket)
+        if data is None:
+            return True
+        
+        data["slow_strikes"] += 1
+        if data["slow_strikes"] >= self.max_slow_strikes:
+            self._evict(websocket)
+            return True
+        return False
+    
+    def _evict(self, websocket: WebSocket):
+        """Drop a consumer that cannot keep up so its backlog stops growing"""
+        print(f"Evicting slow client {self.connection_data[websocket]['client_id']}")
+        self.disconnect(websocket)
+        # 1013: try again later; the client is expected to reconnect
+        self._spawn(self._close_quietly(websocket, 1013))
+    
+    async def _close_quietly(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
     async def broadcast_export_progress(self, lesson_id: str, progress_data: Dict[str, Any]):
         """Broadcast export progress updates"""
@@ -75,9 +354,7 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Broadcast to all clients (in a real app, you'd filter by lesson_id)
-        for client_id in list(self.active_connections.keys()):
-            await self.broadcast_to_client(client_id, message)
+        await self.broadcast_to_lesson(lesson_id, message, coalesce_key=export_progress_key(lesson_id))
     
     async def broadcast_export_complete(self, lesson_id: str, export_data: Dict[str, Any]):
         """Broadcast export completion"""
@@ -88,11 +365,15 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        for client_id in list(self.active_connections.keys()):
-            await self.broadcast_to_client(client_id, message)
+        await self.broadcast_to_lesson(lesson_id, message)
 
 # Global WebSocket manager instance
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(
+    send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+    send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+    max_slow_strikes=settings.WS_MAX_SLOW_STRIKES,
+    broker=create_event_broker(settings.WS_BROKER_BACKEND)
+)
 
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """WebSocket endpoint for handling connections"""
@@ -115,15 +396,24 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 lesson_id = message.get("lesson_id")
                 if lesson_id:
                     # Subscribe to export updates for this lesson
-                    websocket_manager.connection_data[websocket]["subscribed_lessons"] = \
-                        websocket_manager.connection_data[websocket].get("subscribed_lessons", set())
-                    websocket_manager.connection_data[websocket]["subscribed_lessons"].add(lesson_id)
+                    await websocket_manager.subscribe(websocket, lesson_id)
                     
                     await websocket_manager.send_personal_message({
                         "type": "subscribed",
                         "lesson_id": lesson_id,
                         "timestamp": datetime.now().isoformat()
                     }, websocket)
+            
+            elif message.get("type") == "unsubscribe_export":
+                lesson_id = message.get("lesson_id")
+                if lesson_id:
+                    websocket_manager.unsubscribe(websocket, lesson_id)
+                    
+                    await websocket_manager.send_personal_message({
+                        "type": "unsubscribed",
+                        "lesson_id": lesson_id,
+                        "timestamp": datetime.now().isoformat()
+                    }, websocket)
     
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
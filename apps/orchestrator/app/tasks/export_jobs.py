@@ -0,0 +1,10 @@
+from app.core.celery_app import celery_app
+from app.services.artifact_store import artifact_store
+
+COLLECT_ARTIFACTS_TASK = "exports.collect_garbage"
+
+
+@celery_app.task(name=COLLECT_ARTIFACTS_TASK)
+def collect_export_artifacts():
+    """Drop expired export manifests and the blobs nothing references any more"""
+    return artifact_store.collect_garbage()
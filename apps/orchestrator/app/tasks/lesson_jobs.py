@@ -0,0 +1,16 @@
+from app.core.celery_app import celery_app
+from app.services.lesson_jobs import FINALIZE_JOB_TASK, RUN_STAGE_TASK, lesson_job_service
+
+
+@celery_app.task(name=RUN_STAGE_TASK)
+def run_lesson_stage(job_id: str, stage_name: str):
+    """Run one lesson pipeline stage for a job"""
+    lesson_job_service.execute_stage(job_id, stage_name)
+    return {"job_id": job_id, "stage": stage_name, "status": "completed"}
+
+
+@celery_app.task(name=FINALIZE_JOB_TASK)
+def finalize_lesson_job(job_id: str):
+    """Mark a lesson job complete after its final layer"""
+    lesson_job_service.finalize(job_id)
+    return {"job_id": job_id, "status": "completed"}
@@ -5,17 +5,25 @@ import uvicorn
 import uuid
 
 from app.core.config import settings
+from app.core.agent_runner import agent_runner
+from app.core.agent_pool import agent_pool
 from app.api.v1.api import api_router
-from app.services.websocket_service import websocket_endpoint
+from app.services.websocket_service import websocket_endpoint, websocket_manager
+from app.services.export_renderers import render_scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("Starting AI Teacher's Lounge Orchestrator...")
+    await websocket_manager.start()
     yield
     # Shutdown
     print("Shutting down AI Teacher's Lounge Orchestrator...")
+    await websocket_manager.close()
+    agent_runner.shutdown(wait=False)
+    await agent_pool.aclose()
+    render_scheduler.shutdown(wait=False)
 
 
 app = FastAPI(
@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from app.core.agent_pool import AgentPool
+
+class TestAgentPool:
+    """Test suite for the shared agent and LLM client pool"""
+    
+    def test_llm_clients_are_shared(self):
+        """Test that identical model settings reuse one chat model"""
+        pool = AgentPool()
+        
+        first = pool.get_llm("gpt-4", 0.7)
+        second = pool.get_llm("gpt-4", 0.7)
+        other = pool.get_llm("gpt-4", 0.2)
+        
+        assert first is second
+        assert other is not first
+        assert pool.health()["clients_created"] == 1
+        pool.close()
+    
+    def test_agents_are_recycled_per_role(self):
+        """Test that released agents are handed out again"""
+        pool = AgentPool()
+        built = []
+        
+        def factory():
+            agent = object()
+            built.append(agent)
+            return agent
+        
+        with pool.acquire("quiz_builder", factory) as first:
+            pass
+        with pool.acquire("quiz_builder", factory) as second:
+            pass
+        with pool.acquire("udl_checker", factory):
+            pass
+        
+        assert first is second
+        assert len(built) == 2
+        assert pool.health()["agents_reused"] == 1
+        pool.close()
+    
+    def test_concurrent_checkouts_get_distinct_agents(self):
+        """Test that an agent is never shared by two callers at once"""
+        pool = AgentPool()
+        
+        with pool.acquire("reporter", object) as first:
+            with pool.acquire("reporter", object) as second:
+                assert first is not second
+        
+        assert pool.health()["idle_agents"]["reporter"] == 2
+        pool.close()
+    
+    def test_failed_agent_is_discarded(self):
+        """Test that agents whose call failed are not returned to the pool"""
+        pool = AgentPool()
+        
+        with pytest.raises(RuntimeError):
+            with pool.acquire("math_setter", object):
+                raise RuntimeError("LLM error")
+        
+        health = pool.health()
+        assert health["agents_discarded"] == 1
+        assert "math_setter" not in health["idle_agents"]
+        pool.close()
+    
+    def test_idle_limit(self):
+        """Test that the idle stack per role is bounded"""
+        pool = AgentPool(max_idle_per_role=1)
+        
+        with pool.acquire("exporter", object):
+            with pool.acquire("exporter", object):
+                pass
+        
+        assert pool.health()["idle_agents"]["exporter"] == 1
+        pool.close()
+    
+    def test_closed_client_is_replaced(self):
+        """Test that a closed HTTP client is rebuilt on next use"""
+        pool = AgentPool()
+        pool.get_llm()
+        pool.close()
+        
+        assert pool.health()["http_client_open"] is False
+        
+        pool.get_llm()
+        health = pool.health()
+        assert health["http_client_open"] is True
+        assert health["clients_created"] == 2
+        pool.close()
+    
+    def test_async_client_shares_pooled_http_client(self):
+        """Test that the async OpenAI client uses the pooled async HTTP client and is closed on shutdown"""
+        pool = AgentPool()
+        pool.get_llm()
+        async_http_client = pool._async_http_client
+        
+        assert pool._async_openai_client._client is async_http_client
+        assert pool.health()["async_http_client_open"] is True
+        
+        asyncio.run(pool.aclose())
+        
+        assert async_http_client.is_closed
+        assert pool.health()["async_http_client_open"] is False
+        assert pool.health()["http_client_open"] is False
+    
+    def test_agents_built_with_pooled_llm_are_kept(self):
+        """Test that the first agent built against a fresh client is reused"""
+        pool = AgentPool()
+        
+        def factory():
+            return {"llm": pool.get_llm()}
+        
+        with pool.acquire("objective_writer", factory) as first:
+            pass
+        with pool.acquire("objective_writer", factory) as second:
+            pass
+        
+        assert first is second
+        assert first["llm"] is pool.get_llm()
+        pool.close()
@@ -0,0 +1,111 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.services.artifact_store import ArtifactStore, lesson_id_for
+from app.services.object_storage import LocalObjectStorage
+
+def expiry(days: int) -> str:
+    return (datetime.now() + timedelta(days=days)).isoformat()
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(LocalObjectStorage(str(tmp_path)), gc_grace_seconds=0)
+
+class TestArtifactStore:
+    """Test suite for the content-addressed export artifact store"""
+    
+    def test_identical_renders_are_stored_once(self, store):
+        """Test that a repeated file is deduplicated across versions"""
+        first = store.store_version("lesson-1", "v1", {"slides_mdx": "# Solar", "quiz_pdf": "{}"}, expiry(30))
+        second = store.store_version("lesson-1", "v2", {"slides_mdx": "# Solar", "quiz_pdf": '{"q": 1}'}, expiry(30))
+        
+        assert first["uploaded_bytes"] == len("# Solar") + len("{}")
+        assert second["deduplicated_bytes"] == len("# Solar")
+        assert second["files"]["slides_mdx"]["storage_key"] == first["files"]["slides_mdx"]["storage_key"]
+        assert store.get_blob(first["files"]["slides_mdx"]["digest"]) == b"# Solar"
+        assert store.load_manifest("lesson-1", "v2")["files"].keys() == {"slides_mdx", "quiz_pdf"}
+    
+    def test_non_file_entries_are_skipped(self, store):
+        """Test that status flags and nested dicts are not stored as blobs"""
+        result = store.store_version("lesson-1", "v1", {"pack_pdf": "{}", "status": "completed", "bundle_zip": {}}, expiry(30))
+        
+        assert set(result["files"]) == {"pack_pdf"}
+    
+    def test_gc_honors_expires_at_and_refcounts(self, store):
+        """Test that only blobs referenced by expired manifests are collected"""
+        old = store.store_version("lesson-1", "v1", {"slides_mdx": "shared", "quiz_pdf": "old"}, expiry(-1))
+        store.store_version("lesson-1", "v2", {"slides_mdx": "shared", "quiz_pdf": "new"}, expiry(30))
+        
+        stats = store.collect_garbage()
+        
+        assert stats["expired_manifests"] == 1
+        assert stats["deleted_blobs"] == 1
+        assert store.load_manifest("lesson-1", "v1") is None
+        assert not store.storage.exists(old["files"]["quiz_pdf"]["storage_key"])
+        assert store.storage.exists(old["files"]["slides_mdx"]["storage_key"])
+    
+    def test_gc_keeps_recent_unreferenced_blobs(self, store):
+        """Test that blobs still waiting for their manifest survive the grace period"""
+        store.gc_grace_seconds = 60
+        blob = store.put_blob("in flight")
+        
+        assert store.collect_garbage()["deleted_blobs"] == 0
+        
+        stale = time.time() - 120
+        os.utime(store.storage._path(blob["storage_key"]), (stale, stale))
+        assert store.collect_garbage()["deleted_blobs"] == 1
+    
+    def test_reused_blob_restarts_grace_period(self, store):
+        """Test that reusing an old unreferenced blob protects it from a concurrent GC"""
+        store.gc_grace_seconds = 60
+        blob = store.put_blob("shared render")
+        path = store.storage._path(blob["storage_key"])
+        stale = time.time() - 120
+        os.utime(path, (stale, stale))
+        
+        reused = store.put_blob("shared render")
+        
+        assert reused["uploaded"] is False
+        assert store.collect_garbage()["deleted_blobs"] == 0
+        assert store.storage.exists(blob["storage_key"])
+    
+    def test_gc_rechecks_blobs_touched_after_listing(self, store, monkeypatch):
+        """Test that a blob reused between GC's listing and its delete survives"""
+        store.gc_grace_seconds = 60
+        blob = store.put_blob("shared render")
+        stale = time.time() - 120
+        os.utime(store.storage._path(blob["storage_key"]), (stale, stale))
+        list_objects = store.storage.list_objects
+        
+        def list_then_reuse(prefix=""):
+            items = list(list_objects(prefix))
+            if "blobs" in prefix:
+                store.put_blob("shared render")
+            return iter(items)
+        
+        monkeypatch.setattr(store.storage, "list_objects", list_then_reuse)
+        
+        assert store.collect_garbage()["deleted_blobs"] == 0
+    
+    def test_streamed_blob_is_moved_under_its_digest(self, store):
+        """Test that write_blob hashes while streaming and drops duplicate staging copies"""
+        first, written = store.write_blob(lambda stream: stream.write(b"zip bytes"))
+        second, _ = store.write_blob(lambda stream: stream.write(b"zip bytes"))
+        
+        assert written == len(b"zip bytes")
+        assert (first["uploaded"], second["uploaded"]) == (True, False)
+        assert store.get_blob(first["digest"]) == b"zip bytes"
+        assert list(store.storage.list_objects(f"{store.prefix}/staging/")) == []
+    
+    def test_gc_removes_abandoned_staging_objects(self, store):
+        """Test that staging objects left by a failed writer are collected"""
+        store.storage.put_bytes(f"{store.prefix}/staging/abandoned", b"partial")
+        
+        assert store.collect_garbage()["deleted_staging"] == 1
+        assert not store.storage.exists(f"{store.prefix}/staging/abandoned")
+    
+    def test_lesson_id_is_per_lesson(self):
+        """Test that lessons on one topic get their own ids and explicit ids win"""
+        assert lesson_id_for({"topic": "Solar Energy"}) != lesson_id_for({"topic": "Solar Energy"})
+        assert lesson_id_for({"topic": "Solar Energy", "lesson_id": "solar_energy_lesson"}) == "solar_energy_lesson"
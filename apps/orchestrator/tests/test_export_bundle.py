@@ -0,0 +1,133 @@
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+import pytest
+from app.agents.exporter import build_lesson_bundle
+from app.services.artifact_store import ArtifactStore
+from app.services.bundle_writer import BundleEntry, write_bundle
+from app.services.object_storage import LocalObjectStorage, S3MultipartWriter
+
+class FakeS3Client:
+    """Records multipart calls and assembles the uploaded object"""
+    
+    def __init__(self):
+        self.parts = {}
+        self.objects = {}
+        self.aborted = False
+    
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        return {"UploadId": "upload-1"}
+    
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+    
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.objects[Key] = b"".join(self.parts[number] for number in numbers)
+    
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+    
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+class TestExportBundle:
+    """Test suite for streamed bundle generation"""
+    
+    def test_bundle_is_a_real_zip(self, tmp_path):
+        """Test that the bundle archive holds every lesson file"""
+        storage = LocalObjectStorage(str(tmp_path))
+        lesson_data = {"topic": "Solar Energy", "objectives": [{"description": "Explain panels"}]}
+        export_files = {"slides_mdx": "# Solar Energy", "pack_pdf": {"title": "Lesson Pack"}}
+        
+        bundle = build_lesson_bundle(lesson_data, export_files, artifacts=ArtifactStore(storage))
+        
+        assert bundle["total_files"] == 7
+        assert "content" not in json.dumps(bundle["files"])
+        with storage.open_reader(bundle["storage_key"]) as stream:
+            archive = zipfile.ZipFile(io.BytesIO(stream.read()))
+        assert archive.read("slides.mdx") == b"# Solar Energy"
+        assert json.loads(archive.read("lesson_pack.pdf")) == {"title": "Lesson Pack"}
+        assert json.loads(archive.read("lesson_data.json")) == lesson_data
+        assert b"Solar Energy" in archive.read("README.md")
+    
+    def test_identical_bundles_are_stored_once(self, tmp_path):
+        """Test that re-exporting unchanged materials reuses the stored bundle blob"""
+        artifacts = ArtifactStore(LocalObjectStorage(str(tmp_path)))
+        lesson_data = {"topic": "Solar Energy"}
+        export_files = {"slides_mdx": "# Solar Energy"}
+        
+        first = build_lesson_bundle(lesson_data, export_files, artifacts=artifacts)
+        second = build_lesson_bundle(lesson_data, export_files, artifacts=artifacts)
+        
+        assert first["uploaded"] is True
+        assert second["uploaded"] is False
+        assert second["storage_key"] == first["storage_key"] == artifacts.blob_key(first["digest"])
+        assert [item["key"] for item in artifacts.storage.list_objects()] == [first["storage_key"]]
+    
+    def test_bundle_is_collected_with_its_manifest(self, tmp_path):
+        """Test that the bundle is referenced by the version manifest and reclaimed by GC"""
+        artifacts = ArtifactStore(LocalObjectStorage(str(tmp_path)), gc_grace_seconds=0)
+        bundle = build_lesson_bundle({"topic": "Solar Energy"}, {}, artifacts=artifacts)
+        expired = (datetime.now() - timedelta(days=1)).isoformat()
+        
+        stored = artifacts.store_version("lesson-1", "v1", {"slides_mdx": "# Solar", "bundle_zip": bundle}, expired)
+        
+        assert stored["files"]["bundle_zip"]["digest"] == bundle["digest"]
+        assert stored["uploaded_bytes"] == len("# Solar") + bundle["size"]
+        assert artifacts.collect_garbage()["deleted_blobs"] == 2
+        assert not artifacts.storage.exists(bundle["storage_key"])
+    
+    def test_entries_are_pulled_lazily(self, tmp_path):
+        """Test that entry sources are only read while they are being written"""
+        artifacts = ArtifactStore(LocalObjectStorage(str(tmp_path)))
+        calls = []
+        
+        def source(name):
+            def produce():
+                calls.append(name)
+                return [name * 1000, name * 1000]
+            return produce
+        
+        manifest = write_bundle(artifacts, [
+            BundleEntry("a.txt", "text", source("a")),
+            BundleEntry("b.txt", "text", source("b"))
+        ], chunk_size=256)
+        
+        assert calls == ["a", "b"]
+        assert [item["size"] for item in manifest["files"]] == [2000, 2000]
+    
+    def test_s3_writer_uploads_parts(self):
+        """Test that large objects go through multipart upload"""
+        client = FakeS3Client()
+        writer = S3MultipartWriter(client, "bucket", "bundle.zip", "application/zip", part_size=10)
+        
+        with writer:
+            for _ in range(5):
+                writer.write(b"abcdefg")
+        
+        assert len(client.parts) == 4
+        assert client.objects["bundle.zip"] == b"abcdefg" * 5
+    
+    def test_s3_writer_small_object_and_abort(self):
+        """Test single PUT for small objects and abort on failure"""
+        client = FakeS3Client()
+        with S3MultipartWriter(client, "bucket", "small.txt", "text/plain", part_size=100) as writer:
+            writer.write(b"hello")
+        assert client.objects["small.txt"] == b"hello"
+        
+        with pytest.raises(RuntimeError):
+            with S3MultipartWriter(client, "bucket", "broken.zip", "application/zip", part_size=4) as writer:
+                writer.write(b"abcdefgh")
+                raise RuntimeError("renderer failed")
+        assert client.aborted
+        assert "broken.zip" not in client.objects
+    
+    def test_local_storage_rejects_escaping_keys(self, tmp_path):
+        """Test that keys cannot escape the storage root"""
+        storage = LocalObjectStorage(str(tmp_path))
+        
+        with pytest.raises(ValueError):
+            storage.open_writer("../outside.txt")
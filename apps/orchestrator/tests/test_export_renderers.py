@@ -0,0 +1,185 @@
+import copy
+import json
+from multiprocessing import shared_memory
+import pytest
+import app.agents.exporter as exporter
+import app.services.export_service as export_service_module
+from app.agents.reporter import generate_slides_mdx
+import app.services.export_renderers as export_renderers
+from app.services.export_renderers import RenderScheduler, render_documents, render_materials
+from app.services.export_diff import diff_fingerprints, lesson_fingerprint
+from app.services.export_service import export_service
+from app.services.artifact_store import ArtifactStore
+from app.services.object_storage import LocalObjectStorage
+
+LESSON_DATA = {
+    "topic": "Solar Energy",
+    "objectives": [{"description": "Explain how solar panels work"}],
+    "sequence": {"sections": [{"title": "Hook", "duration": 10, "description": "Demo"}]},
+    "quiz": {"quiz_items": [{"type": "mcq", "points": 2, "correct_answer": "A"}]},
+    "activity": {"activity": {"steps": ["Build an oven"]}},
+    "udl": {"flags": []}
+}
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    storage = LocalObjectStorage(str(tmp_path))
+    monkeypatch.setattr(exporter, "artifact_store", ArtifactStore(storage))
+    monkeypatch.setattr(export_service, "artifact_store", ArtifactStore(storage))
+    return storage
+
+class TestExportRenderers:
+    """Test suite for the direct export rendering engine"""
+    
+    def test_documents_match_tool_output(self):
+        """Test that the direct renderers produce what the crew tools produce"""
+        documents = render_documents(LESSON_DATA)
+        
+        assert documents["status"] == "completed"
+        assert documents["slides_mdx"] == generate_slides_mdx.func(LESSON_DATA)
+        assert json.loads(documents["pack_pdf"])["title"] == "Lesson Pack: Solar Energy"
+    
+    def test_materials(self, local_storage):
+        """Test gradebook, bundle, change log and signed URLs"""
+        documents = render_documents(LESSON_DATA)
+        materials = render_materials(LESSON_DATA, documents)
+        
+        assert materials["status"] == "completed"
+        assert json.loads(materials["csv_grades"])["headers"][2] == "Q1"
+        assert local_storage.exists(materials["bundle_zip"]["storage_key"])
+        assert set(materials["signed_urls"]) == set(documents) - {"status"}
+    
+    def test_export_service_skips_crew_by_default(self, local_storage, monkeypatch):
+        """Test that exports never touch the LLM crews unless opted in"""
+        def crew_path(*args):
+            raise AssertionError("crew should not run")
+        
+        monkeypatch.setattr(export_service_module, "generate_lesson_exports", crew_path)
+        monkeypatch.setattr(export_service_module, "export_lesson_materials", crew_path)
+        
+        result = export_service.generate_export_files(LESSON_DATA)
+        
+        assert result["status"] == "completed"
+        assert result["files"]["bundle_zip"]["total_files"] == 7
+        assert "bundle_zip" in result["metadata"]["render_timings_ms"]
+    
+    def test_metadata_reports_exact_sizes(self, local_storage):
+        """Test that per-file sizes are the stored byte counts"""
+        result = export_service.generate_export_files(LESSON_DATA)
+        metadata = result["metadata"]
+        bundle = result["files"]["bundle_zip"]
+        
+        assert metadata["file_sizes"]["slides_mdx"] == len(result["files"]["slides_mdx"].encode("utf-8"))
+        assert metadata["file_sizes"]["bundle_zip"] == local_storage.open_reader(bundle["storage_key"]).seek(0, 2)
+        assert metadata["total_size"] == sum(metadata["file_sizes"].values())
+    
+    def test_process_pool_matches_inline(self):
+        """Test that pooled rendering gives the same output with per-format timings"""
+        scheduler = RenderScheduler(processes=2)
+        timings = {}
+        try:
+            pooled = render_documents(LESSON_DATA, timings=timings, scheduler=scheduler)
+        finally:
+            scheduler.shutdown()
+        
+        assert pooled == render_documents(LESSON_DATA, scheduler=RenderScheduler(processes=0))
+        assert set(timings) == {"pack_pdf", "slides_mdx", "worksheets_docx", "quiz_pdf"}
+    
+    def test_worker_decodes_lesson_once(self, monkeypatch):
+        """Test that a worker reuses the decoded lesson for every format"""
+        decoded = []
+        real_loads = json.loads
+        
+        def counting_loads(payload):
+            decoded.append(payload)
+            return real_loads(payload)
+        
+        monkeypatch.setattr(export_renderers.json, "loads", counting_loads)
+        monkeypatch.setattr(export_renderers, "_WORKER_LESSONS", export_renderers.OrderedDict())
+        payload = json.dumps(LESSON_DATA).encode("utf-8")
+        block = shared_memory.SharedMemory(create=True, size=len(payload))
+        block.buf[:len(payload)] = payload
+        try:
+            for name in export_renderers.DOCUMENT_RENDERERS:
+                export_renderers._render_in_worker(name, "digest-1", block.name, len(payload), {})
+        finally:
+            block.close()
+            block.unlink()
+        
+        assert len(decoded) == 1
+    
+    def test_export_encodes_lesson_once(self, local_storage, monkeypatch):
+        """Test that the document and material renders of one export share one payload block"""
+        created = []
+        
+        class CountingSharedMemory(shared_memory.SharedMemory):
+            def __init__(self, *args, create=False, **kwargs):
+                super().__init__(*args, create=create, **kwargs)
+                if create:
+                    created.append(self.name)
+        
+        scheduler = RenderScheduler(processes=2)
+        monkeypatch.setattr(export_renderers, "render_scheduler", scheduler)
+        monkeypatch.setattr(export_renderers.shared_memory, "SharedMemory", CountingSharedMemory)
+        try:
+            result = export_service.generate_export_files(LESSON_DATA)
+        finally:
+            scheduler.shutdown()
+        
+        assert result["status"] == "completed"
+        assert len(created) == 1
+    
+    def test_pool_does_not_fork_threaded_parent(self):
+        """Test that render workers are started by a forkserver or spawned"""
+        scheduler = RenderScheduler(processes=1)
+        try:
+            executor = scheduler._get_executor()
+            assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        finally:
+            scheduler.shutdown()
+
+class TestIncrementalExport:
+    """Test suite for section fingerprints and incremental re-export"""
+    
+    def test_section_diff_counts_items(self):
+        """Test positional item diffs per changed section"""
+        edited = copy.deepcopy(LESSON_DATA)
+        edited["quiz"]["quiz_items"][0]["correct_answer"] = "B"
+        edited["quiz"]["quiz_items"].append({"type": "numeric", "points": 1, "correct_answer": 4})
+        
+        diff = diff_fingerprints(lesson_fingerprint(LESSON_DATA), lesson_fingerprint(edited))
+        
+        assert diff == {"quiz": {"modified": 1, "added": 1, "removed": 0}}
+    
+    def test_quiz_edit_rerenders_dependent_formats_only(self, local_storage):
+        """Test that a quiz edit leaves slides untouched"""
+        previous = export_service.generate_export_files(LESSON_DATA)
+        edited = copy.deepcopy(LESSON_DATA)
+        edited["quiz"]["quiz_items"][0]["correct_answer"] = "B"
+        
+        result = export_service.regenerate_export_files(edited, previous)
+        
+        assert result["metadata"]["rerendered"] == [
+            "bundle_zip", "change_log", "csv_grades", "pack_pdf", "quiz_pdf", "worksheets_docx"
+        ]
+        assert result["files"]["slides_mdx"] is previous["files"]["slides_mdx"]
+        assert json.loads(result["files"]["quiz_pdf"])["answer_key"]["answers"] == ["B"]
+        change_log = json.loads(result["files"]["change_log"])
+        assert change_log["changes"] == ["quiz: 1 modified"]
+        # Same lesson, new content version
+        assert result["metadata"]["lesson_id"] == previous["metadata"]["lesson_id"]
+        assert result["metadata"]["lesson_version"] != previous["metadata"]["lesson_version"]
+    
+    def test_lessons_on_one_topic_get_separate_ids(self, local_storage):
+        """Test that two teachers' lessons on the same topic do not share an id"""
+        first = export_service.generate_export_files(LESSON_DATA)
+        second = export_service.generate_export_files(copy.deepcopy(LESSON_DATA))
+        
+        assert first["metadata"]["lesson_id"] != second["metadata"]["lesson_id"]
+        assert first["metadata"]["lesson_version"] == second["metadata"]["lesson_version"]
+    
+    def test_unchanged_lesson_reuses_previous_export(self, local_storage):
+        """Test that re-exporting identical content renders nothing"""
+        previous = export_service.generate_export_files(LESSON_DATA)
+        
+        assert export_service.regenerate_export_files(copy.deepcopy(LESSON_DATA), previous) is previous
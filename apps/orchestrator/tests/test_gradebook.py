@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+import numpy as np
+from app.agents.exporter import render_csv_grades
+from app.services.gradebook import Gradebook, build_gradebook
+
+QUIZ_ITEMS = [{"points": 2}, {"points": 3}, {"points": 5}]
+
+class TestGradebook:
+    """Test suite for the vectorized gradebook engine"""
+    
+    def test_totals_percentages_and_grades(self):
+        """Test column arithmetic and grade banding at the cutoffs"""
+        roster = [{"name": f"Student {index}", "id": f"S{index}"} for index in range(4)]
+        scores = [[2, 3, 5], [2, 3, 4], [2, 3, 1], [None, 3, None]]
+        gradebook = Gradebook(roster, QUIZ_ITEMS, scores)
+        
+        assert gradebook.totals.tolist() == [10, 9, 6, 3]
+        assert gradebook.percentages.tolist() == [100, 90, 60, 30]
+        assert gradebook.grades.tolist() == ["A", "A", "D", "F"]
+        assert gradebook.to_dict()["rows"][3] == ["Student 3", "S3", None, 3.0, None, 3.0, 30.0, "F"]
+    
+    def test_csv_streams_in_chunks(self):
+        """Test that a large roster is written a chunk of rows at a time"""
+        students = 2000
+        roster = [{"name": f"Student {index}", "id": f"S{index:04d}"} for index in range(students)]
+        items = [{"points": 1}] * 60
+        scores = np.ones((students, 60))
+        
+        chunks = list(Gradebook(roster, items, scores).iter_csv(chunk_size=500))
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        
+        assert len(chunks) == 4
+        assert len(rows) == students + 1
+        assert rows[0][:3] == ["Student Name", "Student ID", "Q1"]
+        assert rows[-1][-3:] == ["60.0", "100.0", "A"]
+    
+    def test_no_roster_means_no_rows(self):
+        """Test that exports without a roster no longer invent sample students"""
+        gradebook = json.loads(render_csv_grades({"quiz": {"quiz_items": QUIZ_ITEMS}}))
+        
+        assert gradebook["headers"][-3:] == ["Total Score", "Percentage", "Grade"]
+        assert gradebook["rows"] == []
+    
+    def test_build_from_lesson_data(self):
+        """Test that the roster and score matrix are read from lesson_data"""
+        gradebook = build_gradebook({
+            "quiz": {"quiz_items": QUIZ_ITEMS},
+            "roster": [{"name": "Ada", "id": "S1"}],
+            "scores": [[1, 1, 1]]
+        })
+        
+        assert gradebook.percentages.tolist() == [30]
@@ -1,6 +1,6 @@
 # Created automatically by Cursor AI (2024-08-26)
 import pytest
-from app.agents.quiz_builder import validate_quiz_item, validate_rubric
+from app.agents.quiz_builder import validate_quiz_item, validate_quiz_items, validate_rubric
 
 class TestItemValidator:
     """Test suite for quiz item validation functionality"""
@@ -301,3 +301,70 @@ class TestRubricValidator:
         
         assert is_valid is False
         assert any("description is required" in error.lower() for error in errors)
+
+class TestBulkItemValidation:
+    """Test suite for validating whole item banks"""
+    
+    VALID_ITEM = {
+        "id": "q1",
+        "type": "numeric",
+        "question": "What is 2 + 3?",
+        "correct_answer": 5,
+        "tolerance": 0,
+        "explanation": "Addition",
+        "points": 1,
+        "difficulty": "easy"
+    }
+    
+    def test_columnar_report(self):
+        """Test that every error becomes one row across the report columns"""
+        items = [
+            self.VALID_ITEM,
+            {**self.VALID_ITEM, "id": "q2", "tolerance": -1, "points": 0},
+            {"id": "q3", "type": "mcq"}
+        ]
+        
+        report = validate_quiz_items(items)
+        
+        assert report["valid"] is False
+        assert report["checked_items"] == 3
+        assert report["invalid_items"] == 2
+        assert report["errors"]["index"] == [1, 1, 2, 2, 2, 2, 2]
+        assert report["errors"]["item_id"][:2] == ["q2", "q2"]
+        assert report["errors"]["message"][:2] == ["Points must be greater than 0", "Tolerance must be non-negative"]
+    
+    def test_fail_fast_stops_at_first_invalid_item(self):
+        """Test that fail_fast skips the rest of the bank"""
+        items = [self.VALID_ITEM, {"type": "mcq"}] + [self.VALID_ITEM] * 100
+        
+        report = validate_quiz_items(items, fail_fast=True)
+        
+        assert report["checked_items"] == 2
+        assert report["invalid_items"] == 1
+        assert report["total_items"] == 102
+    
+    def test_valid_bank(self):
+        """Test that a clean bank has an empty report"""
+        report = validate_quiz_items([self.VALID_ITEM] * 10)
+        
+        assert report["valid"] is True
+        assert report["errors"]["message"] == []
+    
+    def test_malformed_items_become_error_rows(self):
+        """Test that non-dict items and non-string fields are reported, not raised"""
+        items = [
+            None,
+            {**self.VALID_ITEM, "id": "q2", "type": None},
+            {**self.VALID_ITEM, "id": "q3", "difficulty": 3},
+            {**self.VALID_ITEM, "id": "q4", "type": "mcq", "options": "A, B, C"}
+        ]
+        
+        report = validate_quiz_items(items)
+        
+        assert report["invalid_items"] == 4
+        assert report["errors"]["index"] == [0, 1, 2, 3]
+        assert report["errors"]["item_id"] == [None, "q2", "q3", "q4"]
+        assert report["errors"]["message"][0] == "Item must be an object, got NoneType"
+        assert report["errors"]["message"][1].startswith("Invalid type: None")
+        assert report["errors"]["message"][2].startswith("Invalid difficulty: 3")
+        assert report["errors"]["message"][3] == "MCQ options must be a list"
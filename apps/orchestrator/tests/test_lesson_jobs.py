@@ -0,0 +1,130 @@
+import pytest
+import app.tasks.lesson_jobs as lesson_job_tasks
+from app.core.celery_app import celery_app
+from app.services.job_store import MemoryJobStore, RedisJobStore
+from app.services.lesson_jobs import LessonJobService
+from app.services.lesson_pipeline import PipelineError, PipelineStage, StagePipeline
+
+@pytest.fixture
+def job_service(monkeypatch):
+    """Job service running the Celery canvas eagerly against an in-memory store"""
+    def objectives(brief):
+        return [f"Explain {brief['topic']}"]
+
+    def quiz(brief, objectives):
+        return {"items": len(objectives)}
+
+    def history(brief):
+        return {"topic": brief["topic"]}
+
+    def exports(quiz, history):
+        return {"files": [quiz["items"], history["topic"]]}
+
+    pipeline = StagePipeline([
+        PipelineStage("objectives", objectives, inputs=["brief"]),
+        PipelineStage("history", history, inputs=["brief"]),
+        PipelineStage("quiz", quiz, inputs=["brief", "objectives"]),
+        PipelineStage("exports", exports, inputs=["quiz", "history"])
+    ])
+    events = []
+    service = LessonJobService(
+        pipeline,
+        MemoryJobStore(),
+        celery=celery_app,
+        publisher=lambda client_id, event: events.append((client_id, event))
+    )
+    service.events = events
+
+    monkeypatch.setattr(lesson_job_tasks, "lesson_job_service", service)
+    monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+    return service
+
+class _RecordingPipeline:
+    """Records the commands queued on a Redis pipeline"""
+    
+    def __init__(self, executed):
+        self.commands = []
+        self.executed = executed
+    
+    def __getattr__(self, command):
+        return lambda *args, **kwargs: self.commands.append(command)
+    
+    def execute(self):
+        self.executed.append(self.commands)
+        return [1] * len(self.commands)
+
+class _RecordingRedis:
+    def __init__(self):
+        self.executed = []
+    
+    def pipeline(self):
+        return _RecordingPipeline(self.executed)
+
+class TestLessonJobs:
+    """Test suite for Celery-backed lesson jobs"""
+    
+    def test_submitted_job_runs_every_stage(self, job_service):
+        """Test that a job completes and streams each stage result"""
+        submitted = job_service.submit({"topic": "Solar Energy"}, client_id="client-1")
+        snapshot = job_service.snapshot(submitted["job_id"])
+        
+        assert snapshot["status"] == "completed"
+        assert snapshot["results"]["exports"] == {"files": [1, "Solar Energy"]}
+        
+        stage_events = [event for _, event in job_service.events if event["type"] == "lesson_stage"]
+        assert sorted(event["stage"] for event in stage_events) == ["exports", "history", "objectives", "quiz"]
+        assert [event["seq"] for _, event in job_service.events] == [1, 2, 3, 4, 5]
+        assert all(client_id == "client-1" for client_id, _ in job_service.events)
+    
+    def test_failed_stage_marks_job_failed(self, job_service):
+        """Test that a stage error fails the job and skips later stages"""
+        def broken(brief):
+            raise RuntimeError("model unavailable")
+        
+        job_service.pipeline.stages["history"].func = broken
+        job_service.store.create("job-1", {"topic": "Solar Energy"})
+        
+        with pytest.raises(PipelineError):
+            job_service.execute_stage("job-1", "history")
+        # Sibling branches still in flight become no-ops
+        assert job_service.execute_stage("job-1", "objectives") is None
+        
+        snapshot = job_service.snapshot("job-1")
+        assert snapshot["status"] == "failed"
+        assert "history" in snapshot["error"]
+        assert snapshot["results"] == {}
+    
+    def test_unknown_job(self, job_service):
+        """Test that missing jobs have no snapshot"""
+        assert job_service.snapshot("missing") is None
+    
+    @pytest.mark.asyncio
+    async def test_stream_ends_when_job_expires(self, job_service, monkeypatch):
+        """Test that the SSE stream closes with a status event once the job state is gone"""
+        import app.api.v1.endpoints.lessons as lessons
+        
+        job_service.store.create("job-1", {"topic": "Solar Energy"})
+        monkeypatch.setattr(lessons, "lesson_job_service", job_service)
+        monkeypatch.setattr(lessons.settings, "LESSON_JOB_POLL_INTERVAL_SECONDS", 0)
+        response = await lessons.stream_lesson_job("job-1")
+        # Stand-in for the Redis TTL expiring the job hash
+        job_service.store._jobs.pop("job-1")
+        
+        events = [event async for event in response.body_iterator]
+        
+        assert events == [
+            'event: status\ndata: {"job_id": "job-1", "status": "expired", "error": "Lesson job not found"}\n\n'
+        ]
+
+    def test_redis_writes_keep_the_job_ttl(self):
+        """Test that every Redis job write re-applies the TTL in its transaction"""
+        store = RedisJobStore("redis://localhost:6379/0", ttl_seconds=60)
+        store._redis = _RecordingRedis()
+        
+        store.create("job-1", {"topic": "Solar Energy"})
+        store.set_status("job-1", "running")
+        store.save_stage("job-1", "quiz", {"items": 1})
+        store.next_sequence("job-1")
+        
+        assert len(store._redis.executed) == 4
+        assert all("expire" in commands for commands in store._redis.executed)
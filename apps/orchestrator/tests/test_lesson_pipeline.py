@@ -0,0 +1,206 @@
+import asyncio
+import time
+import pytest
+from app.core.agent_runner import AgentRunner
+from app.services.lesson_pipeline import (
+    PipelineError,
+    PipelineStage,
+    StagePipeline,
+    build_lesson_pipeline,
+)
+
+class TestStagePipeline:
+    """Test suite for the dependency-graph stage executor"""
+
+    @pytest.mark.asyncio
+    async def test_passes_declared_inputs(self):
+        """Test that stages receive upstream results by name"""
+        pipeline = StagePipeline([
+            PipelineStage("double", lambda seed: seed * 2, ["seed"]),
+            PipelineStage("total", lambda seed, double: seed + double, ["seed", "double"]),
+        ])
+
+        results = await pipeline.run({"seed": 5})
+
+        assert results == {"double": 10, "total": 15}
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Test that wall-clock time follows the critical path"""
+        def slow(seed):
+            time.sleep(0.2)
+            return seed
+
+        pipeline = StagePipeline([
+            PipelineStage(f"branch_{i}", slow, ["seed"]) for i in range(4)
+        ])
+
+        started = time.perf_counter()
+        await pipeline.run({"seed": 1})
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_async_stage_functions(self):
+        """Test that coroutine stages are awaited directly"""
+        async def fetch(seed):
+            await asyncio.sleep(0)
+            return seed + 1
+
+        pipeline = StagePipeline([PipelineStage("fetch", fetch, ["seed"])])
+
+        assert await pipeline.run({"seed": 1}) == {"fetch": 2}
+
+    @pytest.mark.asyncio
+    async def test_stage_failure_reports_stage(self):
+        """Test that a failing stage surfaces as a PipelineError"""
+        def broken(seed):
+            raise RuntimeError("LLM unavailable")
+
+        pipeline = StagePipeline([
+            PipelineStage("broken", broken, ["seed"]),
+            PipelineStage("after", lambda broken: broken, ["broken"]),
+        ])
+
+        with pytest.raises(PipelineError) as exc_info:
+            await pipeline.run({"seed": 1})
+
+        assert exc_info.value.stage == "broken"
+        assert "LLM unavailable" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_stage_completion_callback(self):
+        """Test that each stage is reported as soon as it finishes"""
+        async def fast(seed):
+            return "fast"
+
+        async def slow(seed):
+            await asyncio.sleep(0.05)
+            return "slow"
+
+        reported = []
+
+        async def on_stage_complete(name, result):
+            reported.append((name, result))
+
+        pipeline = StagePipeline([
+            PipelineStage("slow", slow, ["seed"]),
+            PipelineStage("fast", fast, ["seed"]),
+        ])
+        await pipeline.run({"seed": 1}, on_stage_complete=on_stage_complete)
+
+        assert reported == [("fast", "fast"), ("slow", "slow")]
+
+    @pytest.mark.asyncio
+    async def test_callback_errors_do_not_fail_pipeline(self):
+        """Test that a broken progress callback is ignored"""
+        async def on_stage_complete(name, result):
+            raise RuntimeError("socket closed")
+
+        pipeline = StagePipeline([PipelineStage("a", lambda seed: seed, ["seed"])])
+
+        assert await pipeline.run({"seed": 1}, on_stage_complete=on_stage_complete) == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_missing_external_input(self):
+        """Test that unseeded external inputs are rejected"""
+        pipeline = StagePipeline([PipelineStage("a", lambda brief: brief, ["brief"])])
+
+        with pytest.raises(ValueError):
+            await pipeline.run({})
+
+    def test_cycle_detection(self):
+        """Test that cyclic stage graphs are rejected"""
+        with pytest.raises(ValueError) as exc_info:
+            StagePipeline([
+                PipelineStage("a", lambda b: b, ["b"]),
+                PipelineStage("b", lambda a: a, ["a"]),
+            ])
+
+        assert "cycle" in str(exc_info.value)
+
+    def test_lesson_pipeline_critical_path(self):
+        """Test the lesson pipeline dependency layers"""
+        layers = build_lesson_pipeline().layers()
+
+        assert set(layers[0]) == {"objectives", "history", "math"}
+        assert set(layers[1]) == {"sequence", "quiz", "activity"}
+        assert layers[2] == ["udl"]
+        assert layers[3] == ["exports"]
+
+
+class TestAgentRunner:
+    """Test suite for the bounded agent executor"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency calls run at once"""
+        runner = AgentRunner(max_concurrency=2)
+        active = []
+        peak = []
+
+        def call():
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+
+        await asyncio.gather(*(runner.run(call) for _ in range(6)))
+        runner.shutdown()
+
+        assert max(peak) <= 2
+        assert runner.stats()["completed"] == 6
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Test that a blocking call does not stall other coroutines"""
+        runner = AgentRunner(max_concurrency=1)
+        ticks = []
+
+        async def heartbeat():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(runner.run(time.sleep, 0.1), heartbeat())
+        runner.shutdown()
+
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.1
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test that slow calls are abandoned after the timeout"""
+        runner = AgentRunner(max_concurrency=1, timeout=0.05)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await runner.run(time.sleep, 0.3)
+        runner.shutdown(wait=False)
+
+    @pytest.mark.asyncio
+    async def test_timeout_starts_when_the_call_runs(self):
+        """Test that time spent queued for a worker does not count against the timeout"""
+        runner = AgentRunner(max_concurrency=1, timeout=0.2)
+
+        results = await asyncio.gather(runner.run(time.sleep, 0.15), runner.run(time.sleep, 0.15))
+        runner.shutdown()
+
+        assert results == [None, None]
+        assert runner.stats()["completed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_call_leaves_the_queue(self):
+        """Test that a call cancelled before it starts is no longer counted as queued"""
+        runner = AgentRunner(max_concurrency=1)
+        running = asyncio.ensure_future(runner.run(time.sleep, 0.1))
+        queued = asyncio.ensure_future(runner.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        assert runner.stats()["queued"] == 1
+
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        runner.shutdown()
+
+        assert runner.stats()["queued"] == 0
+        assert runner.stats()["completed"] == 1
@@ -0,0 +1,107 @@
+import numpy as np
+import app.services.quiz_scoring as quiz_scoring
+from app.services.gradebook import build_gradebook
+from app.services.quiz_scoring import QuizScorer, compile_item, normalize_answer
+
+QUIZ_ITEMS = [
+    {"id": "q1", "type": "mcq", "points": 1, "correct_answer": "Solar panels"},
+    {"id": "q2", "type": "MS", "points": 2, "correct_answer": ["Cardboard box", "Aluminum foil"]},
+    {"id": "q3", "type": "numeric", "points": 3, "correct_answer": 5, "tolerance": 0.5},
+    {"id": "q4", "type": "short_answer", "points": 4, "correct_answer": ["It absorbs heat", "absorbs sunlight"]},
+]
+
+class TestQuizScoring:
+    """Test suite for compiled quiz response matchers"""
+    
+    def test_each_item_type(self):
+        """Test the matcher for every item type"""
+        scorer = QuizScorer(QUIZ_ITEMS)
+        
+        assert scorer.score(["solar panels!", ["Aluminum foil", "cardboard box"], "5.4", "It absorbs  heat."]) == [1, 2, 3, 4]
+        assert scorer.score(["Wind", ["Aluminum foil"], "5.6", "it reflects heat"]) == [0, 0, 0, 0]
+    
+    def test_unanswered_items_are_unscored(self):
+        """Test that missing answers stay None, keyed or positional"""
+        scorer = QuizScorer(QUIZ_ITEMS)
+        
+        assert scorer.score({"q3": "abc", "q1": "Solar Panels"}) == [1, None, 0, None]
+        assert scorer.score(["Solar panels"]) == [1, None, None, None]
+    
+    def test_partial_credit_and_keywords(self):
+        """Test opt-in multi-select partial credit and short answer keywords"""
+        multi_select = compile_item({"type": "multi_select", "points": 4, "correct_answer": ["a", "b"], "partial_credit": True})
+        short_answer = compile_item({"type": "SHORT", "points": 2, "correct_answer": [], "keywords": ["black", "absorbs"]})
+        
+        assert multi_select(["a"]) == 2
+        assert multi_select(["a", "c"]) == 0
+        assert short_answer("Black paper absorbs more sunlight") == 2
+        assert short_answer("Black paper is dark") == 0
+    
+    def test_multi_word_keywords(self):
+        """Test that keyword phrases match whole words in order"""
+        short_answer = compile_item({"type": "SHORT", "points": 2, "correct_answer": [], "keywords": ["cell wall", "Plant"]})
+        
+        assert short_answer("A plant has a cell wall.") == 2
+        assert short_answer("A plant cell has a wall") == 0
+        assert short_answer("Plants have a cell wall") == 0
+    
+    def test_unscorable_items_compile_to_none(self):
+        """Test that unsupported types and missing or bad keys are left unscored"""
+        assert compile_item({"type": "essay", "correct_answer": ""}) is None
+        assert compile_item({"type": "LABEL", "answer": "A: stem"}) is None
+        assert compile_item({"type": "mcq"}) is None
+        assert compile_item({"type": "numeric", "correct_answer": "five"}) is None
+    
+    def test_prisma_answer_field(self):
+        """Test that the stored "answer" string is used when there is no correct_answer"""
+        assert compile_item({"type": "MCQ", "answer": "Solar panels"})("solar panels") == 1
+        assert compile_item({"type": "MS", "points": 2, "answer": "Foil, Box"})(["box", "foil"]) == 2
+        assert compile_item({"type": "NUMERIC", "answer": "5"})("5.0") == 1
+    
+    def test_multi_select_string_response(self):
+        """Test that a comma separated response is split like a stored key"""
+        matcher = compile_item({"type": "MS", "points": 2, "correct_answer": ["a", "b"]})
+        
+        assert matcher("a,b") == 2
+        assert matcher("B, a") == 2
+        assert matcher("a") == 0
+    
+    def test_mixed_type_bank_in_gradebook(self):
+        """Test that a labeling item becomes a NaN column instead of failing the gradebook"""
+        items = QUIZ_ITEMS[:1] + [{"id": "q5", "type": "LABEL", "points": 2, "answer": "A: panel"}] + [{"id": "q6", "type": "SHORT", "points": 1, "answer": "heat"}]
+        
+        gradebook = build_gradebook({
+            "quiz": {"quiz_items": items},
+            "roster": [{"name": "Ada", "id": "S1"}],
+            "responses": [["Solar panels", "A: panel", "Heat"]]
+        })
+        
+        assert np.isnan(gradebook.scores[0, 1])
+        assert gradebook.totals.tolist() == [2]
+        assert gradebook.to_dict()["rows"][0][2:5] == [1.0, None, 1.0]
+    
+    def test_batch_compiles_once_and_fills_gradebook(self, monkeypatch):
+        """Test that thousands of submissions reuse the matchers compiled up front"""
+        submissions = [["Solar panels", ["Cardboard box", "Aluminum foil"], str(index % 7), "absorbs sunlight"] for index in range(5000)]
+        compiled = []
+        
+        def counting_compile(item):
+            compiled.append(item["id"])
+            return compile_item(item)
+        
+        monkeypatch.setattr(quiz_scoring, "compile_item", counting_compile)
+        matrix = QuizScorer(QUIZ_ITEMS).score_matrix(submissions)
+        
+        assert compiled == ["q1", "q2", "q3", "q4"]
+        assert matrix.shape == (5000, 4)
+        
+        gradebook = build_gradebook({
+            "quiz": {"quiz_items": QUIZ_ITEMS},
+            "roster": [{"name": "Ada", "id": "S1"}, {"name": "Ben", "id": "S2"}],
+            "responses": submissions[4:6]
+        })
+        assert gradebook.totals.tolist() == [7, 10]
+    
+    def test_normalize_answer(self):
+        """Test answer normalization"""
+        assert normalize_answer("  It's  HOT. ") == "it s hot"
@@ -2,6 +2,8 @@
 import pytest
 from typing import Dict, List, Any, Tuple
 from app.agents.activity_designer import validate_safety_protocols, check_hazardous_materials
+from app.runbooks.safety_incomplete import safety_handler
+from app.services.hazard_matcher import hazard_matcher
 
 class TestSafetyGate:
     """Test suite for safety gate functionality"""
@@ -249,3 +251,36 @@ def validate_emergency_contacts(contacts: Dict[str, Any]) -> Tuple[bool, List[st
             errors.append(f"Missing {contact} contact information")
     
     return len(errors) == 0, errors
+
+
+class TestHazardMatcher:
+    """Test the shared hazard lexicon matcher"""
+    
+    def test_whole_words_only(self):
+        """Test that terms inside unrelated words do not match"""
+        result = hazard_matcher.match_materials(["baseball", "infant seat", "wireless mouse", "wheat flour"])
+        
+        assert result["matches"] == []
+        assert result["max_severity"] == "low"
+    
+    def test_separators_and_suffixes(self):
+        """Test underscore, hyphen and plural forms of lexicon terms"""
+        result = hazard_matcher.match_materials(["heat_source", "Hot-Plate", "explosives", "9V batteries"])
+        
+        assert [match["term"] for match in result["matches"]] == ["heat source", "hot plate", "explosive", "batteries"]
+        assert result["hazardous_materials"] == ["heat_source", "Hot-Plate", "explosives"]
+        assert result["categories"] == {"heat": 2, "chemical": 1, "electrical": 1}
+    
+    def test_matches_map_back_to_materials(self):
+        """Test that matches in a long list point at the right material"""
+        materials = [f"cardboard sheet {index}" for index in range(300)] + ["vinegar and baking soda base"]
+        
+        matches = hazard_matcher.scan(materials)
+        
+        assert [(match["index"], match["term"]) for match in matches] == [(300, "base")]
+    
+    def test_runbook_safety_level(self):
+        """Test that the runbook reads its safety level from the shared lexicon"""
+        assert safety_handler._determine_safety_level(["cardboard", "tape"]) == "low"
+        assert safety_handler._determine_safety_level(["cardboard", "scissors"]) == "medium"
+        assert safety_handler._determine_safety_level(["scissors", "acetone"]) == "high"
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from app.services.stage_cache import MemoryLRU, StageCache, stage_cache_key
+from app.services.lesson_pipeline import PipelineStage, StagePipeline, normalize_brief
+
+class TestStageCache:
+    """Test suite for the content-addressed stage cache"""
+    
+    def test_key_is_order_independent(self):
+        """Test that logically identical inputs hash the same"""
+        first = stage_cache_key("quiz", "1", {"topic": "solar", "minutes": 45})
+        second = stage_cache_key("quiz", "1", {"minutes": 45, "topic": "solar"})
+        
+        assert first == second
+    
+    def test_key_changes_with_version(self):
+        """Test that a prompt template bump invalidates entries"""
+        inputs = {"topic": "solar"}
+        
+        assert stage_cache_key("quiz", "1", inputs) != stage_cache_key("quiz", "2", inputs)
+        assert stage_cache_key("quiz", "1", inputs) != stage_cache_key("math", "1", inputs)
+    
+    def test_normalized_brief(self):
+        """Test that cosmetic brief differences normalize away"""
+        brief = {
+            "topic": "Solar  Energy ",
+            "gradeBand": "6",
+            "periodLength": 45,
+            "days": 1,
+            "classSize": 25,
+            "equipment": ["Thermometers", "cardboard"],
+            "inclusionNotes": "None"
+        }
+        variant = {**brief, "topic": "solar energy", "equipment": ["cardboard", "thermometers"]}
+        
+        assert normalize_brief(brief) == normalize_brief(variant)
+    
+    def test_lru_eviction_and_expiry(self):
+        """Test LRU capacity and TTL handling"""
+        lru = MemoryLRU(max_entries=2, ttl_seconds=60)
+        lru.set("a", "1")
+        lru.set("b", "2")
+        lru.get("a")
+        lru.set("c", "3")
+        
+        assert lru.get("b") is None
+        assert lru.get("a") == "1"
+        
+        expired = MemoryLRU(max_entries=2, ttl_seconds=0)
+        expired.set("a", "1")
+        assert expired.get("a") is None
+    
+    @pytest.mark.asyncio
+    async def test_get_or_compute_counts_hits(self):
+        """Test that a second identical call is served from memory"""
+        cache = StageCache()
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            return {"items": [1, 2]}
+        
+        first = await cache.get_or_compute("k", compute)
+        second = await cache.get_or_compute("k", compute)
+        
+        assert first == second == {"items": [1, 2]}
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_cached_values_are_independent_copies(self):
+        """Test that mutating a returned value does not corrupt the cache"""
+        cache = StageCache()
+        
+        async def compute():
+            return {"items": [1]}
+        
+        value = await cache.get_or_compute("k", compute)
+        value["items"].append(2)
+        
+        assert await cache.get_or_compute("k", compute) == {"items": [1]}
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_computation(self):
+        """Test single-flight behaviour for identical in-flight stages"""
+        cache = StageCache()
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert cache.stats()["shared_in_flight"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_owner_hands_the_key_to_a_waiter(self):
+        """Test that cancelling the computing caller does not cancel callers sharing its key"""
+        cache = StageCache()
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        owner = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(cache.get_or_compute("k", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        
+        assert await asyncio.gather(*waiters) == ["result", "result"]
+        assert owner.cancelled()
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """Test that a failing computation can be retried"""
+        cache = StageCache()
+        
+        async def broken():
+            raise RuntimeError("LLM unavailable")
+        
+        async def working():
+            return "ok"
+        
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", broken)
+        
+        assert await cache.get_or_compute("k", working) == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_pipeline_uses_cache_for_versioned_stages(self):
+        """Test that versioned pipeline stages skip repeated calls"""
+        calls = {"cached": 0, "uncached": 0}
+        
+        def cached(seed):
+            calls["cached"] += 1
+            return seed * 2
+        
+        def uncached(cached):
+            calls["uncached"] += 1
+            return cached + 1
+        
+        pipeline = StagePipeline([
+            PipelineStage("cached", cached, ["seed"], version="1"),
+            PipelineStage("uncached", uncached, ["cached"]),
+        ], cache=StageCache())
+        
+        await pipeline.run({"seed": 2})
+        results = await pipeline.run({"seed": 2})
+        
+        assert results == {"cached": 4, "uncached": 5}
+        assert calls == {"cached": 1, "uncached": 2}
@@ -1,6 +1,8 @@
 # Created automatically by Cursor AI (2024-08-26)
 import pytest
 from app.agents.sequence_planner import allocate_time, validate_time_budget
+from app.runbooks.time_budget_overrun import time_budget_handler
+from app.services.time_allocation import allocate_days, solve_allocation
 
 class TestTimeAllocator:
     """Test suite for time allocation functionality"""
@@ -97,3 +99,84 @@ class TestTimeAllocator:
         # Test with empty sections
         result = allocate_time([], 45)
         assert len(result) == 0
+
+
+class TestTimeAllocationSolver:
+    """Test the bounded, order-preserving allocation solver"""
+    
+    SECTIONS = [
+        {"title": "Warm-up", "priority": "low"},
+        {"title": "Core Lesson", "priority": "high"},
+        {"title": "Practice", "priority": "high"},
+        {"title": "Review", "priority": "medium"}
+    ]
+    
+    def test_largest_remainder_rounding(self):
+        """Test that rounding is spread by remainder rather than dumped on the last section"""
+        assert solve_allocation(self.SECTIONS, 60)["durations"] == [7, 20, 20, 13]
+        assert solve_allocation(self.SECTIONS, 46)["durations"] == [5, 16, 15, 10]
+    
+    def test_bounds_and_locked_sections(self):
+        """Test that min/max durations hold and a locked section keeps its time"""
+        sections = [
+            {**self.SECTIONS[0], "max_duration": 5},
+            {**self.SECTIONS[1], "min_duration": 25},
+            self.SECTIONS[2],
+            {**self.SECTIONS[3], "locked": True, "duration": 8}
+        ]
+        
+        result = solve_allocation(sections, 60)
+        
+        assert result["durations"] == [5, 25, 22, 8]
+        assert result["fits"] is True
+    
+    def test_infeasible_budgets(self):
+        """Test that unmet bounds are reported instead of violated"""
+        overrun = solve_allocation([{"min_duration": 30}, {"min_duration": 30}], 45)
+        capped = solve_allocation([{"max_duration": 10}, {"max_duration": 5}], 30)
+        
+        assert overrun == {"durations": [30, 30], "allocated": 60, "fits": False}
+        assert capped == {"durations": [10, 5], "allocated": 15, "fits": False}
+    
+    def test_auto_rebalance_keeps_order(self):
+        """Test that rebalancing an overrun keeps lesson order and fits the budget"""
+        sections = [dict(section, duration=20) for section in self.SECTIONS]
+        
+        result = time_budget_handler.auto_rebalance(sections, 45)
+        
+        assert [section["title"] for section in result] == [section["title"] for section in self.SECTIONS]
+        assert sum(section["duration"] for section in result) == 45
+        assert result[0]["adjustment"] == -15
+    
+    def test_multi_day_plan(self):
+        """Test that a two-day plan splits consecutive sections and fills each day"""
+        sections = self.SECTIONS + [{"title": "Lab", "priority": "high", "min_duration": 30}, {"title": "Quiz", "priority": "medium"}]
+        
+        plan = allocate_days(sections, [45, 45])
+        
+        titles = [[section["title"] for section in day["sections"]] for day in plan["days"]]
+        assert titles == [["Warm-up", "Core Lesson", "Practice"], ["Review", "Lab", "Quiz"]]
+        assert [day["allocated"] for day in plan["days"]] == [45, 45]
+        assert plan["fits"] is True
+    
+    def test_planned_sections_keep_a_minute(self):
+        """Test that rounding never takes a section that has time down to zero"""
+        sections = [{"title": "Lab", "priority": "high", "weight": 20, "duration": 30}] + [
+            {"title": f"Check {index}", "priority": "low", "duration": 2} for index in range(6)
+        ]
+        
+        result = solve_allocation(sections, 10)
+        
+        assert result["durations"] == [4, 1, 1, 1, 1, 1, 1]
+        assert result["fits"] is True
+    
+    def test_split_lesson_halves_the_time(self):
+        """Test that a split lesson shares its period across both days"""
+        sections = [dict(section, duration=15) for section in self.SECTIONS]
+        
+        split = time_budget_handler.suggest_split_lesson(sections, 45)
+        
+        assert [split["day1"]["total_time"], split["day2"]["total_time"]] == [23, 22]
+        assert [section["title"] for section in split["day1"]["sections"] + split["day2"]["sections"]] == [
+            section["title"] for section in self.SECTIONS
+        ]
@@ -1,6 +1,10 @@
 # Created automatically by Cursor AI (2024-08-26)
 import pytest
-from app.agents.udl_checker import check_reading_level, check_vocabulary_complexity, validate_udl_flags
+from app.agents import udl_checker
+from app.agents.udl_checker import check_reading_level, check_udl, check_vocabulary_complexity, prepass_udl, validate_udl_flags
+from app.data.readability_lexicon import FAMILIAR_POLYSYLLABLES
+from app.services.readability import POLYSYLLABLE_MIN, analyze_lesson, analyze_text, count_syllables, parse_grade
+from app.services.vocabulary_index import vocabulary_index
 
 class TestUDLRules:
     """Test suite for UDL rules and accessibility checking"""
@@ -202,3 +206,214 @@ class TestUDLRules:
         assert "vocabulary" in scaffold_types
         assert "graphic_organizer" in scaffold_types
         assert len(scaffolds) >= 3  # Should have at least 3 types of scaffolds
+
+class TestReadabilityEngine:
+    """Test suite for the readability metrics behind check_reading_level"""
+    
+    def test_syllable_counts(self):
+        """Test the spelling rules and the bundled syllable table"""
+        counts = {word: count_syllables(word) for word in ["sun", "provides", "energy", "boxes", "jumped", "table", "people", "radiation", "quantum", "idea"]}
+        
+        assert counts == {"sun": 1, "provides": 2, "energy": 3, "boxes": 2, "jumped": 1, "table": 2, "people": 2, "radiation": 4, "quantum": 2, "idea": 3}
+    
+    def test_familiar_words_are_polysyllables(self):
+        """Test that every familiar-word exemption can actually apply"""
+        assert [word for word in sorted(FAMILIAR_POLYSYLLABLES) if count_syllables(word) < POLYSYLLABLE_MIN] == []
+    
+    def test_metrics_for_simple_and_complex_text(self):
+        """Test Flesch-Kincaid, SMOG and the difficult-word ratio"""
+        simple = analyze_text("The sun provides energy to Earth. Plants use this energy to grow.")
+        complex_text = analyze_text("Electromagnetic radiation induces the emission of electrons from metallic surfaces.")
+        
+        assert simple["sentences"] == 2
+        assert simple["flesch_kincaid_grade"] < 6
+        assert simple["difficult_word_ratio"] == 0
+        assert complex_text["flesch_kincaid_grade"] > 12
+        assert complex_text["smog_grade"] > simple["smog_grade"]
+        assert "electromagnetic" in complex_text["difficult_words"]
+    
+    def test_grade_parsing(self):
+        """Test grade strings from briefs"""
+        assert parse_grade("6-8") == 8
+        assert parse_grade("Grade 7") == 7
+        assert parse_grade("K") == 0
+        assert parse_grade("unknown") == 6
+    
+    def test_lesson_batch(self):
+        """Test that objectives, steps and quiz stems are scored in one call"""
+        lesson = {
+            "objectives": [{"description": "Explain how solar ovens trap heat."}],
+            "activity": {"activity": {"steps": [{"description": "Line the box with foil."}]}},
+            "quiz": {"quiz_items": [{"question": "Electromagnetic radiation induces photoelectric emission in metallic surfaces."}]}
+        }
+        
+        report = analyze_lesson(lesson, "6")
+        
+        assert [item["section"] for item in report["items"]] == ["objectives", "activity_steps", "quiz_items"]
+        assert [item["section"] for item in report["flagged"]] == ["quiz_items"]
+
+class TestVocabularyIndex:
+    """Test suite for the grade-banded vocabulary index"""
+    
+    def test_inflections_resolve_to_lemmas(self):
+        """Test plural, tense and irregular forms"""
+        bands = {word: vocabulary_index.band_of(word) for word in ["stopped", "running", "boxes", "tried", "children", "ran", "investigated", "reactions"]}
+        
+        assert bands == {
+            "stopped": "K-2", "running": "K-2", "boxes": "K-2", "tried": "K-2",
+            "children": "K-2", "ran": "K-2", "investigated": "6-8", "reactions": "6-8"
+        }
+    
+    def test_counts_per_band(self):
+        """Test that the report counts content words per band"""
+        result = check_vocabulary_complexity("The photosynthesis process facilitates the conversion of solar energy.", "6")
+        
+        assert result["band_counts"] == {"K-2": 0, "3-5": 3, "6-8": 0, "9-12": 2, "unlisted": 1}
+        assert result["content_words"] == 6
+        assert result["complex_word_count"] == 3
+    
+    def test_complex_words_depend_on_grade(self):
+        """Test that on-grade vocabulary is only complex for younger readers"""
+        text = "Students analyze the chemical reaction."
+        
+        assert check_vocabulary_complexity(text, "3")["complex_word_count"] == 3
+        assert check_vocabulary_complexity(text, "8")["complex_word_count"] == 0
+    
+    def test_complex_word_sample_is_capped(self):
+        """Test that long texts return a bounded sample with full counts"""
+        words = [f"zorbification{index}" for index in range(50)]
+        profile = vocabulary_index.profile(words, 12)
+        
+        assert profile["complex_word_count"] == 50
+        assert len(profile["complex_words"]) == 20
+
+
+class _FakeAgent:
+    def __init__(self, response):
+        self.response = response
+        self.tasks = []
+    
+    def execute(self, task):
+        self.tasks.append(task)
+        return self.response
+
+class _FakePool:
+    def __init__(self, agent):
+        self.agent = agent
+    
+    def acquire(self, role, factory):
+        from contextlib import nullcontext
+        return nullcontext(self.agent)
+
+def _lesson(steps):
+    return {
+        "topic": "Solar Ovens",
+        "objectives": [{"description": "Students work in groups to draw a picture of the sun."}],
+        "activity": {"activity": {
+            "description": "Teams build a solar oven from a box and use a diagram to check each part.",
+            "steps": [{"description": step} for step in steps]
+        }},
+        "quiz": {"quiz_items": [
+            {"type": "mcq", "question": "What color box gets hot fastest?"},
+            {"type": "short", "question": "Explain why a dark box gets hot in the sun."}
+        ]}
+    }
+
+class TestUDLPrepass:
+    """Test the local UDL pre-pass and LLM escalation"""
+    
+    def test_clean_lesson_skips_agent(self, monkeypatch):
+        """Test that a lesson the pre-pass can decide never reaches the agent"""
+        agent = _FakeAgent("{}")
+        monkeypatch.setattr(udl_checker, "agent_pool", _FakePool(agent))
+        
+        result = check_udl(_lesson(["Put the box in the sun and wait ten minutes."]), "6")
+        
+        assert agent.tasks == []
+        assert result["analysis"]["source"] == "local"
+        assert result["udl_flags"] == []
+        assert result["overall_score"] == "100% UDL compliant"
+    
+    def test_clear_failure_is_flagged_locally(self):
+        """Test that far over-level text is flagged without escalation"""
+        lesson = _lesson(["Students will synthesize comprehensive empirical methodology to corroborate photovoltaic thermodynamic equilibrium paradigms."])
+        
+        prepass = prepass_udl(lesson, "6")
+        flags = prepass["result"]["udl_flags"]
+        
+        assert prepass["ambiguous"] == []
+        assert [flag["severity"] for flag in flags] == ["HIGH", "MEDIUM"]
+        assert "reads at grade" in flags[0]["description"]
+        assert "vocabulary" in flags[1]["description"]
+        assert validate_udl_flags(flags) == (True, [])
+        assert prepass["result"]["vocabulary"]
+    
+    def test_vocabulary_flag_does_not_claim_a_reading_grade(self):
+        """Test that on-level text with hard vocabulary is flagged for its vocabulary only"""
+        lesson = _lesson(["Check the photovoltaic thermocouple. Log the wattage. Note the amperage."])
+        
+        flags = prepass_udl(lesson, "6")["result"]["udl_flags"]
+        
+        assert [flag["description"] for flag in flags] == [
+            "activity_steps 1 uses vocabulary above grade 6: thermocouple, amperage, photovoltaic"
+        ]
+    
+    def test_missing_principle_is_flagged(self):
+        """Test that a lesson without engagement cues gets a low severity flag"""
+        lesson = _lesson(["Put the box in the sun and wait ten minutes."])
+        lesson["objectives"] = []
+        lesson["activity"]["activity"]["description"] = "Use a diagram to build an oven."
+        
+        flags = prepass_udl(lesson, "6")["result"]["udl_flags"]
+        
+        assert [(flag["principle"], flag["severity"]) for flag in flags] == [("engagement", "LOW")]
+    
+    def test_principle_cues_match_whole_words(self):
+        """Test that cues inside longer words do not count as principle coverage"""
+        lesson = _lesson(["Put the box in the sun and wait ten minutes."])
+        lesson["objectives"] = [{"description": "Students represent how steam is under control."}]
+        lesson["activity"]["activity"]["description"] = "Use diagrams to check the oven."
+        lesson["quiz"]["quiz_items"] = [{"type": "mcq", "question": "What heats the box?"}]
+        
+        flags = prepass_udl(lesson, "6")["result"]["udl_flags"]
+        
+        assert [flag["principle"] for flag in flags if flag["severity"] == "LOW"] == ["engagement", "expression"]
+    
+    def test_only_ambiguous_sections_are_escalated(self, monkeypatch):
+        """Test that the agent sees only borderline sections and its findings are merged"""
+        agent = _FakeAgent('Review:\n{"udl_flags": [{"type": "REPRESENTATION", "severity": "LOW", "description": "Long step", "suggestion": "Split it", "principle": "representation"}], "scaffolds": ["Sentence frames"]}')
+        monkeypatch.setattr(udl_checker, "agent_pool", _FakePool(agent))
+        ambiguous = "Students compare the temperature inside each box and write the results down."
+        
+        result = check_udl(_lesson(["Put the box in the sun and wait ten minutes.", ambiguous]), "6")
+        
+        assert len(agent.tasks) == 1
+        assert ambiguous in agent.tasks[0]
+        assert "wait ten minutes" not in agent.tasks[0]
+        assert result["analysis"]["escalated_sections"] == ["activity_steps 2"]
+        assert result["udl_flags"][0]["description"] == "Long step"
+        assert result["scaffolds"] == ["Sentence frames"]
+    
+    def test_invalid_agent_flags_are_dropped(self, monkeypatch):
+        """Test that agent flags failing validate_udl_flags are not merged"""
+        reply = {"udl_flags": [
+            {"type": "ENGAGEMENT", "severity": "MEDIUM", "description": "No choice", "suggestion": "Offer two prompts", "principle": "engagement"},
+            {"type": "REPRESENTATION", "severity": "URGENT", "description": "Bad", "suggestion": "x", "principle": "representation"},
+            {"description": "Missing fields"},
+            "not a flag"
+        ]}
+        monkeypatch.setattr(udl_checker, "agent_pool", _FakePool(_FakeAgent(reply)))
+        
+        result = check_udl(_lesson(["Students compare the temperature inside each box and write the results down."]), "6")
+        
+        assert [flag["description"] for flag in result["udl_flags"]] == ["No choice"]
+        assert result["analysis"]["rejected_flags"] == 3
+    
+    def test_unparseable_agent_reply_is_tolerated(self, monkeypatch):
+        """Test that a reply without JSON leaves the local result intact"""
+        monkeypatch.setattr(udl_checker, "agent_pool", _FakePool(_FakeAgent("no findings")))
+        
+        result = check_udl(_lesson(["Students compare the temperature inside each box and write the results down."]), "6")
+        
+        assert result["analysis"]["source"] == "local+llm"
+        assert result["udl_flags"] == []
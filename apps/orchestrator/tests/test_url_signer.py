@@ -0,0 +1,67 @@
+import time
+import pytest
+from app.services.url_signer import UrlSigner, parse_signing_keys
+
+@pytest.fixture
+def signer():
+    return UrlSigner({"k1": "old-secret", "k2": "new-secret"}, "k2", "https://files.example.com/")
+
+class TestUrlSigner:
+    """Test suite for HMAC-signed download URLs"""
+    
+    def test_signed_url_verifies(self, signer):
+        """Test that a freshly signed URL round-trips through the verifier"""
+        signed = signer.sign("exports/lesson pack.pdf")
+        
+        assert signed["key_id"] == "k2"
+        assert signed["signed_url"].startswith("https://files.example.com/exports/lesson%20pack.pdf?")
+        assert signer.verify_url(signed["signed_url"])
+    
+    def test_tampered_or_expired_urls_fail(self, signer):
+        """Test that path, expiry and signature changes are rejected"""
+        signed = signer.sign("exports/quiz_pdf", expiration_hours=1)
+        url = signed["signed_url"]
+        
+        assert not signer.verify_url(url.replace("quiz_pdf", "pack_pdf"))
+        assert not signer.verify_url(url.replace(f"expires={signed['expires_at']}", f"expires={signed['expires_at'] + 1}"))
+        assert not signer.verify_url(url[:-2] + "AA")
+        assert not signer.verify_url(url, now=time.time() + 7200)
+        assert not signer.verify_url("https://files.example.com/exports/quiz_pdf")
+    
+    def test_urls_outside_the_base_fail(self):
+        """Test that a valid signature does not verify under another host, scheme or prefix"""
+        signer = UrlSigner({"k1": "secret"}, "k1", "https://files.example.com/downloads")
+        url = signer.sign("exports/quiz_pdf")["signed_url"]
+        
+        assert signer.verify_url(url)
+        assert not signer.verify_url(url.replace("files.example.com", "evil.example.com"))
+        assert not signer.verify_url(url.replace("https://", "http://"))
+        assert not signer.verify_url(url.replace("/downloads/", "/other/"))
+        assert not signer.verify_url(url.replace("/downloads/exports/", "/downloadsexports/"))
+    
+    def test_batch_shares_expiry(self, signer):
+        """Test that a batch signs every path with one expiry"""
+        paths = [f"exports/unit/file_{index}" for index in range(100)]
+        signed = signer.sign_many(paths)
+        
+        assert list(signed) == paths
+        assert len({entry["expires_at"] for entry in signed.values()}) == 1
+        assert all(signer.verify_url(entry["signed_url"]) for entry in signed.values())
+    
+    def test_rotation_keeps_old_links_valid(self):
+        """Test that links signed by a retired key verify until the key is removed"""
+        old = UrlSigner({"k1": "old-secret"}, "k1", "https://files.example.com")
+        url = old.sign("exports/slides_mdx")["signed_url"]
+        
+        rotated = UrlSigner({"k1": "old-secret", "k2": "new-secret"}, "k2", "https://files.example.com")
+        retired = UrlSigner({"k2": "new-secret"}, "k2", "https://files.example.com")
+        
+        assert rotated.verify_url(url)
+        assert not retired.verify_url(url)
+    
+    def test_parse_signing_keys(self):
+        """Test the kid:secret setting format"""
+        assert parse_signing_keys("k1:abc, k2:d:ef") == {"k1": "abc", "k2": "d:ef"}
+        assert parse_signing_keys("") == {}
+        with pytest.raises(ValueError):
+            parse_signing_keys("missing-secret")
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.services.event_broker import InMemoryBroker, InMemoryHub
+from app.services.websocket_service import WebSocketManager
+
+class FakeWebSocket:
+    """Minimal stand-in for a FastAPI WebSocket"""
+    
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.fail = fail
+        self.delay = delay
+        self.sent = []
+        self.raw = []
+        self.closed_with = None
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.raw.append(text)
+        self.sent.append(json.loads(text))
+    
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+async def settle(seconds: float = 0.01):
+    """Let connection writer tasks drain their queues"""
+    await asyncio.sleep(seconds)
+
+@pytest_asyncio.fixture
+async def make_manager():
+    """Build managers and stop their writer tasks after the test"""
+    managers = []
+    
+    def build(**kwargs):
+        manager = WebSocketManager(**kwargs)
+        managers.append(manager)
+        return manager
+    
+    yield build
+    for manager in managers:
+        await manager.close()
+
+class TestWebSocketManager:
+    """Test suite for lesson-scoped WebSocket fan-out"""
+    
+    @pytest.mark.asyncio
+    async def test_export_progress_reaches_only_subscribers(self, make_manager):
+        """Test that lesson broadcasts skip unsubscribed connections"""
+        manager = make_manager()
+        subscriber, bystander = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(subscriber, "teacher-1")
+        await manager.connect(bystander, "teacher-2")
+        await manager.subscribe(subscriber, "lesson-1")
+        
+        await manager.broadcast_export_progress("lesson-1", {"percent": 50})
+        await manager.broadcast_export_complete("lesson-2", {"files": []})
+        await settle()
+        
+        assert [message["type"] for message in subscriber.sent] == ["export_progress"]
+        assert bystander.sent == []
+    
+    @pytest.mark.asyncio
+    async def test_unsubscribe_and_disconnect_clean_index(self, make_manager):
+        """Test that the subscription index is kept in sync"""
+        manager = make_manager()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(first, "teacher-1")
+        await manager.connect(second, "teacher-1")
+        await manager.subscribe(first, "lesson-1")
+        await manager.subscribe(second, "lesson-1")
+        await manager.subscribe(second, "lesson-2")
+        
+        manager.unsubscribe(first, "lesson-1")
+        assert manager.lesson_subscribers["lesson-1"] == {second}
+        
+        manager.disconnect(second)
+        assert manager.lesson_subscribers == {}
+        assert second not in manager.connection_data
+    
+    @pytest.mark.asyncio
+    async def test_failed_subscriber_is_dropped(self, make_manager):
+        """Test that a broken socket is removed during a lesson broadcast"""
+        manager = make_manager()
+        healthy, broken = FakeWebSocket(), FakeWebSocket(fail=True)
+        await manager.connect(healthy, "teacher-1")
+        await manager.connect(broken, "teacher-2")
+        await manager.subscribe(healthy, "lesson-1")
+        await manager.subscribe(broken, "lesson-1")
+        
+        await manager.broadcast_export_complete("lesson-1", {"files": []})
+        await settle()
+        
+        assert len(healthy.sent) == 1
+        assert manager.lesson_subscribers["lesson-1"] == {healthy}
+        assert "teacher-2" not in manager.active_connections
+    
+    @pytest.mark.asyncio
+    async def test_message_is_encoded_once(self, make_manager):
+        """Test that every socket receives the same encoded payload"""
+        manager = make_manager()
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for websocket in sockets:
+            await manager.connect(websocket, "teacher-1")
+        
+        await manager.broadcast_to_client("teacher-1", {"type": "ping"})
+        await settle()
+        
+        assert sockets[0].raw[0] is sockets[1].raw[0] is sockets[2].raw[0]
+    
+    @pytest.mark.asyncio
+    async def test_slow_consumer_does_not_delay_others(self, make_manager):
+        """Test that sends are independent and slow sockets get evicted"""
+        manager = make_manager(send_timeout=0.05, max_slow_strikes=2)
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=1)
+        await manager.connect(fast, "teacher-1")
+        await manager.connect(slow, "teacher-1")
+        
+        await manager.broadcast_to_client("teacher-1", {"type": "tick"})
+        await settle()
+        assert len(fast.sent) == 1
+        
+        await settle(0.1)
+        assert manager.connection_data[slow]["slow_strikes"] == 1
+        
+        await manager.broadcast_to_client("teacher-1", {"type": "tick"})
+        await settle(0.1)
+        
+        assert slow not in manager.connection_data
+        assert slow.closed_with == 1013
+        assert manager.active_connections["teacher-1"] == {fast}
+    
+    @pytest.mark.asyncio
+    async def test_export_progress_is_coalesced(self, make_manager):
+        """Test that a slow socket only receives the latest queued progress"""
+        manager = make_manager()
+        websocket = FakeWebSocket(delay=0.02)
+        await manager.connect(websocket, "teacher-1")
+        await manager.subscribe(websocket, "lesson-1")
+        
+        for percent in range(0, 101, 10):
+            await manager.broadcast_export_progress("lesson-1", {"percent": percent})
+        await manager.broadcast_export_complete("lesson-1", {"files": []})
+        await settle(0.2)
+        
+        percents = [message["data"]["percent"] for message in websocket.sent if message["type"] == "export_progress"]
+        # Every tick queued before the writer ran collapses into the latest
+        assert percents == [100]
+        assert websocket.sent[-1]["type"] == "export_complete"
+    
+    @pytest.mark.asyncio
+    async def test_only_keyed_messages_coalesce(self, make_manager):
+        """Test that coalescing follows the explicit key, not the message shape"""
+        manager = make_manager()
+        websocket = FakeWebSocket(delay=0.02)
+        await manager.connect(websocket, "teacher-1")
+        await manager.subscribe(websocket, "lesson-1")
+        
+        for percent in (10, 20):
+            await manager.broadcast_to_lesson("lesson-1", {"type": "export_progress", "data": {"percent": percent}})
+        for percent in (30, 40):
+            await manager.broadcast_to_lesson("lesson-1", {"data": {"percent": percent}, "type": "progress"}, coalesce_key="custom")
+        await settle(0.2)
+        
+        assert [message["data"]["percent"] for message in websocket.sent] == [10, 20, 40]
+    
+    @pytest.mark.asyncio
+    async def test_full_queue_evicts_connection(self, make_manager):
+        """Test that a socket whose backlog exceeds the queue bound is dropped"""
+        manager = make_manager(send_queue_size=2)
+        websocket = FakeWebSocket(delay=1)
+        await manager.connect(websocket, "teacher-1")
+        
+        for index in range(4):
+            await manager.broadcast_to_client("teacher-1", {"type": "tick", "index": index})
+        await settle()
+        
+        assert websocket not in manager.connection_data
+        assert websocket.closed_with == 1013
+
+class TestBrokeredFanOut:
+    """Test suite for cross-node delivery through the event broker"""
+    
+    async def _node(self, make_manager, hub):
+        manager = make_manager(broker=InMemoryBroker(hub))
+        await manager.start()
+        return manager
+    
+    @pytest.mark.asyncio
+    async def test_events_reach_sockets_on_other_nodes(self, make_manager):
+        """Test that a broadcast raised on one node reaches sockets held by another"""
+        hub = InMemoryHub()
+        node_a, node_b = await self._node(make_manager, hub), await self._node(make_manager, hub)
+        teacher, watcher = FakeWebSocket(), FakeWebSocket()
+        await node_b.connect(teacher, "teacher-1")
+        await node_b.connect(watcher, "teacher-2")
+        await node_b.subscribe(watcher, "lesson-1")
+        
+        await node_a.broadcast_to_client("teacher-1", {"type": "lesson_stage"})
+        await node_a.broadcast_export_progress("lesson-1", {"percent": 10})
+        await settle()
+        
+        assert [message["type"] for message in teacher.sent] == ["lesson_stage"]
+        assert [message["type"] for message in watcher.sent] == ["export_progress"]
+    
+    @pytest.mark.asyncio
+    async def test_nodes_subscribe_only_while_holding_sockets(self, make_manager):
+        """Test that broker channels follow local interest"""
+        hub = InMemoryHub()
+        node = await self._node(make_manager, hub)
+        websocket = FakeWebSocket()
+        await node.connect(websocket, "teacher-1")
+        await node.subscribe(websocket, "lesson-1")
+        
+        assert node.broker.channels == {"client:teacher-1", "lesson:lesson-1"}
+        
+        node.disconnect(websocket)
+        await asyncio.sleep(0)
+        
+        assert node.broker.channels == set()
+    
+    @pytest.mark.asyncio
+    async def test_subscription_is_live_when_connect_returns(self, make_manager):
+        """Test that events published right after connect and subscribe are delivered"""
+        hub = InMemoryHub()
+        node = await self._node(make_manager, hub)
+        
+        async def slow_subscribe(channel, subscribe=node.broker.subscribe):
+            await asyncio.sleep(0.02)
+            await subscribe(channel)
+        
+        node.broker.subscribe = slow_subscribe
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await asyncio.gather(node.connect(first, "teacher-1"), node.connect(second, "teacher-1"))
+        await node.broadcast_to_client("teacher-1", {"type": "ping"})
+        await node.subscribe(first, "lesson-1")
+        await node.broadcast_export_complete("lesson-1", {"files": []})
+        await settle()
+        
+        assert [message["type"] for message in first.sent] == ["ping", "export_complete"]
+        assert [message["type"] for message in second.sent] == ["ping"]
+    
+    @pytest.mark.asyncio
+    async def test_brokered_progress_is_coalesced(self, make_manager):
+        """Test that the coalesce key travels with brokered messages"""
+        hub = InMemoryHub()
+        node_a, node_b = await self._node(make_manager, hub), await self._node(make_manager, hub)
+        watcher = FakeWebSocket(delay=0.02)
+        await node_b.connect(watcher, "teacher-1")
+        await node_b.subscribe(watcher, "lesson-1")
+        
+        for percent in range(0, 101, 25):
+            await node_a.broadcast_export_progress("lesson-1", {"percent": percent})
+        await settle(0.1)
+        
+        assert [message["data"]["percent"] for message in watcher.sent] == [100]
+    
+    @pytest.mark.asyncio
+    async def test_broker_failure_falls_back_to_local_delivery(self, make_manager):
+        """Test that local sockets still get events when publishing fails"""
+        node = await self._node(make_manager, InMemoryHub())
+        websocket = FakeWebSocket()
+        await node.connect(websocket, "teacher-1")
+        
+        async def broken_publish(channel, payload):
+            raise ConnectionError("broker down")
+        
+        node.broker.publish = broken_publish
+        await node.broadcast_to_client("teacher-1", {"type": "ping"})
+        await settle()
+        
+        assert len(websocket.sent) == 1